@@ -1,18 +1,14 @@
-from steps.step3_recommend import find_similars, find_competitors
-from steps.step4_attractiveness import predict_attractiveness
-import pandas as pd
+from steps.pipeline import run_pipeline
+from steps.telemetry import traced
 
-def main():
+@traced('main', rows_arg=None)
+def main(force=False, on_stage=None, should_stop=None):
 
     file_path = "./data/영화DB(임시).csv"
 
-    df = pd.read_csv(file_path)
-    df['유사작'] = find_similars(df)
-    df['경쟁작'] = find_competitors(df)
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
-
-    df = pd.read_csv(file_path)
-    df['예측 매력도'] = predict_attractiveness(df, encoder_path = './steps/ordinal_encoder.pkl', model_path = './steps/rf_weighted_model.pkl')
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+    # CSV를 한 번 읽어 유사작 → 경쟁작 → 매력도 예측을 메모리에서 처리하고 한 번만 저장합니다.
+    # 입력 컬럼이 바뀌지 않은 단계는 건너뜁니다.
+    # on_stage/should_stop: 진행 상황 알림과 취소 확인 (UI의 백그라운드 갱신 작업에서 사용)
+    return run_pipeline(file_path, force=force, on_stage=on_stage, should_stop=should_stop)
 if __name__ == "__main__":
     main()
@@ -0,0 +1,337 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# 검색 모듈(ui/)은 서로를 최상위 이름으로 import하므로 ui 폴더를 sys.path에 추가합니다.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ui'))
+from catalog_index import CatalogIndex
+from search import search_movies
+from title_index import TitleIndex, choseong_key, normalize_key
+
+from steps.catalog_store import load_catalog, normalize_catalog, save_catalog, write_atomic
+from steps.step3_recommend import find_competitors, find_similars
+from steps.step4_attractiveness import predict_attractiveness
+from steps.synthetic_catalog import make_catalog
+
+BENCH_DIR = './data/benchmarks'
+ENCODER_PATH = './steps/ordinal_encoder.pkl'
+MODEL_PATH = './steps/rf_weighted_model.pkl'
+
+
+def search_workload(df, index, n_queries=100, page_size=20, seed=0):
+    """
+    검색창에서 들어올 법한 (검색어, 필터) 목록을 만듭니다.
+    실제 제목에서 뽑은 정확한 제목 / 앞 두 글자 / 가운데 세 글자 / 초성 / 한 글자 오타와
+    검색어 없이 필터만 고른 경우를 섞고, 절반에는 사이드바 필터를 하나씩 붙입니다.
+    """
+    rng = np.random.default_rng(seed)
+    titles = df['영화명'].dropna().astype(str).to_numpy()
+    facets = [facet for facet in index.options if index.options[facet]]
+    queries = []
+    for i in range(n_queries):
+        title = titles[rng.integers(len(titles))]
+        key = normalize_key(title) or title
+        kind = i % 6
+        if kind == 0:
+            query = title
+        elif kind == 1:
+            query = key[:2]
+        elif kind == 2:
+            start = rng.integers(max(len(key) - 2, 1))
+            query = key[start:start + 3]
+        elif kind == 3:
+            query = choseong_key(key)[:4]
+        elif kind == 4:
+            pos = rng.integers(len(key))
+            query = key[:pos] + '가' + key[pos + 1:]
+        else:
+            query = ""
+        filters = {facet: [] for facet in index.options}
+        filters['limit'] = page_size
+        if facets and (i % 2 == 1 or not query):
+            facet = facets[rng.integers(len(facets))]
+            options = index.options[facet]
+            filters[facet] = [options[rng.integers(len(options))]]
+        queries.append((query, filters))
+    return queries
+
+
+def _setup_similars(df, opts):
+    return lambda: find_similars(df), len(df)
+
+
+def _setup_competitors(df, opts):
+    return lambda: find_competitors(df), len(df)
+
+
+def _setup_attractiveness(df, opts):
+    # 모델 로딩과 JIT 컴파일은 측정에서 제외합니다. (앱/파이프라인에서는 프로세스당 한 번)
+    predict_attractiveness(df.iloc[:100], opts['encoder_path'], opts['model_path'])
+    return lambda: predict_attractiveness(df, opts['encoder_path'], opts['model_path']), len(df)
+
+
+def _setup_search_index(df, opts):
+    return lambda: (CatalogIndex(df), TitleIndex(df['영화명'])), len(df)
+
+
+def _setup_search(df, opts):
+    index, title_index = CatalogIndex(df), TitleIndex(df['영화명'])
+    queries = search_workload(df, index, seed=opts['seed'])
+
+    def run():
+        for query, filters in queries:
+            search_movies(query, filters, df, index=index, title_index=title_index)
+    return run, len(queries)
+
+
+# 이름 → (준비 함수, 처리 단위, 기본 최대 행 수)
+# 준비 함수는 (측정할 함수, 한 번에 처리하는 단위 수)를 반환합니다.
+# find_similars는 행 수의 제곱에 비례하므로 기본으로는 10만 행까지만 잽니다. (--no-limit로 해제)
+BENCHMARKS = {
+    'similars': (_setup_similars, 'rows', 100000),
+    'competitors': (_setup_competitors, 'rows', None),
+    'attractiveness': (_setup_attractiveness, 'rows', None),
+    'search_index': (_setup_search_index, 'rows', None),
+    'search': (_setup_search, 'queries', None),
+}
+
+
+def _read_status_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """리눅스에서는 /proc/self/clear_refs로 최대 RSS(VmHWM)를 현재 RSS로 되돌립니다. 되돌렸으면 True"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def rss_mb():
+    kb = _read_status_kb('VmRSS')
+    return None if kb is None else kb / 1024
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS(MB). /proc가 없으면 getrusage(프로세스 시작 이후 최대), 그것도 없으면 None"""
+    kb = _read_status_kb('VmHWM')
+    if kb is not None:
+        return kb / 1024
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(name, catalog_path, repeat=3, opts=None):
+    """
+    카탈로그를 읽어 name 벤치마크를 repeat번 실행하고 결과를 반환합니다. (새 프로세스에서 호출합니다)
+    wall_s는 가장 빠른 실행 시간, peak_rss_mb는 측정 구간의 최대 RSS,
+    rss_delta_mb는 측정 직전 RSS 대비 늘어난 양입니다.
+    """
+    setup, unit, _ = BENCHMARKS[name]
+    df = load_catalog(catalog_path, memory_map=False)
+    start = time.perf_counter()
+    run, units = setup(df, opts or {})
+    setup_s = time.perf_counter() - start
+
+    reset_peak_rss()
+    before = rss_mb()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    peak = peak_rss_mb()
+    best = min(times)
+    return {
+        'benchmark': name,
+        'rows': len(df),
+        'unit': unit,
+        'units': units,
+        'repeat': repeat,
+        'setup_s': setup_s,
+        'wall_s': best,
+        'wall_median_s': statistics.median(times),
+        'throughput': units / best if best > 0 else None,
+        'peak_rss_mb': peak,
+        'rss_delta_mb': None if peak is None or before is None else max(peak - before, 0.0),
+    }
+
+
+def ensure_catalog(n_rows, seed=0, cache_dir=BENCH_DIR):
+    """(n_rows, seed) 합성 카탈로그를 정규화 컬럼까지 붙여 .feather로 만들어 두고 경로를 반환합니다."""
+    path = os.path.join(cache_dir, 'catalogs', f"catalog_{n_rows}_{seed}.feather")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_catalog(normalize_catalog(make_catalog(n_rows, seed=seed)), path)
+    return path
+
+
+def result_key(result):
+    return f"{result['benchmark']}@{result['rows']}"
+
+
+def run_benchmarks(sizes, names=None, repeat=3, seed=0, no_limit=False, cache_dir=BENCH_DIR,
+                   encoder_path=ENCODER_PATH, model_path=MODEL_PATH, on_result=None):
+    """
+    크기별로 합성 카탈로그를 준비하고, 벤치마크마다 새 프로세스에서 측정한 결과 리스트를 반환합니다.
+    (프로세스를 나눠 앞선 측정의 메모리 사용량이나 캐시가 다음 측정에 섞이지 않게 합니다)
+    """
+    names = list(names or BENCHMARKS)
+    opts = {'seed': seed, 'encoder_path': encoder_path, 'model_path': model_path}
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for n_rows in sizes:
+        path = ensure_catalog(n_rows, seed, cache_dir)
+        for name in names:
+            max_rows = BENCHMARKS[name][2]
+            if max_rows is not None and n_rows > max_rows and not no_limit:
+                result = {'benchmark': name, 'rows': n_rows, 'skipped': f"{max_rows:,}행 초과 (--no-limit로 실행)"}
+            else:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    result = pool.submit(measure, name, path, repeat, opts).result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import sklearn
+    return {
+        'git': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def _load_json(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _save_json(path, data):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    write_atomic(path, write)
+
+
+def append_history(path, run):
+    """실행 기록을 history JSON(실행 목록)에 덧붙입니다."""
+    history = _load_json(path, [])
+    history.append(run)
+    _save_json(path, history)
+
+
+def save_baseline(path, run):
+    """이번 실행 결과를 '벤치마크@행 수' 키로 기준값 파일에 저장합니다. (건너뛴 항목 제외)"""
+    _save_json(path, {'created_at': run['started_at'], 'env': run['env'],
+                      'results': {result_key(r): r for r in run['results'] if 'skipped' not in r}})
+
+
+def check_regressions(results, baseline, tolerance=0.2, rss_tolerance=0.25, min_delta_s=0.01):
+    """
+    기준값보다 느려졌거나 메모리를 더 쓴 항목을 찾습니다.
+    wall_s가 (1 + tolerance)배를 넘고 min_delta_s초 이상 늘었거나,
+    rss_delta_mb가 (1 + rss_tolerance)배를 넘고 1MB 이상 늘었으면 회귀로 봅니다.
+    (항목 키, 지표, 기준값, 현재값) 리스트를 반환합니다.
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for result in results:
+        base = base_results.get(result_key(result))
+        if base is None or 'skipped' in result:
+            continue
+        if result['wall_s'] > base['wall_s'] * (1 + tolerance) and result['wall_s'] - base['wall_s'] > min_delta_s:
+            regressions.append((result_key(result), 'wall_s', base['wall_s'], result['wall_s']))
+        cur_rss, base_rss = result.get('rss_delta_mb'), base.get('rss_delta_mb')
+        if cur_rss is not None and base_rss is not None and cur_rss > base_rss * (1 + rss_tolerance) \
+                and cur_rss - base_rss > 1:
+            regressions.append((result_key(result), 'rss_delta_mb', base_rss, cur_rss))
+    return regressions
+
+
+def parse_size(text):
+    """'1000', '10k', '1m' 형태의 행 수"""
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def format_result(result):
+    if 'skipped' in result:
+        return f"{result['benchmark']:>15} {result['rows']:>9,}행  건너뜀: {result['skipped']}"
+    rss = '-' if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']:,.0f}MB (+{result['rss_delta_mb']:,.0f}MB)"
+    return (f"{result['benchmark']:>15} {result['rows']:>9,}행  {result['wall_s'] * 1000:>10,.1f}ms  "
+            f"{result['throughput']:>12,.0f} {result['unit']}/s  RSS {rss}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 카탈로그로 유사작/경쟁작/매력도 예측/검색 성능을 측정합니다.")
+    parser.add_argument('--sizes', nargs='+', default=['1k', '10k', '100k'], help="행 수 (예: 1k 10k 100k 1m)")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="일부 벤치마크만 실행합니다.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-limit', action='store_true', help="벤치마크별 최대 행 수 제한을 풉니다.")
+    parser.add_argument('--dir', default=BENCH_DIR, help="합성 카탈로그 캐시 / 기록 / 기준값 폴더")
+    parser.add_argument('--baseline', default=None, help="기준값 파일 (기본: <dir>/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준값으로 저장합니다.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="허용하는 시간 증가 비율")
+    parser.add_argument('--rss-tolerance', type=float, default=0.25, help="허용하는 메모리 증가 비율")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or os.path.join(args.dir, 'baseline.json')
+    run = {'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': args.seed, 'env': environment()}
+    run['results'] = run_benchmarks([parse_size(s) for s in args.sizes], args.only, repeat=args.repeat,
+                                    seed=args.seed, no_limit=args.no_limit, cache_dir=args.dir,
+                                    on_result=lambda r: print(format_result(r), flush=True))
+    append_history(os.path.join(args.dir, 'history.json'), run)
+
+    if args.save_baseline:
+        save_baseline(baseline_path, run)
+        print(f"✅ 기준값을 '{baseline_path}' 파일에 저장했습니다.")
+    elif os.path.exists(baseline_path):
+        regressions = check_regressions(run['results'], _load_json(baseline_path, {}),
+                                        tolerance=args.tolerance, rss_tolerance=args.rss_tolerance)
+        for key, metric, base, current in regressions:
+            change = f" ({current / base - 1:+.0%})" if base else ""
+            print(f"❌ {key} {metric}: {base:,.4g} → {current:,.4g}{change}")
+        if regressions:
+            sys.exit(1)
+        print("✅ 기준값 대비 회귀 없음")
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class BlobStore:
+    """
+    내용 해시(sha1) 이름의 파일로 본문을 보관하는 디스크 캐시의 공통 부분입니다. (PageCache, PosterCache)
+    - 같은 내용은 한 번만 저장하고, index.json이 키 → (해시, 수집 시각, 마지막 사용 시각, 바이트 수)를 기록합니다.
+    - 전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 키부터 지우고, 어떤 키도 쓰지 않게 된 파일만 삭제합니다.
+    - 변경이 autosave번 쌓이면 index.json을 원자적으로 저장합니다.
+    """
+
+    def __init__(self, cache_dir, blob_dir, suffix, max_bytes, autosave, compress=False):
+        self.cache_dir = cache_dir
+        self.blob_dir = blob_dir
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.autosave = autosave
+        self.compress = compress
+        self._lock = threading.RLock()
+        self._dirty = 0
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        self.entries = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, self.blob_dir, digest[:2], f"{digest}{self.suffix}")
+
+    def read_blob(self, key):
+        """key의 본문 바이트를 반환하고 마지막 사용 시각을 갱신합니다. 없거나 파일이 지워졌으면 None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            path = self._blob_path(entry['sha1'])
+            if not os.path.exists(path):
+                del self.entries[key]
+                return None
+            entry['used_at'] = time.time()
+        with (gzip.open(path, 'rb') if self.compress else open(path, 'rb')) as f:
+            return f.read()
+
+    def write_blob(self, key, data, now=None):
+        """본문을 (없을 때만) 저장하고 key가 가리키게 합니다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 쓰다 만 파일을 보지 않습니다."""
+        digest = hashlib.sha1(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with (gzip.open(tmp_path, 'wb') if self.compress else open(tmp_path, 'wb')) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = now or time.time()
+        with self._lock:
+            self.entries[key] = {'sha1': digest, 'fetched_at': now, 'used_at': now, 'bytes': os.path.getsize(path)}
+
+    def changed(self):
+        """변경 한 번을 세고, autosave번 쌓였으면 저장합니다."""
+        with self._lock:
+            self._dirty += 1
+            if self._dirty >= self.autosave:
+                self.save()
+
+    def total_bytes(self):
+        sizes = {e['sha1']: e['bytes'] for e in self.entries.values()}
+        return sum(sizes.values())
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 마지막 사용 시각이 오래된 키를 지웁니다. 지운 키 목록을 반환합니다."""
+        with self._lock:
+            total = self.total_bytes()
+            if total <= self.max_bytes:
+                return []
+            refs = {}
+            for entry in self.entries.values():
+                refs[entry['sha1']] = refs.get(entry['sha1'], 0) + 1
+            removed = []
+            for key in sorted(self.entries, key=lambda k: self.entries[k]['used_at']):
+                if total <= self.max_bytes:
+                    break
+                entry = self.entries.pop(key)
+                removed.append(key)
+                refs[entry['sha1']] -= 1
+                if refs[entry['sha1']] == 0:   # 다른 키가 같은 본문을 쓰지 않을 때만 파일을 지웁니다.
+                    total -= entry['bytes']
+                    try:
+                        os.remove(self._blob_path(entry['sha1']))
+                    except FileNotFoundError:
+                        pass
+            self._dirty += 1
+            return removed
+
+    def save(self):
+        """정리(evict) 후 index.json을 원자적으로 저장합니다."""
+        with self._lock:
+            self.evict()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._index_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self._index_path)
+            self._dirty = 0
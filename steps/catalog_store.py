@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from steps.features import audience_to_int
+from steps.telemetry import traced
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 원본 CSV 컬럼 외에 적재 시 한 번만 만들어 두는 정규화 컬럼입니다.
+# (CSV로 내보낼 때는 제외됩니다)
+CATALOG_SCHEMA = {
+    '누적 관객수_int': 'Int64',           # '12만', '1.2억', '5,432' → 정수 (파싱 불가 시 <NA>)
+    '관객수_int': 'int64',               # 매력도 모델 feature: ML.ipynb 규칙대로 'N만'만 변환하고 나머지는 0
+    '개봉날짜': 'datetime64',             # 20230927.0 → 2023-09-27
+    '장르_list': 'list[str]',
+    '국가_list': 'list[str]',
+    'Gemini 키워드_list': 'list[str]',
+}
+LIST_SOURCES = {'장르_list': '장르', '국가_list': '국가', 'Gemini 키워드_list': 'Gemini 키워드'}
+
+
+def parse_audience_series(s):
+    """
+    '만', '억' 단위가 섞인 관객수 문자열을 한 번에 정수로 변환합니다.
+    step2_naverinfo.parse_audience_count와 같은 규칙을 str.extract로 벡터화했습니다.
+    """
+    text = s.astype('string').str.replace(',', '', regex=False).str.lower()
+    eok = pd.to_numeric(text.str.extract(r'(\d+\.?\d*)억', expand=False), errors='coerce')
+    man = pd.to_numeric(text.str.extract(r'(\d+\.?\d*)만', expand=False), errors='coerce')
+    plain = pd.to_numeric(text.str.extract(r'(\d+)', expand=False), errors='coerce')
+    units = eok.fillna(0) * 100000000 + man.fillna(0) * 10000
+    value = units.where(units > 0, plain)
+    return np.floor(value).astype('Int64')
+
+
+def split_list_series(s):
+    """'드라마, 액션' 같은 쉼표 구분 문자열을 공백을 제거한 리스트로 바꿉니다."""
+    return s.map(lambda x: [t.strip() for t in x.split(',') if t.strip()] if isinstance(x, str) else [])
+
+
+def normalize_catalog(df):
+    """CATALOG_SCHEMA의 정규화 컬럼을 추가한 복사본을 반환합니다."""
+    df = df.copy()
+    df['누적 관객수_int'] = parse_audience_series(df['누적 관객수']) if '누적 관객수' in df else pd.array([pd.NA] * len(df), dtype='Int64')
+    df['관객수_int'] = audience_to_int(df['누적 관객수']) if '누적 관객수' in df else np.zeros(len(df), dtype=np.int64)
+    df['개봉날짜'] = pd.to_datetime(df['개봉일'], format='%Y%m%d', errors='coerce') if '개봉일' in df else pd.NaT
+    for col, source in LIST_SOURCES.items():
+        df[col] = split_list_series(df[source]) if source in df else [[] for _ in range(len(df))]
+    return df
+
+
+@traced('catalog.ingest_csv', rows_arg=None)
+def ingest_csv(csv_path):
+    """CSV를 읽어 정규화 컬럼을 붙입니다."""
+    return normalize_catalog(pd.read_csv(csv_path))
+
+
+def _tmp_path(path):
+    # 같은 파일을 여러 프로세스/스레드가 동시에 쓰더라도 임시 파일이 겹치지 않게 합니다.
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _fsync_dir(path):
+    # 이름 바꾸기(rename)까지 디스크에 남도록 폴더도 fsync합니다. (Windows는 지원하지 않아 건너뜁니다)
+    try:
+        fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, write):
+    """write(임시 경로)로 임시 파일을 쓰고 fsync한 뒤 한 번에 교체합니다. 읽는 쪽은 쓰다 만 파일을 보지 않습니다."""
+    tmp_path = _tmp_path(path)
+    try:
+        write(tmp_path)
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _fsync_dir(path)
+
+
+@traced('catalog.save')
+def save_catalog(df, path):
+    """
+    .feather(Arrow IPC, 비압축 → 메모리 매핑 가능) 또는 .parquet로 저장합니다.
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 쓰다 만 파일을 보지 않습니다.
+    """
+    out = df.reset_index(drop=True)
+    if path.endswith('.parquet'):
+        write_atomic(path, lambda tmp_path: out.to_parquet(tmp_path, index=False))
+    else:
+        write_atomic(path, lambda tmp_path: out.to_feather(tmp_path, compression='uncompressed'))
+
+
+@traced('catalog.load', rows_arg=None)
+def load_catalog(path, columns=None, memory_map=True):
+    """저장된 카탈로그를 읽습니다. columns로 필요한 컬럼만 읽을 수 있습니다."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns, memory_map=memory_map)
+    import pyarrow.feather as feather
+    return feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+
+@traced('catalog.export_csv')
+def export_csv(df, csv_path):
+    """정규화 컬럼을 뺀 원본 형식으로 CSV를 씁니다. (임시 파일 → 교체)"""
+    out = df.drop(columns=[c for c in CATALOG_SCHEMA if c in df.columns])
+    write_atomic(csv_path, lambda tmp_path: out.to_csv(tmp_path, index=False, encoding='utf-8-sig'))
+
+
+def store_path_for(csv_path, ext='.feather'):
+    return os.path.splitext(csv_path)[0] + ext
+
+
+def manifest_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + '.manifest.json'
+
+
+class DatasetLock:
+    """
+    데이터셋을 쓰는 쪽끼리만 잡는 파일 잠금입니다. (읽는 쪽은 잠그지 않습니다)
+    timeout초 안에 잡지 못하면 TimeoutError를 일으킵니다. (None이면 계속 기다립니다)
+    """
+
+    def __init__(self, csv_path, timeout=None):
+        self.path = os.path.splitext(csv_path)[0] + '.lock'
+        self.timeout = timeout
+        self._file = None
+
+    def _try_lock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+')
+        start = time.monotonic()
+        while not self._try_lock():
+            if self.timeout is not None and time.monotonic() - start >= self.timeout:
+                self._file.close()
+                raise TimeoutError(f"다른 작업이 데이터셋을 쓰고 있습니다: {self.path}")
+            time.sleep(0.1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+
+
+def read_manifest(csv_path):
+    """커밋 기록 {version, committed_at, rows}. 한 번도 커밋하지 않았으면 version 0"""
+    try:
+        with open(manifest_path_for(csv_path), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'version': 0}
+
+
+def dataset_version(csv_path):
+    """
+    읽는 쪽 캐시 키: (커밋 버전, CSV 수정 시각, CSV 크기). 파일이 없으면 None
+    CSV를 직접 고친 경우에도 바뀌도록 파일 정보를 함께 씁니다.
+    """
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return None
+    return read_manifest(csv_path)['version'], stat.st_mtime_ns, stat.st_size
+
+
+@traced('catalog.commit')
+def commit_dataset(df, csv_path, store_path=None, lock=True):
+    """
+    CSV와 카탈로그 파일을 각각 원자적으로 교체한 뒤 매니페스트의 버전을 1 올립니다. 새 버전을 반환합니다.
+    정규화 컬럼은 원본 컬럼에서 다시 만들어 저장하므로, 크롤링 등으로 원본 값이 바뀌었어도 어긋나지 않습니다.
+    lock=False는 호출하는 쪽이 이미 DatasetLock을 잡고 있을 때만 씁니다.
+    """
+    if lock:
+        with DatasetLock(csv_path):
+            return commit_dataset(df, csv_path, store_path, lock=False)
+    export_csv(df, csv_path)
+    try:
+        save_catalog(normalize_catalog(df), store_path or store_path_for(csv_path))
+    except ImportError:
+        pass  # pyarrow가 없으면 CSV만 저장합니다.
+    version = read_manifest(csv_path)['version'] + 1
+    manifest = {'version': version, 'committed_at': time.time(), 'rows': len(df)}
+    write_atomic(manifest_path_for(csv_path), lambda tmp_path: _write_json(tmp_path, manifest))
+    return version
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+@traced('catalog.load_or_ingest', rows_arg=None)
+def load_or_ingest(csv_path, store_path=None, columns=None):
+    """
+    카탈로그 파일이 CSV보다 최신이면 그대로 읽고, 아니면(없거나, 커밋이 CSV만 바꾸고 아직 카탈로그 파일을
+    바꾸기 전이거나, CSV를 직접 고친 경우) CSV를 정규화해 반환합니다. pyarrow가 없어도 CSV를 정규화해 반환합니다.
+    읽는 쪽은 잠그지 않으므로 여기서는 파일을 쓰지 않습니다. 카탈로그 파일은 commit_dataset만 씁니다.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    try:
+        import pyarrow
+    except ImportError:
+        pyarrow = None
+
+    if pyarrow is not None and os.path.exists(store_path) and os.path.getmtime(store_path) >= os.path.getmtime(csv_path):
+        return load_catalog(store_path, columns=columns)
+    df = ingest_csv(csv_path)
+    return df[columns] if columns else df
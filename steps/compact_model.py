@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+from steps.catalog_store import write_atomic
+from steps.features import AttractivenessFeatures, prepare_training_frame
+from steps.forest_engine import FlatForest
+from steps.telemetry import span, traced
+from steps.train import ENCODER_PATH, MODEL_PATH, MODELS_DIR, TRAINING_CSV, bucket_accuracy, smape
+
+COMPACT_DIR = os.path.join(MODELS_DIR, 'compact')
+
+# 후보 격자: (남길 트리 수, 최대 깊이, 저장 정밀도) / 증류 모델 (반복 수, 리프 수)
+TREE_COUNTS = (None, 100, 50, 25, 10)
+DEPTHS = (None, 12, 10, 8, 6)
+PRECISIONS = ('float32', 'uint16')
+DISTILL_GRID = ((100, 15), (300, 15), (300, 31))
+
+
+def holdout_split(df, test_size=0.2, seed=42):
+    """ML.ipynb와 같은 학습/테스트 분할 (현재 모델은 학습 분할로 학습되었습니다)"""
+    return train_test_split(df, test_size=test_size, random_state=seed)
+
+
+def evaluate(y_true, y_pred, reference=None):
+    result = {'smape': smape(y_true, y_pred), 'bucket_acc': bucket_accuracy(y_true, y_pred)}
+    if reference is not None:
+        # 현재 모델 예측과의 평균 상대 차이 (정확도 지표와 별개로 얼마나 같은 값을 내는지)
+        result['drift'] = float(np.mean(np.abs(y_pred - reference)) / max(np.mean(np.abs(reference)), 1e-8))
+    return result
+
+
+def greedy_trees(forest, x, k):
+    """
+    전체 숲의 예측(x 기준)에 가장 가깝게 되도록 트리를 하나씩 골라 k개의 트리 순번을 반환합니다.
+    x는 학습 분할이어야 테스트 분할의 정확도 평가에 영향을 주지 않습니다.
+    """
+    per_tree = np.stack([forest.subset([t]).predict(x) for t in range(len(forest.roots))])
+    target = per_tree.mean(axis=0)
+    chosen, total = [], np.zeros(len(target))
+    available = np.ones(len(per_tree), dtype=bool)
+    for n in range(1, k + 1):
+        errors = ((total + per_tree) / n - target) ** 2
+        errors = np.where(available, errors.mean(axis=1), np.inf)
+        best = int(np.argmin(errors))
+        chosen.append(best)
+        available[best] = False
+        total += per_tree[best]
+    return chosen
+
+
+def distill_frame(x, teacher, n_samples=20000, seed=0):
+    """
+    증류용 학습 데이터: 학습 분할의 행과, 열마다 학습 분할 값을 따로 복원 추출해 섞은 행에 현재 모델의 예측을 붙입니다.
+    실제 행은 전체 가중치의 절반이 되도록 가중치를 줍니다. (x, 목표값, 가중치)
+    """
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(x), size=(n_samples, x.shape[1]))
+    mixed = pd.DataFrame({col: x[col].to_numpy()[idx[:, j]] for j, col in enumerate(x.columns)})
+    x_all = pd.concat([x.reset_index(drop=True), mixed], ignore_index=True)
+    weights = np.concatenate([np.full(len(x), n_samples / len(x)), np.ones(n_samples)])
+    return x_all, teacher.predict(x_all), weights
+
+
+def forest_from_model(model, encoder=None, source=None):
+    """
+    트리 예측의 평균을 내는 모델(RandomForest/ExtraTrees, 이미 내보낸 FlatForest)이면 FlatForest를, 아니면 None을 반환합니다.
+    HistGB/xgboost/lightgbm처럼 트리 합으로 예측하는 모델은 트리 고르기/깊이 자르기를 할 수 없습니다.
+    source: sklearn 모델 파일 경로 (numba가 없을 때 내보낸 .npz가 대신 쓸 원본)
+    """
+    if isinstance(model, FlatForest):
+        return model
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        return FlatForest.from_sklearn(model, encoder, source=source)
+    return None
+
+
+def load_artifact(path):
+    if path.endswith('.npz'):
+        return FlatForest.load(path, mmap_mode='r')
+    return joblib.load(path)
+
+
+def measure(path, x, n_rows=10000, repeat=5, seed=0):
+    """파일 크기, 불러오기 시간, 한 행/여러 행 예측 시간을 잽니다. (각각 repeat번 중 중앙값)"""
+    load_s = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model = load_artifact(path)
+        load_s.append(time.perf_counter() - start)
+    batch = x.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    one = x.iloc[:1]
+    model.predict(one)  # numba JIT 컴파일 등 첫 호출 비용은 제외합니다.
+    single_s, batch_s = [], []
+    for _ in range(repeat * 10):
+        start = time.perf_counter()
+        model.predict(one)
+        single_s.append(time.perf_counter() - start)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_s.append(time.perf_counter() - start)
+    return model, {
+        'bytes': os.path.getsize(path),
+        'load_ms': float(np.median(load_s)) * 1000,
+        'predict_1_ms': float(np.median(single_s)) * 1000,
+        'predict_rows_per_s': n_rows / float(np.median(batch_s)),
+    }
+
+
+def passes(result, baseline, smape_tolerance=1.0, bucket_tolerance=0.0, max_drift=0.1):
+    """
+    정확도 기준: SMAPE가 현재 모델보다 smape_tolerance(%p) 넘게 나빠지지 않고, 구간 정확도가 bucket_tolerance 넘게
+    떨어지지 않으며, 현재 모델 예측과의 평균 상대 차이가 max_drift 이하 (테스트 분할이 작아 우연히 통과하는 것을 막습니다)
+    """
+    return (result['smape'] <= baseline['smape'] + smape_tolerance
+            and result['bucket_acc'] >= baseline['bucket_acc'] - bucket_tolerance
+            and (max_drift is None or result['drift'] <= max_drift))
+
+
+def forest_candidates(forest, x_train, tree_counts=TREE_COUNTS, depths=DEPTHS, precisions=PRECISIONS):
+    """(이름, FlatForest, 저장 정밀도)를 차례로 만듭니다. 트리 고르기는 트리 수마다 한 번만 합니다."""
+    for k in tree_counts:
+        if k is None or k >= len(forest.roots):
+            base, k_name = forest, 'all'
+        else:
+            base, k_name = forest.subset(greedy_trees(forest, x_train, k)), f'k{k}'
+        for depth in depths:
+            pruned = base if depth is None or depth >= base.max_depth else base.prune(depth)
+            for precision in precisions:
+                yield f"flat_{k_name}_d{depth or 'full'}_{precision}", pruned, precision
+
+
+@traced('compact.run', rows_arg=None)
+def compact(csv_path=TRAINING_CSV, model_path=MODEL_PATH, encoder_path=ENCODER_PATH, out_dir=COMPACT_DIR,
+            smape_tolerance=1.0, bucket_tolerance=0.0, max_drift=0.1, seed=42, on_result=None):
+    """
+    현재 매력도 모델을 줄인 후보(트리 고르기, 깊이 자르기, float32/16비트 저장, HistGB 증류)를 만들어
+    ML.ipynb 테스트 분할에서 정확도 기준을 확인하고 크기/불러오기/예측 시간을 잽니다.
+    현재 모델이 트리 배깅 모델이 아니면(forest_from_model이 None) 증류 후보만 만듭니다.
+    (현재 모델 결과, 후보 결과 리스트, 기준을 통과한 가장 작은 후보 또는 None)을 반환합니다.
+    """
+    df = prepare_training_frame(pd.read_csv(csv_path, encoding='utf-8'))
+    df_train, df_test = holdout_split(df, seed=seed)
+    encoder, model = joblib.load(encoder_path), load_artifact(model_path)
+    features = AttractivenessFeatures(encoder)
+    x_train = features.transform(df_train, use_cache=False)
+    x_test = features.transform(df_test, use_cache=False)
+    y_test = df_test['매력도'].to_numpy(dtype=float)
+    os.makedirs(out_dir, exist_ok=True)
+
+    _, stats = measure(model_path, x_test)
+    reference = model.predict(x_test)
+    baseline = dict(name='current', path=model_path, **stats, **evaluate(y_test, reference))
+
+    forest = forest_from_model(model, encoder, source=model_path)
+    results = []
+
+    def add(name, path):
+        loaded, stats = measure(path, x_test)
+        result = dict(name=name, path=path, **stats, **evaluate(y_test, loaded.predict(x_test), reference))
+        result['passed'] = passes(result, baseline, smape_tolerance, bucket_tolerance, max_drift)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    if forest is not None:
+        path = os.path.join(out_dir, 'flat_all_dfull_float64.npz')
+        forest.save(path)
+        add('flat_all_dfull_float64', path)
+        with span('compact.forest_candidates'):
+            for name, candidate, precision in forest_candidates(forest, x_train):
+                path = os.path.join(out_dir, f'{name}.npz')
+                candidate.save(path, precision=precision)
+                add(name, path)
+    with span('compact.distill'):
+        x_distill, y_distill, weights = distill_frame(x_train, model)
+        for max_iter, max_leaf_nodes in DISTILL_GRID:
+            student = HistGradientBoostingRegressor(max_iter=max_iter, max_leaf_nodes=max_leaf_nodes,
+                                                    random_state=seed)
+            student.fit(x_distill, y_distill, sample_weight=weights)
+            name = f'distill_hgb_{max_iter}x{max_leaf_nodes}'
+            path = os.path.join(out_dir, f'{name}.pkl')
+            joblib.dump(student, path)
+            add(name, path)
+
+    passed = [r for r in results if r['passed']]
+    best = min(passed, key=lambda r: (r['bytes'], r['smape'])) if passed else None
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'test_rows': len(df_test),
+        'smape_tolerance': smape_tolerance,
+        'bucket_tolerance': bucket_tolerance,
+        'max_drift': max_drift,
+        'model_type': type(model).__name__,
+        'forest_candidates': forest is not None,
+        'baseline': baseline,
+        'selected': best and best['name'],
+        'candidates': results,
+    }
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    write_atomic(os.path.join(out_dir, 'report.json'), write)
+    return baseline, results, best
+
+
+def ship(result, dst):
+    """고른 후보 파일을 dst로 원자적으로 복사합니다. (모델 레지스트리는 파일이 바뀌면 다시 불러옵니다)"""
+    write_atomic(dst, lambda tmp_path: shutil.copyfile(result['path'], tmp_path))
+
+
+def _line(r):
+    drift = f"{r['drift'] * 100:5.1f}%" if 'drift' in r else '    -'
+    mark = {True: '✅', False: '❌'}.get(r.get('passed'), '  ')
+    return (f"{mark} {r['name']:<28} {r['bytes'] / 1024:8,.0f}KB  불러오기 {r['load_ms']:7.2f}ms  "
+            f"1행 {r['predict_1_ms']:6.3f}ms  {r['predict_rows_per_s']:>10,.0f} rows/s  "
+            f"SMAPE {r['smape']:6.2f}%  구간 {r['bucket_acc']:.2f}  차이 {drift}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="매력도 예측 모델을 줄인 후보를 만들고 정확도 기준을 통과한 가장 작은 모델을 고릅니다.")
+    parser.add_argument('--csv', default=TRAINING_CSV)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--encoder', default=ENCODER_PATH)
+    parser.add_argument('--out', default=COMPACT_DIR, help="후보 파일과 report.json을 쓸 폴더")
+    parser.add_argument('--smape-tolerance', type=float, default=1.0, help="허용하는 SMAPE 증가 (%%p)")
+    parser.add_argument('--bucket-tolerance', type=float, default=0.0, help="허용하는 구간 정확도 감소")
+    parser.add_argument('--max-drift', type=float, default=0.1,
+                        help="현재 모델 예측과의 평균 상대 차이 상한 (음수면 확인하지 않음)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ship', default=None,
+                        help="고른 후보를 복사할 경로 (.npz면 파이프라인의 model_path로 그대로 쓸 수 있습니다)")
+    args = parser.parse_args()
+
+    model = load_artifact(args.model)
+    if forest_from_model(model) is None:
+        print(f"ℹ️ {type(model).__name__}은(는) 트리 배깅 모델이 아니어서 트리 고르기/깊이 자르기 없이 증류 후보만 만듭니다.")
+    max_drift = None if args.max_drift < 0 else args.max_drift
+    baseline, results, best = compact(args.csv, args.model, args.encoder, args.out, args.smape_tolerance,
+                                      args.bucket_tolerance, max_drift, args.seed, on_result=lambda r: print(_line(r)))
+    print(_line(baseline))
+    if best is None:
+        print("❌ 정확도 기준을 통과한 후보가 없습니다.")
+        raise SystemExit(1)
+    print(f"✅ 선택: {best['name']} ({best['bytes'] / 1024:,.0f}KB, 현재 모델의 {best['bytes'] / baseline['bytes']:.1%})")
+    if args.ship:
+        if os.path.splitext(args.ship)[1] != os.path.splitext(best['path'])[1]:
+            parser.error(f"--ship 확장자가 선택된 후보({os.path.basename(best['path'])})와 다릅니다.")
+        ship(best, args.ship)
+        print(f"✅ {args.ship}에 저장했습니다.")
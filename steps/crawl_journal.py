@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from steps.page_cache import normalize_title
+
+
+class CrawlJournal:
+    """
+    수집 결과를 한 줄에 하나씩 추가만 하는 JSONL 저널입니다.
+    결과는 메모리에 모았다가 flush_every개마다 또는 flush_interval초가 지나면 한 번에 기록(fsync)하므로,
+    중간에 중단되어도 마지막 flush까지의 결과는 남고 다시 실행하면 그 다음부터 이어서 수집합니다.
+    """
+
+    def __init__(self, path, flush_every=20, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._repair()
+
+    def _repair(self):
+        # 쓰는 도중 끊겨 줄바꿈 없이 남은 마지막 줄을 잘라내 다음 기록이 그 뒤에 붙지 않게 합니다.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def entries(self):
+        """기록된 결과 목록. 쓰다가 끊긴 마지막 줄은 무시합니다."""
+        if not os.path.exists(self.path):
+            return []
+        result = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return result
+
+    def done_titles(self):
+        return {normalize_title(e['title']) for e in self.entries()}
+
+    def record(self, title, values):
+        """values: {필드 컬럼명: 값}"""
+        with self._lock:
+            self._pending.append({'title': title, 'values': values, 'ts': time.time()})
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if len(self._pending) >= self.flush_every or due:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+    def remove(self):
+        """결과를 카탈로그에 합친 뒤 저널을 지웁니다."""
+        with self._lock:
+            self._pending = []
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def merge_results(df, entries, title_column='영화명'):
+    """
+    저널 결과를 제목 기준으로 DataFrame에 한 번에 합친 복사본을 반환합니다.
+    같은 제목이 여러 번 기록되었으면 마지막 결과를 쓰고, 컬럼마다 한 번의 대입으로 처리합니다.
+    """
+    df = df.copy()
+    latest = {}
+    for entry in entries:
+        latest.setdefault(normalize_title(entry['title']), {}).update(entry['values'])
+    if not latest:
+        return df
+    keys = df[title_column].map(normalize_title)
+    updates = pd.DataFrame.from_dict(latest, orient='index')
+    for col in updates.columns:
+        if col not in df.columns:
+            df[col] = np.nan
+        df[col] = df[col].astype(object)
+        values = keys.map(updates[col].dropna()).to_numpy()
+        hit = pd.notna(values)
+        df.loc[hit, col] = values[hit]
+    return df
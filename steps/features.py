@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OrdinalEncoder
+
+# 모델 입력 컬럼 (순서가 곧 모델의 feature 순서입니다)
+FEATURE_COLUMNS = ['장르', '감독', '제작사', '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)',
+                   '톤', '시대/배경', '주제', '개봉연도', '개봉월', '관객수_int']
+CATEGORICAL_COLUMNS = ['장르', '감독', '제작사', '톤', '시대/배경', '주제']
+NUMERIC_COLUMNS = ['실관람객 평점', '네티즌 평점', '네이버 관심도(찜)']
+# feature 계산에 쓰이는 원본 컬럼 (행 내용 해시의 기준)
+INPUT_COLUMNS = ['장르', '감독', '제작사', 'Gemini 키워드', '개봉일', '누적 관객수'] + NUMERIC_COLUMNS
+SALES_COLUMNS = ['온라인 판매실적(당월)', '온라인 판매실적(익월)', '온라인 판매실적(익익월)']
+# ML.ipynb에서 학습에 사용한 컬럼
+TRAINING_COLUMNS = ['영화명', '장르', '배우', '감독', '제작사', '상영시간', '개봉일', 'Gemini 키워드', '국가',
+                    '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)', '누적 관객수'] + SALES_COLUMNS
+
+
+def _column(df, col):
+    return df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+
+
+def _as_text(s):
+    """문자열이 아닌 값은 NaN으로 취급하는 텍스트 Series로 바꿉니다."""
+    if isinstance(s.dtype, pd.StringDtype):
+        return s  # 문자열 전용 dtype은 str 연산이 (pyarrow가 있으면) 네이티브로 처리됩니다.
+    s = s.astype('object')
+    try:
+        s.str
+    except AttributeError:  # 문자열이 하나도 없는 컬럼
+        return pd.Series(np.nan, index=s.index, dtype='object')
+    return s
+
+
+def _per_unique(s, func):
+    """
+    s의 고유값에만 func를 적용하고 결과를 원래 행으로 펼칩니다.
+    장르/감독/키워드처럼 반복이 많은 컬럼에서 문자열 연산 횟수를 고유값 수로 줄입니다.
+    """
+    codes, uniques = pd.factorize(s)
+    result = func(pd.Series(uniques, dtype=s.dtype if len(uniques) else 'object'))
+    taken = result.reindex(codes)   # 결측(-1)은 NaN이 됩니다.
+    taken.index = s.index
+    return taken
+
+
+def first_token(s):
+    """쉼표로 구분된 문자열의 첫 항목 (문자열이 아니면 NaN)"""
+    return _per_unique(s, lambda u: _as_text(u).str.extract(r'^([^,]*)', expand=False).astype('object'))
+
+
+def audience_to_int(s):
+    """ML.ipynb convert_audience_to_int 규칙의 벡터화 버전: '만'이 들어간 문자열만 변환하고 나머지는 0입니다."""
+    return _per_unique(s, _audience_to_int_unique).fillna(0).astype(np.int64)
+
+
+def _audience_to_int_unique(s):
+    text = _as_text(s).str.replace(',', '', regex=False)
+    has_man = text.str.contains('만', regex=False).fillna(False).astype(bool)
+    num = pd.to_numeric(text.str.replace('만', '', regex=False), errors='coerce')
+    value = np.trunc(num * 10000).where(has_man & num.notna(), 0)
+    return value.astype(np.int64)
+
+
+def release_dates(s):
+    """개봉일(20230927.0 등) → datetime (변환할 수 없으면 NaT)"""
+    return pd.to_datetime(s.fillna(0), format='%Y%m%d', errors='coerce')
+
+
+def release_year_month(date):
+    return date.dt.year.fillna(0).astype(int), date.dt.month.fillna(0).astype(int)
+
+
+def raw_features(df):
+    """
+    인코딩 전 feature 프레임을 만듭니다. (ML.ipynb 전처리와 같은 규칙)
+    행 단위 apply 대신 str.extract / to_numeric 등 벡터 연산만 사용합니다.
+    카탈로그 적재 시 만든 정규화 컬럼('개봉날짜', '관객수_int')이 있으면 그대로 쓰고, 없을 때만 원본을 파싱합니다.
+    """
+    x = pd.DataFrame(index=df.index)
+    x['장르'] = first_token(_column(df, '장르'))
+    x['감독'] = first_token(_column(df, '감독'))
+    x['제작사'] = first_token(_column(df, '제작사'))
+    for col in NUMERIC_COLUMNS:
+        x[col] = pd.to_numeric(_column(df, col), errors='coerce').fillna(0)
+    parts = _per_unique(_column(df, 'Gemini 키워드'), lambda u: _as_text(u).str.extract(
+        r'^([^,]*)(?:,([^,]*))?(?:,([^,]*))?').astype('object'))
+    x['톤'], x['시대/배경'], x['주제'] = parts[0], parts[1], parts[2]
+    date = df['개봉날짜'] if '개봉날짜' in df.columns else release_dates(_column(df, '개봉일'))
+    x['개봉연도'], x['개봉월'] = release_year_month(date)
+    if '관객수_int' in df.columns:
+        x['관객수_int'] = df['관객수_int'].astype(np.int64)
+    else:
+        x['관객수_int'] = audience_to_int(_column(df, '누적 관객수'))
+    return x[FEATURE_COLUMNS]
+
+
+def row_hashes(df):
+    """feature 계산에 쓰이는 원본 컬럼 기준의 행 내용 해시(uint64)"""
+    cols = pd.DataFrame({c: _column(df, c) for c in INPUT_COLUMNS}, index=df.index)
+    return pd.util.hash_pandas_object(cols, index=False).to_numpy()
+
+
+def attractiveness_target(df):
+    """온라인 판매실적 3개월 합계(매력도)를 계산합니다."""
+    total = 0
+    for col in SALES_COLUMNS:
+        total = total + pd.to_numeric(df[col].astype(str).str.replace(',', '', regex=False), errors='coerce').fillna(0).astype(int)
+    return total
+
+
+def prepare_training_frame(df):
+    """ML.ipynb와 같이 학습 컬럼만 남기고 결측 행을 제거한 뒤 '매력도'를 붙입니다."""
+    df = df[TRAINING_COLUMNS].dropna().copy()
+    df['매력도'] = attractiveness_target(df)
+    return df
+
+
+class AttractivenessFeatures:
+    """
+    학습(ML.ipynb)과 예측(step4_attractiveness)이 함께 쓰는 feature 변환기입니다.
+    - fit: 범주형 컬럼의 OrdinalEncoder를 학습합니다. (이미 학습된 encoder를 넘겨도 됩니다)
+    - transform: 범주형은 encoder.categories_ 기반 Categorical 코드로 변환하고 (미등록 값은 -1),
+      결과를 행 내용 해시로 캐시해 바뀌지 않은 행은 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, encoder=None, cache_size=1_000_000):
+        self.encoder = encoder
+        self.cache_size = cache_size
+        self._cache_keys = np.empty(0, dtype=np.uint64)
+        self._cache_values = np.empty((0, len(FEATURE_COLUMNS)))
+
+    def fit(self, df):
+        x = raw_features(df)
+        self.encoder = OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1)
+        self.encoder.fit(x[CATEGORICAL_COLUMNS])
+        self.clear_cache()
+        return self
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def clear_cache(self):
+        self._cache_keys = np.empty(0, dtype=np.uint64)
+        self._cache_values = np.empty((0, len(FEATURE_COLUMNS)))
+
+    def _encode(self, x):
+        x = x.copy()
+        for col, categories in zip(CATEGORICAL_COLUMNS, self.encoder.categories_):
+            dtype = pd.CategoricalDtype(categories=categories)
+            x[col] = pd.Categorical(x[col].astype('object'), dtype=dtype).codes.astype(float)
+        return x.astype(float)
+
+    def _store(self, keys, values):
+        keys, first = np.unique(keys, return_index=True)
+        values = values[first]
+        merged_keys = np.concatenate([self._cache_keys, keys])
+        merged_values = np.concatenate([self._cache_values, values])
+        if len(merged_keys) > self.cache_size:
+            # 캐시가 가득 차면 기존 항목을 비우고 새 항목만 남깁니다.
+            merged_keys, merged_values = keys[-self.cache_size:], values[-self.cache_size:]
+        order = np.argsort(merged_keys, kind='stable')
+        self._cache_keys, self._cache_values = merged_keys[order], merged_values[order]
+
+    def _lookup(self, keys):
+        if len(self._cache_keys) == 0:
+            return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=np.int64)
+        pos = np.searchsorted(self._cache_keys, keys).clip(max=len(self._cache_keys) - 1)
+        return self._cache_keys[pos] == keys, pos
+
+    def transform(self, df, use_cache=True):
+        if self.encoder is None:
+            raise ValueError("fit()을 먼저 호출하거나 학습된 encoder를 넘겨주세요.")
+        if not use_cache or self.cache_size <= 0:
+            return self._encode(raw_features(df))
+
+        keys = row_hashes(df)
+        hit, pos = self._lookup(keys)
+        values = np.empty((len(df), len(FEATURE_COLUMNS)))
+        values[hit] = self._cache_values[pos[hit]]
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            computed = self._encode(raw_features(df.iloc[miss])).to_numpy()
+            values[miss] = computed
+            self._store(keys[miss], computed)
+        return pd.DataFrame(values, index=df.index, columns=FEATURE_COLUMNS)
@@ -0,0 +1,396 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba가 없으면 NumPy 벡터 연산 경로를 사용합니다.
+    njit = None
+
+
+# numba 경로에서 쓰는 노드 레코드 (16바이트: 한 노드의 비교에 필요한 값이 한 캐시 라인 안에 있습니다)
+NODE_DTYPE = np.dtype([('threshold', np.float32), ('feature', np.int32), ('left', np.int32), ('right', np.int32)])
+
+# numba 경로에서 한 트리를 동시에 내려가는 행 수: 서로 독립인 비교 8개를 번갈아 처리해 메모리 지연을 겹칩니다.
+LANES = 8
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _traverse_numba(X, nodes, value, roots, depths, block):
+        # 행 블록 단위로 나눠 병렬 처리하고, 블록 안에서는 트리 하나를 끝까지 돈 뒤 다음 트리로 넘어갑니다.
+        # 리프는 양쪽 자식이 자기 자신이므로 트리 깊이만큼 분기 없이 내려가면 모든 행이 리프에 닿습니다.
+        n = X.shape[0]
+        out = np.zeros(n)
+        for b in prange((n + block - 1) // block):
+            start = b * block
+            stop = min(start + block, n)
+            lanes = np.empty(LANES, dtype=np.int32)
+            for t in range(roots.shape[0]):
+                root = roots[t]
+                i = start
+                while i + LANES <= stop:
+                    lanes[:] = root
+                    for _ in range(depths[t]):
+                        for j in range(LANES):
+                            rec = nodes[lanes[j]]
+                            lanes[j] = rec.left if X[i + j, rec.feature] <= rec.threshold else rec.right
+                    for j in range(LANES):
+                        out[i + j] += value[lanes[j]]
+                    i += LANES
+                for k in range(i, stop):
+                    node = root
+                    for _ in range(depths[t]):
+                        rec = nodes[node]
+                        node = rec.left if X[k, rec.feature] <= rec.threshold else rec.right
+                    out[k] += value[node]
+        return out / roots.shape[0]
+
+
+class FlatForest:
+    """
+    학습된 RandomForestRegressor(와 OrdinalEncoder 범주 목록)를 연속된 NumPy 배열로 펼친 추론 엔진입니다.
+    numba가 있으면 JIT 컴파일된 루프로 트리를 내려갑니다. numba가 없으면 원본 sklearn 추정기(source)가 있을 때
+    그 predict를 쓰고, 없을 때(잘라낸 후보 등)만 입력을 임계값 구간(bin) 번호로 바꿔 벡터 연산으로 내려갑니다.
+    .npz로 저장하면 mmap으로 불러올 수 있습니다.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 feature_names=None, categories=None, source=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.feature_names = feature_names
+        # AttractivenessFeatures가 encoder 대신 그대로 쓸 수 있도록 categories_ 이름을 맞춥니다.
+        self.categories_ = categories
+        # 이 배열과 예측이 같은 sklearn 추정기 (객체 또는 joblib 파일 경로). numba가 없을 때 predict가 대신 씁니다.
+        self.source = source
+
+    @classmethod
+    def from_sklearn(cls, model, encoder=None, source=None):
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+        feature, threshold, left, right, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            idx = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left < 0
+            # 리프는 자기 자신을 가리키게 합니다. (left[node] == node 로 리프를 판별)
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, idx, tree.children_left + offset).astype(np.int32))
+            right.append(np.where(is_leaf, idx, tree.children_right + offset).astype(np.int32))
+            value.append(tree.value[:, 0, 0])
+        return cls(
+            np.concatenate(feature), np.concatenate(threshold),
+            np.concatenate(left), np.concatenate(right), np.concatenate(value),
+            offsets.astype(np.int32), max(t.max_depth for t in trees),
+            feature_names=list(getattr(model, 'feature_names_in_', [])) or None,
+            categories=None if encoder is None else [np.asarray(c) for c in encoder.categories_],
+            source=model if source is None else source,
+        )
+
+    def save(self, path, precision='float64'):
+        """
+        precision='float64'은 학습된 값 그대로, 'float32'는 임계값/리프 값을 float32로, 노드 번호와 feature를
+        가장 작은 정수형으로 저장합니다. (임계값은 float32 입력 기준으로 비교 결과가 같도록 내림합니다)
+        'uint16'은 여기에 리프 값을 (최솟값, 간격)으로 16비트 양자화해 저장합니다.
+        """
+        arrays = dict(feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                      value=self.value, roots=self.roots, max_depth=np.array(self.max_depth))
+        if precision != 'float64':
+            index_dtype = np.int16 if len(self.feature) <= np.iinfo(np.int16).max else np.int32
+            arrays.update(feature=self.feature.astype(np.uint8 if self.feature.max() < 256 else np.int32),
+                          threshold=self._float32_thresholds(), left=self.left.astype(index_dtype),
+                          right=self.right.astype(index_dtype), value=np.asarray(self.value, dtype=np.float32))
+        if precision == 'uint16':
+            lo, hi = float(np.min(self.value)), float(np.max(self.value))
+            scale = (hi - lo) / np.iinfo(np.uint16).max or 1.0
+            del arrays['value']
+            arrays.update(value_q=np.round((np.asarray(self.value) - lo) / scale).astype(np.uint16),
+                          value_lo=np.array(lo), value_scale=np.array(scale))
+        if self.feature_names:
+            arrays['feature_names'] = np.array(self.feature_names, dtype=str)
+        for i, cats in enumerate(self.categories_ or []):
+            arrays[f'categories_{i}'] = np.asarray(cats, dtype=str)
+        if precision == 'float64' and isinstance(self.source, str):
+            arrays['source'] = np.array(self.source)
+        np.savez(path, **arrays)   # 비압축이어야 mmap으로 불러올 수 있습니다.
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        data = np.load(path, mmap_mode=mmap_mode)
+        n_cats = sum(1 for k in data.files if k.startswith('categories_'))
+        if 'value_q' in data.files:   # 16비트 양자화된 리프 값은 불러올 때 한 번 복원합니다.
+            value = data['value_lo'] + data['value_q'] * data['value_scale']
+        else:
+            value = data['value']
+        return cls(
+            data['feature'], data['threshold'], data['left'], data['right'], value, data['roots'],
+            data['max_depth'],
+            feature_names=data['feature_names'].tolist() if 'feature_names' in data.files else None,
+            categories=[data[f'categories_{i}'].astype(object) for i in range(n_cats)] or None,
+            source=str(data['source']) if 'source' in data.files else None,
+        )
+
+    def subset(self, trees):
+        """trees(트리 순번 목록)의 트리만 남긴 새 FlatForest (예측은 남은 트리의 평균)"""
+        return self._rebuild([self.roots[t] for t in trees])
+
+    def prune(self, max_depth):
+        """max_depth 깊이의 노드를 리프로 만들어 그 아래를 잘라낸 새 FlatForest (노드 값은 학습 샘플 평균)"""
+        return self._rebuild(self.roots, max_depth)
+
+    def _rebuild(self, roots, max_depth=None):
+        # 선택한 트리를 너비 우선 순서로 다시 번호를 매겨 복사합니다. 잘린 노드는 자기 자신을 가리키는 리프가 됩니다.
+        nodes, left, right, new_roots, depth_max = [], [], [], [], 0
+        for root in roots:
+            base = len(nodes)
+            new_roots.append(base)
+            queue, depths, pos = [int(root)], [0], 0
+            while pos < len(queue):
+                node, depth = queue[pos], depths[pos]
+                if self.left[node] == node or (max_depth is not None and depth >= max_depth):
+                    left.append(base + pos)
+                    right.append(base + pos)
+                else:
+                    left.append(base + len(queue))
+                    right.append(base + len(queue) + 1)
+                    queue += [int(self.left[node]), int(self.right[node])]
+                    depths += [depth + 1, depth + 1]
+                pos += 1
+            nodes += queue
+            depth_max = max(depth_max, max(depths))
+        nodes = np.asarray(nodes, dtype=np.int64)
+        left, right = np.asarray(left, dtype=np.int32), np.asarray(right, dtype=np.int32)
+        is_leaf = left == np.arange(len(nodes))
+        return FlatForest(
+            np.where(is_leaf, 0, self.feature[nodes]).astype(np.int32),
+            np.where(is_leaf, np.inf, self.threshold[nodes]),
+            left, right, np.asarray(self.value[nodes], dtype=np.float64), np.asarray(new_roots, dtype=np.int32),
+            depth_max, feature_names=self.feature_names, categories=self.categories_,
+        )
+
+    def _float32_thresholds(self):
+        # float32 x에 대해 x <= t(float64) ⇔ x <= (t 이하의 가장 큰 float32)
+        t32 = self.threshold.astype(np.float32)
+        return np.where(t32.astype(np.float64) > self.threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+    def _tree_depths(self):
+        """트리마다 루트에서 가장 깊은 리프까지의 단계 수"""
+        if getattr(self, '_depths', None) is None:
+            depths = np.zeros(len(self.roots), dtype=np.int32)
+            node, tree, level = np.asarray(self.roots, dtype=np.int64), np.arange(len(self.roots)), 0
+            while len(node):
+                internal = self.left[node] != node
+                node, tree, level = node[internal], tree[internal], level + 1
+                depths[tree] = level
+                node, tree = np.r_[self.left[node], self.right[node]], np.r_[tree, tree]
+            self._depths = depths
+        return self._depths
+
+    def _estimator(self):
+        # source가 파일 경로면 처음 필요할 때 한 번 불러옵니다. 파일이 없으면 None
+        if isinstance(self.source, str):
+            if not os.path.exists(self.source):
+                return None
+            import joblib
+            self.source = joblib.load(self.source)
+        return self.source
+
+    def _node_table(self):
+        if getattr(self, '_nodes', None) is None:
+            nodes = np.empty(len(self.feature), dtype=NODE_DTYPE)
+            nodes['threshold'] = self._float32_thresholds()
+            nodes['feature'], nodes['left'], nodes['right'] = self.feature, self.left, self.right
+            self._nodes = nodes
+        return self._nodes
+
+    def _bin_tables(self):
+        """
+        feature별 임계값을 float32 기준으로 정렬·중복 제거한 표와, 각 노드 임계값의 순번(bin)을 만듭니다.
+        float32 입력 x에 대해 x <= t  ⇔  searchsorted(표, x) <= bin(t) 이므로 비교를 정수로 바꿀 수 있습니다.
+        """
+        if getattr(self, '_bins', None) is None:
+            t32 = self._float32_thresholds()
+            n_features = int(self.feature.max()) + 1
+            tables, node_bin = [], np.zeros(len(self.feature), dtype=np.int32)
+            for f in range(n_features):
+                mask = (self.feature == f) & np.isfinite(self.threshold)
+                table = np.unique(t32[mask])
+                node_bin[mask] = np.searchsorted(table, t32[mask])
+                tables.append(table)
+            # 리프(임계값 inf)는 항상 왼쪽(자기 자신)으로 가도록 가장 큰 bin을 줍니다.
+            node_bin[~np.isfinite(self.threshold)] = np.iinfo(np.int32).max
+            self._bins = (tables, node_bin)
+        return self._bins
+
+    def _binned(self, X):
+        tables, _ = self._bin_tables()
+        out = np.zeros((len(X), len(tables)), dtype=np.int32)
+        for f, table in enumerate(tables):
+            out[:, f] = np.searchsorted(table, X[:, f], side='left')
+        # NaN은 sklearn처럼 비교가 거짓(오른쪽)이 되도록 가장 큰 bin보다 크게 둡니다.
+        out[np.isnan(X[:, :len(tables)])] = np.iinfo(np.int32).max
+        return out
+
+    def _predict_unique(self, B):
+        """bin 행렬 B의 각 행을 트리별로 내려가며 리프 값을 더합니다. 리프에 도달한 행은 계산에서 빠집니다."""
+        _, node_bin = self._bin_tables()
+        total = np.zeros(len(B))
+        for root in self.roots:
+            rows = np.arange(len(B))
+            node = np.full(len(B), root, dtype=np.int32)
+            leaf_value = np.empty(len(B))
+            while len(rows):
+                is_leaf = self.left[node] == node
+                if is_leaf.any():
+                    leaf_value[rows[is_leaf]] = self.value[node[is_leaf]]
+                    rows, node = rows[~is_leaf], node[~is_leaf]
+                go_left = B[rows, self.feature[node]] <= node_bin[node]
+                node = np.where(go_left, self.left[node], self.right[node])
+            total += leaf_value
+        return total / len(self.roots)
+
+    def predict(self, X, use_numba=True, block=256):
+        """
+        sklearn과 같이 입력을 float32로 변환한 뒤 트리 평균을 반환합니다.
+        numba가 있으면 JIT 경로를, 없으면 원본 sklearn 추정기의 predict를 쓰고, 둘 다 없을 때만 NumPy 경로를 씁니다.
+        """
+        if isinstance(X, pd.DataFrame) and self.feature_names:
+            X = X[self.feature_names]
+        if use_numba and njit is None:
+            estimator = self._estimator()
+            if estimator is not None:
+                return estimator.predict(X)
+        if isinstance(X, pd.DataFrame):
+            X = X.to_numpy()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if use_numba and njit is not None:
+            return _traverse_numba(X, self._node_table(), np.asarray(self.value), np.asarray(self.roots),
+                                   self._tree_depths(), block)
+        B = self._binned(X)
+        # 모든 feature의 bin이 같은 행은 예측값도 같으므로 고유한 bin 행만 계산합니다.
+        uniq, inverse = np.unique(B, axis=0, return_inverse=True)
+        return self._predict_unique(uniq)[inverse.ravel()]
+
+
+_worker_forest = None
+
+
+def _init_worker(path):
+    global _worker_forest
+    _worker_forest = FlatForest.load(path, mmap_mode='r')
+
+
+def _predict_shard(X):
+    return _worker_forest.predict(X)
+
+
+def predict_parallel(path, X, n_jobs=None, shard_size=50000):
+    """
+    저장된 FlatForest(.npz)를 워커 프로세스마다 mmap으로 열어 행을 나눠 예측합니다.
+    배열 페이지는 OS 페이지 캐시를 통해 워커 간에 공유됩니다.
+    """
+    forest = FlatForest.load(path)
+    if isinstance(X, pd.DataFrame):
+        X = (X[forest.feature_names] if forest.feature_names else X).to_numpy()
+    X = np.asarray(X, dtype=np.float32)
+    shards = [X[i:i + shard_size] for i in range(0, len(X), shard_size)]
+    if len(shards) <= 1 or n_jobs == 1:
+        return forest.predict(X)
+    # numba 스레드 풀이 떠 있는 프로세스를 fork하면 교착될 수 있어 spawn으로 워커를 띄웁니다.
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=_init_worker, initargs=(path,),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        return np.concatenate(list(pool.map(_predict_shard, shards)))
+
+
+def export_model(model_path, encoder_path, out_path):
+    """joblib으로 저장된 모델/인코더를 FlatForest .npz로 내보냅니다."""
+    import joblib
+    forest = FlatForest.from_sklearn(joblib.load(model_path), joblib.load(encoder_path), source=model_path)
+    forest.save(out_path)
+    return forest
+
+
+def _best_time(fn, repeat):
+    # repeat번 실행해 (마지막 결과, 가장 짧은 시간)을 반환합니다.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def benchmark(model_path, encoder_path, flat_path, n_rows=100000, n_jobs=None, seed=0, repeat=3):
+    """sklearn 추정기와 FlatForest의 로딩 시간, 처리량(rows/s, repeat번 중 최고), 예측 오차를 비교합니다."""
+    import joblib
+    from steps.features import AttractivenessFeatures
+
+    start = time.perf_counter()
+    model = joblib.load(model_path)
+    sk_load = time.perf_counter() - start
+    start = time.perf_counter()
+    forest = FlatForest.load(flat_path)
+    flat_load = time.perf_counter() - start
+
+    # 실제 카탈로그 행을 복원 추출한 뒤 수치 feature에 잡음을 넣어 서로 다른 행을 만듭니다.
+    rng = np.random.default_rng(seed)
+    catalog = pd.read_csv("./data/영화DB(임시).csv")
+    rows = catalog.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    X = AttractivenessFeatures(joblib.load(encoder_path)).transform(rows, use_cache=False)
+    X['실관람객 평점'] = rng.uniform(0, 10, n_rows).round(3)
+    X['네티즌 평점'] = rng.uniform(0, 10, n_rows).round(2)
+    X['네이버 관심도(찜)'] = rng.integers(0, 30000, n_rows)
+    X['관객수_int'] = rng.integers(0, 200, n_rows) * 10000
+
+    expected, sk_time = _best_time(lambda: model.predict(X), repeat)
+    forest.predict(X.iloc[:10])  # numba JIT 컴파일은 측정에서 제외합니다.
+    got, flat_time = _best_time(lambda: forest.predict(X), repeat)
+    got_numpy, numpy_time = _best_time(lambda: forest.predict(X, use_numba=False), repeat)
+    got_parallel, parallel_time = _best_time(lambda: predict_parallel(flat_path, X, n_jobs=n_jobs), repeat)
+
+    return {
+        'rows': n_rows,
+        'sklearn_load_s': sk_load,
+        'flat_load_s': flat_load,
+        'sklearn_rows_per_s': n_rows / sk_time,
+        'flat_rows_per_s': n_rows / flat_time,
+        'flat_numpy_rows_per_s': n_rows / numpy_time,
+        'flat_parallel_rows_per_s': n_rows / parallel_time,
+        'max_abs_diff': float(max(np.abs(expected - got).max(), np.abs(expected - got_numpy).max(),
+                                  np.abs(expected - got_parallel).max())),
+        'sklearn_bytes': os.path.getsize(model_path),
+        'flat_bytes': os.path.getsize(flat_path),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="랜덤 포레스트 모델을 평면 배열로 내보내고 벤치마크합니다.")
+    parser.add_argument('command', choices=['export', 'benchmark'])
+    parser.add_argument('--model', default='./steps/rf_weighted_model.pkl')
+    parser.add_argument('--encoder', default='./steps/ordinal_encoder.pkl')
+    parser.add_argument('--out', default='./steps/rf_weighted_model.npz')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_model(args.model, args.encoder, args.out)
+        print(f"✅ '{args.out}' 파일로 내보냈습니다.")
+    else:
+        if not os.path.exists(args.out):
+            export_model(args.model, args.encoder, args.out)
+        for key, val in benchmark(args.model, args.encoder, args.out, args.rows, args.jobs,
+                                  repeat=args.repeat).items():
+            print(f"{key}: {val:,.6g}" if isinstance(val, float) else f"{key}: {val:,}")
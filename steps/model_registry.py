@@ -0,0 +1,68 @@
+import hashlib
+import os
+import threading
+
+import joblib
+
+from steps.forest_engine import FlatForest
+from steps.telemetry import span
+
+
+class ModelRegistry:
+    """
+    joblib로 저장된 모델/인코더를 프로세스당 한 번만 불러와 재사용하는 캐시입니다.
+    파일의 수정 시각·크기(check_hash=True면 내용 해시까지)가 바뀌면 다시 불러옵니다.
+    mmap_mode='r'로 불러오면 numpy 배열이 메모리 매핑되어 여러 워커 프로세스가 페이지를 공유합니다.
+    """
+
+    def __init__(self, mmap_mode=None, check_hash=False):
+        self.mmap_mode = mmap_mode
+        self.check_hash = check_hash
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _signature(self, path):
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+        if self.check_hash:
+            with open(path, 'rb') as f:
+                sig += (hashlib.sha1(f.read()).hexdigest(),)
+        return sig
+
+    def get(self, path, mmap_mode=None):
+        """path의 객체를 반환합니다. 처음이거나 파일이 바뀐 경우에만 joblib.load를 호출합니다."""
+        key = os.path.abspath(path)
+        mmap_mode = mmap_mode or self.mmap_mode
+        sig = self._signature(key)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == sig and cached[1] == mmap_mode:
+                return cached[2]
+            with span('model.load', path=os.path.basename(key)):
+                if key.endswith('.npz'):
+                    # forest_engine으로 내보낸 평면 배열 모델 (인코더 범주 목록 포함)
+                    obj = FlatForest.load(key, mmap_mode=mmap_mode or 'r')
+                else:
+                    obj = joblib.load(key, mmap_mode=mmap_mode)
+            self._cache[key] = (sig, mmap_mode, obj)
+            return obj
+
+    def invalidate(self, path=None):
+        """path(없으면 전체)의 캐시를 비웁니다."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(path), None)
+
+
+_default_registry = ModelRegistry()
+
+
+def get_registry():
+    """프로세스 전역에서 공유하는 기본 레지스트리를 반환합니다."""
+    return _default_registry
+
+
+def load_model(path, mmap_mode=None):
+    return _default_registry.get(path, mmap_mode=mmap_mode)
@@ -0,0 +1,273 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+# `python steps/naver_crawler.py`로 직접 실행해도 steps 패키지를 찾도록 상위 폴더를 sys.path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from steps.crawl_journal import CrawlJournal, merge_results
+from steps.naver_extract import parse_movie_page
+from steps.page_cache import CachedFetcher, PageCache, ReplayFetcher, normalize_title
+from steps.telemetry import traced
+
+SEARCH_URL = "https://search.naver.com/search.naver"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+title_column = '영화명'
+netizen_rating_column = '네티즌 평점'
+interest_column = '네이버 관심도(찜)'
+audience_column = '누적 관객수'
+# parse_movie_page 결과 순서와 같은 (캐시 필드명, 컬럼) 목록
+FIELD_COLUMNS = [('rating', netizen_rating_column), ('interest', interest_column), ('audience', audience_column)]
+FAILED_VALUES = ('Error',)
+
+
+def search_url(title, base_url=SEARCH_URL):
+    return f"{base_url}?query={quote(title + ' 영화')}"
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 토큰이 채워지는 버킷입니다. (최대 capacity개)
+    모든 워커가 하나를 공유하므로 워커 수와 관계없이 전체 요청 속도가 rate를 넘지 않습니다.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """토큰 하나를 얻을 때까지 기다립니다. timeout 안에 얻지 못하면 False를 반환합니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class HttpFetcher:
+    """
+    브라우저 없이 urllib로 검색 결과 HTML을 가져옵니다.
+    base_url을 바꾸면 저장된 HTML을 돌려주는 로컬 대체 서버로 요청할 수 있습니다.
+    """
+
+    def __init__(self, base_url=SEARCH_URL, timeout=10):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def fetch(self, title):
+        request = Request(search_url(title, self.base_url), headers={'User-Agent': USER_AGENT})
+        with urlopen(request, timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset() or 'utf-8'
+            return response.read().decode(charset, errors='replace')
+
+    def close(self):
+        pass
+
+
+class SeleniumFetcher:
+    """워커 스레드마다 headless Chrome을 하나씩 띄워(처음 요청할 때) 페이지를 가져옵니다."""
+
+    def __init__(self, base_url=SEARCH_URL, timeout=5):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _driver(self):
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            from selenium import webdriver
+            options = webdriver.ChromeOptions()
+            options.add_argument('headless')
+            options.add_argument('window-size=1920x1080')
+            options.add_argument(f"user-agent={USER_AGENT}")
+            options.add_argument("--log-level=3")
+            driver = webdriver.Chrome(options=options)
+            driver.set_page_load_timeout(self.timeout * 2)
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def fetch(self, title):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        driver = self._driver()
+        driver.get(search_url(title, self.base_url))
+        # 영화 정보 섹션이 화면에 나타날 때까지 최대 timeout초간 기다립니다.
+        WebDriverWait(driver, self.timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.sc_new.cs_common_module"))
+        )
+        return driver.page_source
+
+    def close(self):
+        with self._lock:
+            for driver in self._drivers:
+                driver.quit()
+            self._drivers.clear()
+
+
+def crawl_titles(titles, fetcher, n_workers=4, rate=1.0, burst=1):
+    """
+    titles를 n_workers개의 스레드로 나눠 수집하고, 끝나는 순서대로 (순번, 제목, (평점, 관심도, 관객수))를 내보냅니다.
+    요청마다 공유 토큰 버킷을 거치므로 초당 요청 수는 워커 수와 관계없이 rate로 제한되고,
+    페이지 로딩을 기다리는 시간만 워커끼리 겹쳐 처리량이 늘어납니다.
+    """
+    bucket = TokenBucket(rate, burst) if rate else None   # rate=None이면 제한하지 않습니다. (캐시 재생 등)
+
+    def work(title):
+        # 캐시에서 바로 나오는 페이지는 서버에 요청하지 않으므로 토큰을 쓰지 않습니다.
+        if bucket and not (hasattr(fetcher, 'is_cached') and fetcher.is_cached(title)):
+            bucket.acquire()
+        try:
+            return parse_movie_page(fetcher.fetch(title))
+        except Exception as e:
+            print(f"  [오류] '{title}' 처리 중 페이지 로딩 또는 요소 찾기 실패: {e}")
+            return 'Error', 'Error', 'Error'
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        futures = {pool.submit(work, title): (i, title) for i, title in enumerate(titles)}
+        try:
+            for future in as_completed(futures):
+                i, title = futures[future]
+                yield i, title, future.result()
+        finally:
+            # 중간에 멈추면(Ctrl-C 등) 아직 시작하지 않은 요청은 취소합니다.
+            for future in futures:
+                future.cancel()
+
+
+def fields_to_crawl(df, cache=None):
+    """
+    행마다 새로 받아야 할 필드 목록을 반환합니다.
+    평점이 비었거나 'Error'인 행은 모든 필드, cache가 주어지면 TTL이 지난 필드가 있는 행은 그 필드만 포함합니다.
+    """
+    all_fields = [field for field, _ in FIELD_COLUMNS]
+    rating = df[netizen_rating_column] if netizen_rating_column in df.columns else pd.Series(np.nan, index=df.index)
+    missing = (rating.isna() | rating.isin(FAILED_VALUES)).to_numpy()
+    result = []
+    for title, is_missing in zip(df[title_column], missing):
+        if is_missing:
+            result.append(all_fields)
+        elif cache is not None:
+            result.append(cache.stale_fields(title))
+        else:
+            result.append([])
+    return result
+
+
+@traced('crawl.crawl_dataframe')
+def crawl_dataframe(df, fetcher, n_workers=4, rate=1.0, burst=1, on_result=None, fields=None, journal=None):
+    """
+    수집이 필요한 제목만 동시에 수집하고, 모은 결과를 마지막에 한 번에 DataFrame에 합친 복사본을 반환합니다.
+    fields는 행별로 갱신할 필드 목록입니다. (기본: 평점이 비어 있는 행의 모든 필드, fields_to_crawl 참고)
+    journal(CrawlJournal)이 주어지면 결과를 도착하는 대로 저널에 기록하고, 이미 기록된 제목은 건너뜁니다.
+    on_result(완료 수, 전체 수, 제목, 결과)가 주어지면 결과마다 호출합니다.
+    """
+    df = df.copy()
+    for col in [netizen_rating_column, interest_column, audience_column]:
+        if col not in df.columns: df[col] = np.nan
+        df[col] = df[col].astype(object)
+
+    fields = fields if fields is not None else fields_to_crawl(df)
+    done = journal.done_titles() if journal is not None else set()
+    # 같은 제목은 한 번만 수집합니다. (필요한 필드는 합칩니다)
+    wanted = {}
+    for title, row_fields in zip(df[title_column], fields):
+        key = normalize_title(title)
+        if row_fields and key not in done:
+            wanted.setdefault(key, (title, set()))[1].update(row_fields)
+    titles = [title for title, _ in wanted.values()]
+
+    collected = []
+    columns = dict(FIELD_COLUMNS)
+    try:
+        for count, (i, title, result) in enumerate(crawl_titles(titles, fetcher, n_workers, rate, burst), 1):
+            row_fields = wanted[normalize_title(title)][1]
+            # 페이지를 새로 받았더라도 요청한 필드만 덮어씁니다.
+            values = {columns[field]: value for (field, _), value in zip(FIELD_COLUMNS, result) if field in row_fields}
+            if journal is not None:
+                journal.record(title, values)
+            else:
+                collected.append({'title': title, 'values': values})
+            if on_result:
+                on_result(count, len(titles), title, result)
+    finally:
+        if journal is not None:
+            journal.flush()
+
+    if journal is not None:
+        collected = journal.entries()
+    return merge_results(df, collected, title_column)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="네이버 검색 결과에서 평점/관심도/관객수를 동시에 수집합니다.")
+    parser.add_argument('input_csv')
+    parser.add_argument('output_csv')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=1.0, help="전체 초당 요청 수 (토큰 버킷)")
+    parser.add_argument('--timeout', type=float, default=10, help="요청당 제한 시간(초)")
+    parser.add_argument('--base-url', default=SEARCH_URL, help="검색 URL (로컬 대체 서버 주소로 바꿀 수 있습니다)")
+    parser.add_argument('--selenium', action='store_true', help="HTTP 대신 워커마다 headless Chrome을 사용합니다.")
+    parser.add_argument('--cache-dir', default=None, help="수집한 페이지를 저장/재사용할 캐시 폴더")
+    parser.add_argument('--refresh', action='store_true', help="캐시 TTL이 지난 필드가 있는 행도 다시 수집합니다.")
+    parser.add_argument('--replay', action='store_true', help="네트워크 없이 캐시된 페이지로 모든 행을 다시 추출합니다.")
+    parser.add_argument('--journal', default=None,
+                        help="수집 결과를 기록할 JSONL 저널 (기본: 출력 CSV 옆 .journal.jsonl, 중단 후 다시 실행하면 이어서 수집)")
+    args = parser.parse_args()
+
+    journal = CrawlJournal(args.journal or f"{os.path.splitext(args.output_csv)[0]}.journal.jsonl")
+    cache = PageCache(args.cache_dir) if args.cache_dir else None
+    df = pd.read_csv(args.input_csv)
+    fields, rate = None, args.rate
+    if args.replay:
+        if cache is None:
+            parser.error("--replay에는 --cache-dir가 필요합니다.")
+        fetcher, rate = ReplayFetcher(cache), None
+        # 캐시에 있는 제목만 모든 필드를 다시 추출합니다.
+        all_fields = [field for field, _ in FIELD_COLUMNS]
+        fields = [all_fields if title in cache else [] for title in df[title_column]]
+    else:
+        if args.selenium:
+            fetcher = SeleniumFetcher(args.base_url, timeout=args.timeout)
+        else:
+            fetcher = HttpFetcher(args.base_url, timeout=args.timeout)
+        if cache is not None:
+            fetcher = CachedFetcher(fetcher, cache)
+            if args.refresh:
+                fields = fields_to_crawl(df, cache)
+    start = time.perf_counter()
+    try:
+        df = crawl_dataframe(
+            df, fetcher, n_workers=args.workers, rate=rate, fields=fields, journal=journal,
+            on_result=lambda done, total, title, r: print(
+                f"({done}/{total}) '{title}' -> 평점: {r[0]}, 관심도: {r[1]}, 관객수: {r[2]}"),
+        )
+    finally:
+        fetcher.close()
+    df.to_csv(args.output_csv, index=False, encoding='utf-8-sig')
+    journal.remove()   # 결과가 CSV에 모두 반영되었으므로 다음 실행은 처음부터 판단합니다.
+    print(f"✨ {time.perf_counter() - start:.1f}초 만에 완료했습니다. 결과: '{args.output_csv}'")
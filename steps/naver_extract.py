@@ -0,0 +1,230 @@
+import argparse
+import glob
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml이 없으면 BeautifulSoup 경로만 사용합니다.
+    lxml_html = None
+
+MOVIE_SECTION = "div.sc_new.cs_common_module._au_movie_content_wrap"
+SECTION_CLASSES = {'sc_new', 'cs_common_module', '_au_movie_content_wrap'}
+
+_EOK = re.compile(r'([\d]+\.?\d*)억')
+_MAN = re.compile(r'([\d]+\.?\d*)만')
+_DIGITS = re.compile(r'(\d+)')
+_RATING = re.compile(r'(\d+\.?\d*)')
+
+
+def parse_audience_count(text):
+    """'만', '억' 등의 문자를 숫자로 변환하는 함수"""
+    if not isinstance(text, str): return 'N/A'
+    text = text.replace(',', '').lower()
+    num = 0
+    if '억' in text:
+        try: num += float(_EOK.search(text).group(1)) * 100000000
+        except: pass
+    if '만' in text:
+        try: num += float(_MAN.search(text).group(1)) * 10000
+        except: pass
+    if num > 0: return str(int(num))
+    try:
+        return str(int(_DIGITS.search(text).group(1)))
+    except:
+        return 'N/A'
+
+
+def extract_bs4(html):
+    """페이지 전체를 BeautifulSoup(html.parser)로 파싱하는 기존 추출 경로 (fast 경로의 기준/대체용)"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    movie_section = soup.select_one(MOVIE_SECTION)
+    if not movie_section:
+        return 'Not Found', 'Not Found', 'Not Found'
+
+    rating, interest, audience_count = 'N/A', 'N/A', 'N/A'
+
+    # 각 정보 추출 시, 요소가 없는 경우를 대비해 try-except로 안전하게 처리
+    try:
+        # 실관람객 평점 우선
+        rating_element = movie_section.select_one("a.lego_rating_box_see .area_star_number")
+        if rating_element:
+            rating = _RATING.search(rating_element.get_text(strip=True)).group(1)
+        else: # 없으면 네티즌 평점
+            rating_dt = movie_section.find('dt', string='평점')
+            if rating_dt and rating_dt.find_next_sibling('dd'):
+                rating = rating_dt.find_next_sibling('dd').get_text(strip=True)
+    except Exception:
+        pass # 평점 정보가 없으면 'N/A' 유지
+
+    try:
+        interest_element = movie_section.select_one("span._like_count")
+        if interest_element:
+            interest = interest_element.get_text(strip=True).replace(',', '')
+    except Exception:
+        pass # 관심도 정보가 없으면 'N/A' 유지
+
+    try:
+        audience_dt = movie_section.find('dt', string='관객수')
+        if audience_dt and audience_dt.find_next_sibling('dd'):
+            audience_text = audience_dt.find_next_sibling('dd').get_text(strip=True)
+            audience_count = parse_audience_count(audience_text)
+    except Exception:
+        pass # 관객수 정보가 없으면 'N/A' 유지
+
+    return rating, interest, audience_count
+
+
+# --- fast 경로: 영화 섹션만 잘라 lxml로 파싱합니다 ---
+_DIV_OPEN = re.compile(r'<div\b[^>]*?\bclass\s*=\s*(["\'])(.*?)\1[^>]*>', re.I | re.S)
+# 주석/스크립트/스타일 블록을 통째로 건너뛰면서 여는/닫는 div 태그를 찾습니다.
+_DIV_TAG = re.compile(r'<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|<(/?)div\b[^>]*>', re.I | re.S)
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    _XP_STAR = etree.XPath(f".//a[{_has_class('lego_rating_box_see')}]//*[{_has_class('area_star_number')}]")
+    _XP_LIKE = etree.XPath(f".//span[{_has_class('_like_count')}]")
+    # BeautifulSoup의 find('dt', string=...)처럼 자식이 하나뿐인(또는 그 자식도 하나뿐인) dt만 일치시킵니다.
+    _XP_DT = etree.XPath(".//dt[count(node()) = 1 and (text() = $label or (*[count(node()) = 1] and string(.) = $label))]")
+    _XP_DD = etree.XPath("following-sibling::dd[1]")
+    _XP_TEXT = etree.XPath(".//text()")
+
+
+def _text(element):
+    # get_text(strip=True)와 같이 텍스트 노드마다 공백을 떼고 이어 붙입니다. (주석 제외)
+    return ''.join(t.strip() for t in _XP_TEXT(element))
+
+
+def find_section(html):
+    """
+    원본 HTML에서 영화 섹션 div의 시작~끝 구간을 찾습니다. (없으면 None)
+    여는/닫는 div 태그 수를 세어 끝을 찾고, 짝이 맞지 않으면 문서 끝까지를 반환합니다.
+    """
+    for match in _DIV_OPEN.finditer(html):
+        if SECTION_CLASSES <= set(match.group(2).split()):
+            break
+    else:
+        return None
+    start, depth = match.start(), 1
+    for tag in _DIV_TAG.finditer(html, match.end()):
+        if tag.group(1) is None:   # 주석/스크립트/스타일
+            continue
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return start, tag.end()
+    return start, len(html)
+
+
+def extract_fast(html):
+    """영화 섹션 구간만 lxml로 파싱하고 미리 컴파일한 XPath/정규식으로 세 필드를 뽑습니다."""
+    span = find_section(html)
+    if span is None:
+        if '_au_movie_content_wrap' in html:
+            # 따옴표 없는 class 속성 등 정규식이 놓친 경우는 bs4 경로로 넘깁니다.
+            raise ValueError("영화 섹션 태그를 해석하지 못했습니다.")
+        return 'Not Found', 'Not Found', 'Not Found'
+    section = lxml_html.fragment_fromstring(html[span[0]:span[1]], create_parent=False)
+
+    rating, interest, audience_count = 'N/A', 'N/A', 'N/A'
+    try:
+        stars = _XP_STAR(section)
+        if stars:
+            rating = _RATING.search(_text(stars[0])).group(1)
+        else:
+            dts = _XP_DT(section, label='평점')
+            dd = _XP_DD(dts[0]) if dts else []
+            if dd:
+                rating = _text(dd[0])
+    except Exception:
+        pass
+
+    likes = _XP_LIKE(section)
+    if likes:
+        interest = _text(likes[0]).replace(',', '')
+
+    dts = _XP_DT(section, label='관객수')
+    dd = _XP_DD(dts[0]) if dts else []
+    if dd:
+        audience_count = parse_audience_count(_text(dd[0]))
+
+    return rating, interest, audience_count
+
+
+EXTRACTORS = {'bs4': extract_bs4}
+if lxml_html is not None:
+    EXTRACTORS['fast'] = extract_fast
+DEFAULT_EXTRACTOR = 'fast' if lxml_html is not None else 'bs4'
+
+
+def parse_movie_page(html, extractor=None):
+    """네이버 통합 검색 결과 HTML에서 (평점, 관심도, 관객수)를 추출합니다. fast 경로가 실패하면 bs4로 다시 시도합니다."""
+    name = extractor or DEFAULT_EXTRACTOR
+    if name == 'bs4':
+        return extract_bs4(html)
+    try:
+        return EXTRACTORS[name](html)
+    except Exception:
+        return extract_bs4(html)
+
+
+def load_pages(path):
+    """html 파일들이 있는 폴더 또는 PageCache 폴더(index.json)에서 (이름, HTML) 목록을 읽습니다."""
+    if os.path.exists(os.path.join(path, 'index.json')):
+        from steps.page_cache import PageCache
+        cache = PageCache(path)
+        return [(title, cache.read(title)) for title in list(cache.entries)]
+    pages = []
+    for file_path in sorted(glob.glob(os.path.join(path, '*.html'))):
+        with open(file_path, encoding='utf-8') as f:
+            pages.append((os.path.basename(file_path), f.read()))
+    return pages
+
+
+def check_equivalence(pages, extractor='fast', reference='bs4'):
+    """두 추출 경로의 결과가 다른 페이지 목록 [(이름, 기준 결과, 비교 결과)]을 반환합니다."""
+    mismatches = []
+    for name, html in pages:
+        expected = EXTRACTORS[reference](html)
+        got = EXTRACTORS[extractor](html)
+        if expected != got:
+            mismatches.append((name, expected, got))
+    return mismatches
+
+
+def benchmark(pages, extractors=None, repeat=3):
+    """추출 경로별 초당 처리 페이지 수 (repeat번 중 가장 빠른 값)"""
+    result = {}
+    for name in extractors or EXTRACTORS:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _, html in pages:
+                EXTRACTORS[name](html)
+            best = min(best, time.perf_counter() - start)
+        result[name] = len(pages) / best if best > 0 else float('inf')
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 검색 결과 HTML로 추출 경로의 일치 여부와 속도를 확인합니다.")
+    parser.add_argument('pages', help="*.html 폴더 또는 PageCache 폴더")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    print(f"페이지 {len(pages)}개")
+    if 'fast' in EXTRACTORS:
+        mismatches = check_equivalence(pages)
+        for name, expected, got in mismatches[:20]:
+            print(f"  [불일치] {name}: bs4={expected} fast={got}")
+        print(f"일치: {len(pages) - len(mismatches)}/{len(pages)}")
+    for name, pages_per_s in benchmark(pages, repeat=args.repeat).items():
+        print(f"{name}: {pages_per_s:,.1f} pages/s")
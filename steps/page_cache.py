@@ -0,0 +1,106 @@
+import re
+import time
+import unicodedata
+
+from steps.blob_store import BlobStore
+
+# 필드별 유효 기간(초): 평점/관심도는 자주 바뀌고, 누적 관객수는 상영이 끝나면 거의 고정됩니다.
+DEFAULT_TTL = {
+    'rating': 24 * 3600,
+    'interest': 24 * 3600,
+    'audience': 30 * 24 * 3600,
+}
+
+
+def normalize_title(title):
+    """캐시 키용 제목 정규화 (NFKC, 소문자, 공백 하나로)"""
+    title = unicodedata.normalize('NFKC', str(title)).lower().strip()
+    return re.sub(r'\s+', ' ', title)
+
+
+class PageCache(BlobStore):
+    """
+    수집한 검색 결과 HTML을 디스크에 저장하는 캐시입니다.
+    - 본문은 내용 해시(sha1) 이름의 gzip 파일로 저장해 같은 페이지는 한 번만 보관합니다. (BlobStore)
+    - index.json은 정규화한 제목 → (해시, 수집 시각, 마지막 사용 시각)을 기록합니다.
+    - 필드별 TTL로 신선도를 판단하고, 전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 항목부터 지웁니다.
+    """
+
+    def __init__(self, cache_dir='./data/crawl_cache', max_bytes=500 * 1024 * 1024, ttl=None, autosave=50):
+        super().__init__(cache_dir, 'pages', '.html.gz', max_bytes, autosave, compress=True)
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+
+    def __contains__(self, title):
+        return normalize_title(title) in self.entries
+
+    def stale_fields(self, title, now=None):
+        """TTL이 지난 필드 목록 (캐시에 없으면 모든 필드)"""
+        entry = self.entries.get(normalize_title(title))
+        if entry is None:
+            return list(self.ttl)
+        age = (now or time.time()) - entry['fetched_at']
+        return [field for field, ttl in self.ttl.items() if age > ttl]
+
+    def read(self, title):
+        """신선도와 관계없이 캐시된 HTML을 반환합니다. 없으면 None"""
+        data = self.read_blob(normalize_title(title))
+        return None if data is None else data.decode('utf-8')
+
+    def get(self, title, fields=None):
+        """fields(기본: 전체)가 모두 TTL 안에 있을 때만 캐시된 HTML을 반환합니다."""
+        stale = self.stale_fields(title)
+        if any(field in stale for field in (fields or self.ttl)):
+            return None
+        return self.read(title)
+
+    def put(self, title, html):
+        self.write_blob(normalize_title(title), html.encode('utf-8'))
+        self.changed()
+
+
+class CachedFetcher:
+    """
+    다른 fetcher 앞에 두는 캐시 계층입니다.
+    fields가 모두 TTL 안이면 캐시된 페이지를, 아니면 네트워크에서 받아 캐시에 저장한 페이지를 반환합니다.
+    """
+
+    def __init__(self, fetcher, cache, fields=None):
+        self.fetcher = fetcher
+        self.cache = cache
+        self.fields = fields
+        self.hits = 0
+        self.misses = 0
+
+    def is_cached(self, title):
+        stale = self.cache.stale_fields(title)
+        return not any(field in stale for field in (self.fields or self.cache.ttl))
+
+    def fetch(self, title):
+        html = self.cache.get(title, self.fields)
+        if html is not None:
+            self.hits += 1
+            return html
+        self.misses += 1
+        html = self.fetcher.fetch(title)
+        self.cache.put(title, html)
+        return html
+
+    def close(self):
+        self.cache.save()
+        self.fetcher.close()
+
+
+class ReplayFetcher:
+    """네트워크 없이 캐시된 페이지만으로 추출을 다시 실행합니다. (TTL 무시, 없으면 KeyError)"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def fetch(self, title):
+        html = self.cache.read(title)
+        if html is None:
+            raise KeyError(f"캐시에 없는 제목입니다: {title}")
+        return html
+
+    def close(self):
+        pass
@@ -0,0 +1,160 @@
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from steps.catalog_store import DatasetLock, commit_dataset, load_or_ingest, write_atomic
+from steps.step3_recommend import find_competitors
+from steps.telemetry import span, traced
+from steps.step4_attractiveness import predict_attractiveness
+from steps.similarity_index import update_similars
+
+
+class PipelineCancelled(Exception):
+    """should_stop()이 참이 되어 다음 단계 전에 실행을 멈췄습니다. (아무것도 저장하지 않습니다)"""
+
+
+class Stage:
+    """
+    파이프라인의 한 단계입니다.
+    inputs 컬럼(과 files)이 지난 실행과 같고 outputs 컬럼이 이미 있으면 건너뜁니다.
+    func(df)는 {출력 컬럼: 값} 딕셔너리를 반환합니다.
+    """
+
+    def __init__(self, name, func, inputs, outputs, files=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.files = list(files)
+
+    def fingerprint(self, df):
+        h = hashlib.sha1()
+        cols = [c for c in self.inputs if c in df.columns]
+        h.update(json.dumps(cols, ensure_ascii=False).encode('utf-8'))
+        if cols:
+            h.update(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+        for path in self.files:
+            # 모델 파일 등은 수정 시각과 크기로 변경 여부를 판단합니다.
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_mtime_ns}:{st.st_size}".encode('utf-8'))
+        return h.hexdigest()
+
+
+def default_stages(encoder_path='./steps/ordinal_encoder.pkl', model_path='./steps/rf_weighted_model.pkl',
+                   index_dir='./data/similarity_index'):
+    """유사작 → 경쟁작 → 매력도 예측 순서의 기본 단계 목록입니다. (크롤링 단계는 여기에 추가합니다)"""
+    return [
+        Stage('similars',
+              lambda df: {'유사작': update_similars(df, index_dir=index_dir)},
+              inputs=['영화명', 'Gemini 키워드', '매력도'], outputs=['유사작']),
+        Stage('competitors',
+              lambda df: {'경쟁작': find_competitors(df)},
+              inputs=['영화명', '개봉일'], outputs=['경쟁작']),
+        Stage('attractiveness',
+              lambda df: {'예측 매력도': predict_attractiveness(df, encoder_path=encoder_path, model_path=model_path)},
+              inputs=['장르', '배우', '감독', '제작사', '상영시간', '개봉일', 'Gemini 키워드', '국가',
+                      '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)', '누적 관객수'],
+              outputs=['예측 매력도'], files=[encoder_path, model_path]),
+    ]
+
+
+class Pipeline:
+    """
+    CSV를 한 번 읽어 메모리의 DataFrame 하나를 단계별로 갱신하고, 마지막에 한 번만 저장합니다.
+    단계별 입력 fingerprint는 state_path에 저장해 다음 실행에서 변경 여부를 판단합니다.
+    """
+
+    def __init__(self, stages, state_path):
+        self.stages = stages
+        self.state_path = state_path
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+        write_atomic(self.state_path, write)
+
+    def run(self, df, force=False, on_stage=None, should_stop=None):
+        """
+        df를 단계별로 갱신합니다. (실행된 단계 이름 리스트, 결과 df, 단계별 fingerprint)를 반환합니다.
+        on_stage(name, status)가 주어지면 각 단계의 시작/종료/건너뜀을 알립니다.
+        should_stop()이 참이면 다음 단계를 시작하기 전에 PipelineCancelled를 일으킵니다.
+        """
+        state = self._load_state()
+        ran = []
+        for stage in self.stages:
+            if should_stop and should_stop():
+                raise PipelineCancelled(stage.name)
+            with span('pipeline.fingerprint', rows=len(df), stage=stage.name):
+                fp = stage.fingerprint(df)
+            outputs_ready = all(c in df.columns for c in stage.outputs)
+            if not force and outputs_ready and state.get(stage.name) == fp:
+                if on_stage:
+                    on_stage(stage.name, 'skipped')
+                continue
+            if on_stage:
+                on_stage(stage.name, 'started')
+            with span(f'stage.{stage.name}', rows=len(df)):
+                for col, values in stage.func(df).items():
+                    df[col] = values
+            state[stage.name] = fp
+            ran.append(stage.name)
+            if on_stage:
+                on_stage(stage.name, 'done')
+        return ran, df, state
+
+    @traced('pipeline.run_csv', rows_arg=None)
+    def run_csv(self, file_path, force=False, on_stage=None, should_stop=None, lock_timeout=None):
+        """
+        카탈로그(없거나 오래됐으면 CSV)를 읽어 단계를 실행하고, 바뀐 것이 있을 때만 한 번 커밋합니다.
+        CSV와 카탈로그 파일(.feather)을 원자적으로 교체하고 매니페스트 버전을 올립니다. (commit_dataset)
+        읽기부터 커밋까지 DatasetLock을 잡아 다른 쓰기 작업과 겹치지 않게 합니다.
+        읽기('load')와 저장('commit')도 on_stage로 알리며, 저장 직전까지는 취소할 수 있습니다.
+        """
+        notify = on_stage or (lambda name, status: None)
+        with DatasetLock(file_path, timeout=lock_timeout):
+            notify('load', 'started')
+            df = load_or_ingest(file_path)
+            notify('load', 'done')
+            ran, df, state = self.run(df, force=force, on_stage=on_stage, should_stop=should_stop)
+            if should_stop and should_stop():
+                raise PipelineCancelled('commit')
+            if not ran:
+                notify('commit', 'skipped')
+                return ran
+            notify('commit', 'started')
+            commit_dataset(df, file_path, lock=False)
+            with span('pipeline.save_state'):
+                self._save_state(state)
+            notify('commit', 'done')
+        return ran
+
+
+def pipeline_steps(**stage_kwargs):
+    """on_stage로 알리는 진행 단계 이름 (읽기 → 각 단계 → 저장 순서)"""
+    return ['load'] + [stage.name for stage in default_stages(**stage_kwargs)] + ['commit']
+
+
+def run_pipeline(file_path="./data/영화DB(임시).csv", force=False, on_stage=None, should_stop=None, **stage_kwargs):
+    state_path = os.path.join(os.path.dirname(file_path), '.pipeline_state.json')
+    return Pipeline(default_stages(**stage_kwargs), state_path).run_csv(file_path, force=force, on_stage=on_stage,
+                                                                       should_stop=should_stop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="영화 DB 갱신 파이프라인 (유사작/경쟁작/매력도 예측)")
+    parser.add_argument('--csv', default="./data/영화DB(임시).csv")
+    parser.add_argument('--force', action='store_true', help="변경 여부와 관계없이 모든 단계를 실행합니다.")
+    args = parser.parse_args()
+    ran = run_pipeline(args.csv, force=args.force, on_stage=lambda name, status: print(f"[{name}] {status}"))
+    print(f"실행된 단계: {', '.join(ran) if ran else '없음'}")
@@ -0,0 +1,94 @@
+import threading
+import time
+import traceback
+
+from steps.pipeline import PipelineCancelled
+
+# 작업 상태: idle → running → (cancelling →) done / cancelled / failed
+ACTIVE_STATES = ('running', 'cancelling')
+
+
+class RefreshJob:
+    """
+    데이터 갱신 파이프라인을 백그라운드 스레드에서 실행합니다.
+    - 한 번에 하나만 실행합니다. 실행 중에 start()를 다시 부르면 새로 시작하지 않습니다. (single-flight)
+    - target(on_stage, should_stop)을 호출하고, on_stage로 받은 단계별 진행 상황을 status()로 보여 줍니다.
+    - cancel()하면 다음 단계를 시작하기 전에 멈춥니다. 파이프라인은 마지막에 한 번만 저장하므로
+      취소하거나 실패하면 기존 데이터가 그대로 남습니다.
+    - 성공하면 on_success(결과)를 호출한 뒤 완료 상태로 바꿉니다. (UI 캐시 무효화 등)
+    """
+
+    def __init__(self, target, steps=(), on_success=None):
+        self.target = target
+        self.steps = list(steps)
+        self.on_success = on_success
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+        self._status = {'run_id': 0, 'state': 'idle', 'stages': {}, 'current': None,
+                        'started_at': None, 'finished_at': None, 'error': None, 'result': None}
+
+    @property
+    def running(self):
+        return self._status['state'] in ACTIVE_STATES
+
+    def start(self):
+        """새 실행을 시작하면 True, 이미 실행 중이면 False를 반환합니다."""
+        with self._lock:
+            if self.running:
+                return False
+            self._cancel.clear()
+            self._status = {'run_id': self._status['run_id'] + 1, 'state': 'running',
+                            'stages': {name: {'status': 'pending'} for name in self.steps}, 'current': None,
+                            'started_at': time.time(), 'finished_at': None, 'error': None, 'result': None}
+            self._thread = threading.Thread(target=self._run, name='refresh-job', daemon=True)
+            self._thread.start()
+            return True
+
+    def cancel(self):
+        with self._lock:
+            if self._status['state'] == 'running':
+                self._status['state'] = 'cancelling'
+                self._cancel.set()
+
+    def join(self, timeout=None):
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _on_stage(self, name, status):
+        now = time.time()
+        with self._lock:
+            stage = self._status['stages'].setdefault(name, {'status': 'pending'})
+            stage['status'] = status
+            if status == 'started':
+                stage['started_at'] = now
+                self._status['current'] = name
+            else:
+                stage['finished_at'] = now
+
+    def _finish(self, state, **fields):
+        with self._lock:
+            self._status.update(fields, state=state, current=None, finished_at=time.time())
+
+    def _run(self):
+        try:
+            result = self.target(self._on_stage, self._cancel.is_set)
+            if self.on_success:
+                self.on_success(result)
+            self._finish('done', result=result)
+        except PipelineCancelled:
+            self._finish('cancelled')
+        except Exception as e:
+            self._finish('failed', error=f"{e}\n{traceback.format_exc()}")
+
+    def status(self):
+        """
+        현재 상태의 복사본입니다.
+        progress: 끝났거나 건너뛴 단계의 비율 (0~1)
+        """
+        with self._lock:
+            status = dict(self._status, stages={k: dict(v) for k, v in self._status['stages'].items()})
+        finished = sum(1 for s in status['stages'].values() if s['status'] in ('done', 'skipped'))
+        status['progress'] = finished / len(status['stages']) if status['stages'] else 0.0
+        return status
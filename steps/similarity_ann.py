@@ -0,0 +1,208 @@
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from steps.telemetry import traced
+from steps.step3_recommend import (
+    _tiebreak_order, topk_similar_indices, prepare_similar_inputs
+)
+
+
+def _splitmix64(x):
+    """uint64 배열의 원소마다 splitmix64 해시 (넘침은 2**64로 나눈 나머지)"""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class RandomProjectionLSH:
+    """
+    TF-IDF 벡터용 랜덤 프로젝션(SimHash) LSH 인덱스입니다.
+    - n_tables: 해시 테이블 수 (많을수록 recall↑, 속도↓)
+    - n_bits: 테이블당 비트 수 (많을수록 버킷이 작아져 속도↑, recall↓).
+      None이면 평균 버킷 크기가 max_bucket_size의 절반 정도가 되도록 행 수에 맞춰 정합니다.
+    - max_bucket_size: 한 버킷에서 비교할 최대 행 수 (큰 버킷은 이 크기로 잘라 비교)
+    """
+
+    def __init__(self, n_tables=16, n_bits=None, max_bucket_size=32, seed=42):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.max_bucket_size = max_bucket_size
+        self.seed = seed
+        self.codes = None
+
+    def fit(self, matrix):
+        if self.n_bits is None:
+            self.n_bits = int(np.clip(np.ceil(np.log2(matrix.shape[0] * 2 / self.max_bucket_size)), 1, 62))
+        # 밀집 투영 행렬(어휘 수 × 전체 비트) 대신 열(특성)마다 64비트 해시를 만들고, 그 비트를 ±1 투영 방향으로 씁니다.
+        # 테이블마다 어휘 수 × 8바이트만 쓰므로 (1,2)-gram 어휘가 수백만 개여도 메모리가 작습니다.
+        columns = _splitmix64(np.arange(matrix.shape[1], dtype=np.uint64))
+        self.codes = np.zeros((matrix.shape[0], self.n_tables), dtype=np.int64)
+        for table in range(self.n_tables):
+            key = _splitmix64(np.array([self.seed * self.n_tables + table], dtype=np.uint64))
+            hashes = _splitmix64(columns ^ key)
+            for bit in range(self.n_bits):
+                signs = ((hashes >> np.uint64(bit)) & np.uint64(1)).astype(np.float64) * 2 - 1
+                self.codes[:, table] |= (np.asarray(matrix @ signs).ravel() > 0).astype(np.int64) << bit
+        return self
+
+    def table_pairs(self, table, rank):
+        """한 테이블에서 같은 버킷(최대 max_bucket_size개 단위)에 속한 (i, j) 후보 쌍을 만듭니다."""
+        codes = self.codes[:, table]
+        order = np.lexsort((rank, codes))
+        sorted_codes = codes[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+        bucket_id = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(order)]))
+        # 버킷 안 위치를 max_bucket_size로 나눠 청크 번호를 만듭니다.
+        offset = np.arange(len(order)) - starts[bucket_id]
+        chunk = bucket_id * (len(order) + 1) + offset // self.max_bucket_size
+        chunk_starts = np.r_[0, np.flatnonzero(np.diff(chunk)) + 1]
+        sizes = np.diff(np.r_[chunk_starts, len(order)])
+
+        pairs_i, pairs_j = [], []
+        for size in np.unique(sizes[sizes > 1]):
+            # 같은 크기의 청크끼리 묶어 한 번에 모든 쌍을 만듭니다.
+            members = order[chunk_starts[sizes == size][:, None] + np.arange(size)]
+            a, b = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+            mask = a != b
+            pairs_i.append(members[:, a[mask]].ravel())
+            pairs_j.append(members[:, b[mask]].ravel())
+
+        # 유사도가 같으면 tie-break 순위가 높은 행이 이기므로, 큰 버킷의 나머지 행은
+        # 버킷의 첫 청크(순위 상위 행들)와도 비교합니다.
+        rest = np.flatnonzero(offset >= self.max_bucket_size)
+        if len(rest):
+            leaders = starts[bucket_id[rest]][:, None] + np.arange(self.max_bucket_size)
+            i = np.repeat(order[rest], self.max_bucket_size)
+            j = order[leaders.ravel()]
+            pairs_i += [i, j]
+            pairs_j += [j, i]
+        if not pairs_i:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def _padded_rows(X):
+    """희소 행렬의 각 행을 (열 번호, 값) 고정 폭 배열로 펼칩니다. 행당 원소 수가 적은 키워드 벡터에 유리합니다."""
+    counts = np.diff(X.indptr)
+    width = max(int(counts.max()), 1) if len(counts) else 1
+    cols = np.full((X.shape[0], width), -1, dtype=np.int64)
+    vals = np.zeros((X.shape[0], width))
+    rows = np.repeat(np.arange(X.shape[0]), counts)
+    within = np.arange(len(X.indices)) - np.repeat(X.indptr[:-1], counts)
+    cols[rows, within] = X.indices
+    vals[rows, within] = X.data
+    return cols, vals
+
+
+def _pair_sims(padded, i, j, budget=32_000_000):
+    """(i, j) 쌍마다 두 행의 내적(정규화된 벡터이므로 코사인 유사도)을 구합니다."""
+    cols, vals = padded
+    width = cols.shape[1]
+    chunk_size = max(budget // (width * width), 1)
+    out = np.empty(len(i))
+    for start in range(0, len(i), chunk_size):
+        a, b = i[start:start + chunk_size], j[start:start + chunk_size]
+        ca = cols[a]
+        same = ((ca[:, :, None] == cols[b][:, None, :]) & (ca[:, :, None] >= 0)).astype(np.float64)
+        out[start:start + len(a)] = np.einsum('pa,pab,pb->p', vals[a], same, vals[b], optimize=True)
+    return out
+
+
+def _select_topk(n, k, i, j, sims, rank):
+    """(i, j, sim) 후보에서 행마다 (유사도 내림차순, tie-break 순위 오름차순) top-k를 고릅니다."""
+    key = i * n + j
+    key, first = np.unique(key, return_index=True)
+    i, j, sims = i[first], j[first], sims[first]
+    order = np.lexsort((rank[j], -sims, i))
+    i, j, sims = i[order], j[order], sims[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(i)) + 1]
+    counts = np.diff(np.r_[starts, len(i)])
+    within = np.arange(len(i)) - np.repeat(starts, counts)
+    keep = within < k
+    return i[keep], j[keep], sims[keep]
+
+
+def lsh_similar_indices(tfidf_matrix, tiebreak_values, orig_pos, top_k=5,
+                        n_tables=16, n_bits=None, max_bucket_size=32, seed=42):
+    """
+    LSH로 후보를 좁힌 뒤 후보끼리만 정확한 코사인 유사도로 재정렬하는 근사 top-k입니다.
+    반환 형식은 topk_similar_indices와 같고, 후보가 k개보다 적은 행은 -1로 채웁니다.
+    """
+    n = tfidf_matrix.shape[0]
+    k = min(top_k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64)
+
+    X = normalize(tfidf_matrix).tocsr()
+    order, rank = _tiebreak_order(np.asarray(tiebreak_values, dtype=float), np.asarray(orig_pos))
+    lsh = RandomProjectionLSH(n_tables, n_bits, max_bucket_size, seed).fit(X)
+    padded = _padded_rows(X)
+
+    # 유사도 0인 행으로 채워지는 경우를 위해 tie-break 상위 k+1개 행을 기본 후보로 넣습니다.
+    base = order[:k + 1]
+    i = np.repeat(np.arange(n), len(base))
+    j = np.tile(base, n)
+    keep = i != j
+    i, j = i[keep], j[keep]
+    i, j, sims = _select_topk(n, k, i, j, _pair_sims(padded, i, j), rank)
+
+    # 테이블마다 후보를 더하고 곧바로 top-k만 남겨 메모리를 n × (k + 버킷 쌍) 수준으로 유지합니다.
+    for table in range(n_tables):
+        ti, tj = lsh.table_pairs(table, rank)
+        i, j, sims = _select_topk(
+            n, k, np.r_[i, ti], np.r_[j, tj], np.r_[sims, _pair_sims(padded, ti, tj)], rank)
+
+    out = np.full((n, k), -1, dtype=np.int64)
+    starts = np.r_[0, np.flatnonzero(np.diff(i)) + 1]
+    within = np.arange(len(i)) - np.repeat(starts, np.diff(np.r_[starts, len(i)]))
+    out[i, within] = j
+    return out
+
+
+@traced('similars.find_similars_approx')
+def find_similars_approx(df, top_k=5, tiebreak_col='매력도', **lsh_kwargs):
+    """find_similars의 근사(LSH) 버전입니다. 반환 형식은 find_similars와 같습니다."""
+    df_copy, orig_pos, tb_viewers = prepare_similar_inputs(df, tiebreak_col)
+    if df_copy.empty:
+        return [""] * len(df)
+
+    tfidf_matrix = TfidfVectorizer(ngram_range=(1, 2)).fit_transform(df_copy['Gemini문장'])
+    top_local = lsh_similar_indices(tfidf_matrix, tb_viewers, orig_pos, top_k=top_k, **lsh_kwargs)
+    titles = df_copy['영화명'].to_numpy()
+    out = [""] * len(df)
+    for local_idx, pos in enumerate(orig_pos):
+        row = top_local[local_idx]
+        out[pos] = ", ".join(titles[row[row >= 0]].tolist())
+    return out
+
+
+def evaluate_recall(df, top_k=5, tiebreak_col='매력도', block_size=256, **lsh_kwargs):
+    """
+    같은 데이터에서 정확한 find_similars 결과 대비 근사 결과의 recall@k와 소요 시간을 구합니다.
+    """
+    df_copy, orig_pos, tb_viewers = prepare_similar_inputs(df, tiebreak_col)
+    if len(df_copy) < 2:
+        return {'recall_at_k': 1.0, 'rows': len(df_copy)}
+    tfidf_matrix = TfidfVectorizer(ngram_range=(1, 2)).fit_transform(df_copy['Gemini문장'])
+
+    start = time.perf_counter()
+    exact = topk_similar_indices(tfidf_matrix, tb_viewers, orig_pos, top_k=top_k, block_size=block_size)
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = lsh_similar_indices(tfidf_matrix, tb_viewers, orig_pos, top_k=top_k, **lsh_kwargs)
+    approx_seconds = time.perf_counter() - start
+
+    hits = (exact[:, :, None] == approx[:, None, :]).any(axis=2).sum()
+    return {
+        'rows': len(df_copy),
+        'top_k': exact.shape[1],
+        'recall_at_k': float(hits / exact.size),
+        'exact_match_rate': float((exact == approx).all(axis=1).mean()),
+        'exact_seconds': exact_seconds,
+        'approx_seconds': approx_seconds,
+    }
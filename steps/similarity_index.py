@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from steps.telemetry import traced
+from steps.step3_recommend import (
+    _tiebreak_order, topk_similar_indices, prepare_similar_inputs, format_similars
+)
+
+INDEX_VERSION = 1
+
+
+def row_keys(df_copy, tb_viewers):
+    """
+    행마다 (영화명, 키워드 문장, tie-break 값)의 내용 해시를 만듭니다.
+    같은 내용의 행이 여러 개면 '#순번'을 붙여 키가 겹치지 않게 합니다.
+    """
+    keys, seen = [], {}
+    for title, sentence, tb in zip(df_copy['영화명'], df_copy['Gemini문장'], tb_viewers):
+        h = hashlib.sha1(f"{title}\x1f{sentence}\x1f{tb!r}".encode('utf-8')).hexdigest()
+        seen[h] = seen.get(h, 0) + 1
+        keys.append(f"{h}#{seen[h]}")
+    return np.array(keys, dtype=object)
+
+
+class SimilarityIndex:
+    """
+    디스크에 저장되는 유사작 인덱스입니다.
+    TF-IDF 어휘(vectorizer), 희소 행렬, 행별 내용 해시, 현재 top-k 목록을 함께 보관하고,
+    업데이트 시에는 새로 들어오거나 바뀐 행만 벡터화하고 영향받는 이웃 목록만 다시 계산합니다.
+    """
+
+    def __init__(self, index_dir, top_k=5, tiebreak_col='매력도', drift_threshold=0.1,
+                 max_delta_ratio=0.5, block_size=256):
+        self.index_dir = index_dir
+        self.top_k = top_k
+        self.tiebreak_col = tiebreak_col
+        self.drift_threshold = drift_threshold      # 새 행의 n-gram 중 어휘 밖(OOV) 비율 상한
+        self.max_delta_ratio = max_delta_ratio      # 변경 행 비율이 이보다 크면 전체 재구축
+        self.block_size = block_size
+        self.vectorizer = None
+        self.matrix = None
+        self.keys = None
+        self.neighbors = None
+        self.sims = None
+        self.last_update = {}
+
+    # --- 저장/불러오기 ---
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    def load(self):
+        """인덱스 파일을 읽어옵니다. 없거나 설정이 다르면 False를 반환합니다."""
+        try:
+            with open(self._path('meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            if (meta.get('version') != INDEX_VERSION or meta.get('top_k') != self.top_k
+                    or meta.get('tiebreak_col') != self.tiebreak_col):
+                return False
+            self.vectorizer = joblib.load(self._path('vectorizer.pkl'))
+            self.matrix = sp.load_npz(self._path('matrix.npz')).tocsr()
+            data = np.load(self._path('neighbors.npz'), allow_pickle=True)
+            self.keys, self.neighbors, self.sims = data['keys'], data['neighbors'], data['sims']
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return False
+        return True
+
+    @traced('similars.index_save', rows_arg=None)
+    def save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        joblib.dump(self.vectorizer, self._path('vectorizer.pkl'))
+        sp.save_npz(self._path('matrix.npz'), self.matrix)
+        np.savez(self._path('neighbors.npz'), keys=self.keys, neighbors=self.neighbors, sims=self.sims)
+        # meta.json을 마지막에 써서, 중간에 실패하면 다음 실행에서 전체 재구축되도록 합니다.
+        meta = {
+            'version': INDEX_VERSION,
+            'top_k': self.top_k,
+            'tiebreak_col': self.tiebreak_col,
+            'n_rows': int(self.matrix.shape[0]),
+            'vocab_size': len(self.vectorizer.vocabulary_),
+        }
+        with open(self._path('meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    # --- 계산 ---
+    @traced('similars.index_rebuild', rows_arg=1)
+    def rebuild(self, df_copy, keys, tb_viewers, orig_pos):
+        """어휘를 새로 학습하고 모든 행의 이웃을 다시 계산합니다."""
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        self.matrix = self.vectorizer.fit_transform(df_copy['Gemini문장']).tocsr()
+        self.keys = keys
+        self.neighbors, self.sims = topk_similar_indices(
+            self.matrix, tb_viewers, orig_pos, top_k=self.top_k,
+            block_size=self.block_size, return_sims=True)
+        self.last_update = {'mode': 'rebuild', 'rows': len(keys), 'recomputed': len(keys)}
+
+    def _oov_ratio(self, sentences):
+        """새 문장들의 n-gram 중 저장된 어휘에 없는 비율을 구합니다."""
+        analyzer = self.vectorizer.build_analyzer()
+        vocab = self.vectorizer.vocabulary_
+        total = oov = 0
+        for sentence in sentences:
+            terms = analyzer(sentence)
+            total += len(terms)
+            oov += sum(1 for t in terms if t not in vocab)
+        return oov / total if total else 0.0
+
+    def _affected_by_added(self, X, kept_new, added_new, kth_sims, kth_rank, rank):
+        """추가된 행이 기존 k번째 이웃보다 앞서게 되는 기존 행을 찾습니다."""
+        affected = np.zeros(len(kept_new), dtype=bool)
+        if len(added_new) == 0:
+            return affected
+        # 유사도가 0인 추가 행과의 tie: 추가 행 중 가장 앞선 순위가 k번째 이웃보다 앞서면 영향받습니다.
+        affected |= (kth_sims <= 0) & (rank[added_new].min() < kth_rank)
+
+        S = (X[kept_new] @ X[added_new].T).tocoo()
+        s_k = kth_sims[S.row]
+        beats = (S.data > s_k) | ((S.data == s_k) & (rank[added_new][S.col] < kth_rank[S.row]))
+        affected[S.row[beats]] = True
+        return affected
+
+    @traced('similars.index_update', rows_arg=1)
+    def update(self, df):
+        """
+        df 기준으로 인덱스를 갱신하고 저장합니다.
+        find_similars와 같은 형식의 '유사작' 문자열 리스트를 반환합니다.
+        """
+        df_copy, orig_pos, tb_viewers = prepare_similar_inputs(df, self.tiebreak_col)
+        if df_copy.empty:
+            return [""] * len(df)
+        keys = row_keys(df_copy, tb_viewers)
+        n = len(keys)
+        k = min(self.top_k, n - 1)
+
+        if self.keys is None and not self.load():
+            self.rebuild(df_copy, keys, tb_viewers, orig_pos)
+            self.save()
+            return format_similars(df, df_copy, orig_pos, self.neighbors)
+
+        old_pos = {key: i for i, key in enumerate(self.keys)}
+        old_local = np.array([old_pos.get(key, -1) for key in keys], dtype=np.int64)
+        kept_new = np.flatnonzero(old_local >= 0)
+        added_new = np.flatnonzero(old_local < 0)
+        n_removed = len(self.keys) - len(kept_new)
+
+        delta_ratio = (len(added_new) + n_removed) / max(n, 1)
+        added_sentences = df_copy['Gemini문장'].to_numpy()[added_new]
+        if delta_ratio > self.max_delta_ratio or self._oov_ratio(added_sentences) > self.drift_threshold:
+            self.rebuild(df_copy, keys, tb_viewers, orig_pos)
+            self.save()
+            return format_similars(df, df_copy, orig_pos, self.neighbors)
+
+        # 새 행 순서대로 행렬을 조립합니다. (기존 행은 저장된 벡터를 그대로 사용)
+        blocks = [self.matrix[old_local[kept_new]]]
+        if len(added_new):
+            blocks.append(self.vectorizer.transform(added_sentences))
+        stacked = sp.vstack(blocks).tocsr()
+        src = np.empty(n, dtype=np.int64)
+        src[kept_new] = np.arange(len(kept_new))
+        src[added_new] = len(kept_new) + np.arange(len(added_new))
+        matrix = stacked[src]
+
+        old_to_new = np.full(len(self.keys), -1, dtype=np.int64)
+        old_to_new[old_local[kept_new]] = kept_new
+        _, rank = _tiebreak_order(np.asarray(tb_viewers, dtype=float), orig_pos)
+
+        recompute = np.zeros(n, dtype=bool)
+        recompute[added_new] = True
+        neighbors = np.zeros((n, max(k, 0)), dtype=np.int64)
+        sims = np.zeros((n, max(k, 0)))
+        order_kept = np.all(np.diff(old_local[kept_new]) > 0)
+        if k != self.neighbors.shape[1] or not order_kept:
+            # 목록 길이가 바뀌거나 기존 행의 상대 순서가 바뀌면 tie-break가 달라질 수 있어 모두 다시 계산합니다.
+            recompute[:] = True
+        elif len(kept_new) and k > 0:
+            old_lists = self.neighbors[old_local[kept_new]]
+            mapped = old_to_new[old_lists]
+            neighbors[kept_new] = mapped
+            sims[kept_new] = self.sims[old_local[kept_new]]
+
+            lost_neighbor = (mapped < 0).any(axis=1)
+            X = normalize(matrix).tocsr()
+            kth_rank = rank[np.where(mapped[:, -1] >= 0, mapped[:, -1], 0)]
+            affected = self._affected_by_added(X, kept_new, added_new, sims[kept_new, -1], kth_rank, rank)
+            recompute[kept_new[lost_neighbor | affected]] = True
+
+        rows = np.flatnonzero(recompute)
+        if len(rows) and k > 0:
+            neighbors[rows], sims[rows] = topk_similar_indices(
+                matrix, tb_viewers, orig_pos, top_k=self.top_k,
+                block_size=self.block_size, rows=rows, return_sims=True)
+
+        self.matrix, self.keys, self.neighbors, self.sims = matrix, keys, neighbors, sims
+        self.last_update = {'mode': 'incremental', 'rows': n, 'added': len(added_new),
+                            'removed': n_removed, 'recomputed': len(rows)}
+        self.save()
+        return format_similars(df, df_copy, orig_pos, self.neighbors)
+
+
+@traced('similars.update_similars')
+def update_similars(df, index_dir='./data/similarity_index', top_k=5, tiebreak_col='매력도', **kwargs):
+    """저장된 인덱스를 이용해 '유사작'을 증분 계산합니다. (인덱스가 없으면 전체 구축)"""
+    index = SimilarityIndex(index_dir, top_k=top_k, tiebreak_col=tiebreak_col, **kwargs)
+    return index.update(df)
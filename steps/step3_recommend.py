@@ -1,96 +1,158 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 import numpy as np
 import pandas as pd
 
-def find_similars(df, top_k=5, tiebreak_col='매력도'):
-    
-    
+from steps.telemetry import span, traced
+
+
+def _tiebreak_order(tiebreak_values, orig_pos):
+    """(매력도 내림차순, 원본 순서 오름차순) 기준의 전역 순위를 반환합니다."""
+    order = np.lexsort((orig_pos, -tiebreak_values))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return order, rank
+
+
+@traced('similars.topk', rows_arg=None)
+def topk_similar_indices(tfidf_matrix, tiebreak_values, orig_pos, top_k=5, block_size=256,
+                         rows=None, return_sims=False):
+    """
+    희소 TF-IDF 행렬을 행 블록 단위로 처리해 각 행의 top-k 유사 행(로컬 인덱스)을 구합니다.
+    정렬 기준은 (유사도 내림차순, 매력도 내림차순, 원본 순서 오름차순)이며,
+    n×n 유사도 행렬 전체를 만들지 않습니다. 블록당 메모리는 block_size × n × 8 bytes입니다.
+    rows를 주면 해당 행들에 대해서만 계산합니다.
+    """
+    n = tfidf_matrix.shape[0]
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = min(top_k, n - 1)
+    if k <= 0:
+        empty = np.empty((len(rows), 0), dtype=np.int64)
+        return (empty, np.empty((len(rows), 0))) if return_sims else empty
+
+    # cosine_similarity와 같은 방식으로 정규화해 유사도 값이 동일하게 나오도록 합니다.
+    X = normalize(tfidf_matrix).tocsr()
+
+    # 열을 tie-break 순위대로 재배치하면 "같은 유사도면 앞쪽 열 우선"이 곧 기존 정렬 순서가 됩니다.
+    order, rank = _tiebreak_order(np.asarray(tiebreak_values, dtype=float), np.asarray(orig_pos))
+    XT = X[order].T.tocsc()
+
+    out = np.empty((len(rows), k), dtype=np.int64)
+    out_sims = np.empty((len(rows), k)) if return_sims else None
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        sims = (X[block] @ XT).toarray()
+        sims[np.arange(len(block)), rank[block]] = -np.inf  # 자기 자신 제외
+
+        # k번째로 큰 유사도(경계값)를 부분 선택으로 구합니다.
+        kth = -np.partition(-sims, k - 1, axis=1)[:, k - 1]
+        above = sims > kth[:, None]
+        at = sims == kth[:, None]
+        need = k - above.sum(axis=1)
+        selected = above | (at & (np.cumsum(at, axis=1, dtype=np.int32) <= need[:, None]))
+
+        cols = np.nonzero(selected)[1].reshape(len(block), k)
+        cand_sims = np.take_along_axis(sims, cols, axis=1)
+        # 열 번호가 곧 tie-break 순위이므로 (유사도 내림차순, 열 오름차순)으로 정렬합니다.
+        pos = np.lexsort((cols, -cand_sims))
+        out[start:start + len(block)] = order[np.take_along_axis(cols, pos, axis=1)]
+        if return_sims:
+            out_sims[start:start + len(block)] = np.take_along_axis(cand_sims, pos, axis=1)
+    return (out, out_sims) if return_sims else out
+
+
+def prepare_similar_inputs(df, tiebreak_col='매력도'):
+    """
+    유사작 계산에 쓰는 입력을 만듭니다.
+    키워드가 있는 행만 남긴 df_copy('Gemini문장' 포함), 원본 위치, tie-break 값을 반환합니다.
+    """
     df_copy = df.dropna(subset=['Gemini 키워드']).copy()
-    df_copy['Gemini 키워드'] = df_copy['Gemini 키워드'].apply(
-        lambda x: x.split(',') if isinstance(x, str)
-        else (x if isinstance(x, list) else [])
-    )
+    if 'Gemini 키워드_list' in df_copy.columns:   # 카탈로그 적재 시 나눠 둔 키워드 목록
+        df_copy['Gemini 키워드'] = df_copy['Gemini 키워드_list'].map(list)
+    else:
+        df_copy['Gemini 키워드'] = df_copy['Gemini 키워드'].apply(
+            lambda x: x.split(',') if isinstance(x, str)
+            else (x if isinstance(x, list) else [])
+        )
     df_copy['Gemini문장'] = df_copy['Gemini 키워드'].apply(
         lambda x: ' '.join([t.strip() for t in x])
     )
 
-    if df_copy.empty:
-        return [""] * len(df)
-
-    
-    tfidf = TfidfVectorizer(ngram_range=(1, 2))
-    tfidf_matrix = tfidf.fit_transform(df_copy['Gemini문장'])
-    sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    orig_pos = np.flatnonzero(df.index.isin(df_copy.index))    # 원본 순서 유지용(최후 tie)
 
-    
-    copy_to_global = df_copy.index.to_numpy()                 # df 인덱스
-    global_to_pos  = {g:i for i,g in enumerate(df.index)}     # 원본 순서 유지용(최후 tie)
-
-  
     if tiebreak_col in df_copy.columns:
         tb_viewers = pd.to_numeric(df_copy[tiebreak_col], errors='coerce').fillna(-np.inf).to_numpy()
     else:
-        
         tb_viewers = np.full(len(df_copy), -np.inf)
+    return df_copy, orig_pos, tb_viewers
 
-    results_map = {}
-    for local_idx in range(len(df_copy)):
-        sims = sim[local_idx].copy()
-        sims[local_idx] = -np.inf  
-
-        
-        cand = pd.DataFrame({
-            'local_idx': np.arange(len(df_copy)),
-            'sim': sims,
-            'viewers': tb_viewers
-        })
-        cand = cand[cand['local_idx'] != local_idx].copy()
-
-        
-        cand['orig_pos'] = cand['local_idx'].map(lambda li: global_to_pos[copy_to_global[li]])
-
-        
-        cand = cand.sort_values(
-            by=['sim', 'viewers', 'orig_pos'],
-            ascending=[False, False, True],
-            kind='mergesort'  
-        )
 
-        top_local  = cand['local_idx'].to_numpy()[:top_k]
-        top_global = copy_to_global[top_local]
-        titles     = df.loc[top_global, '영화명'].tolist()
+def format_similars(df, df_copy, orig_pos, top_local):
+    """로컬 인덱스로 된 top-k 결과를 원본 df 순서의 '영화명, 영화명, ...' 문자열 리스트로 바꿉니다."""
+    titles = df_copy['영화명'].to_numpy()
+    out = [""] * len(df)
+    for local_idx, pos in enumerate(orig_pos):
+        out[pos] = ", ".join(titles[top_local[local_idx]].tolist())
+    return out
 
-        me_global = copy_to_global[local_idx]
-        results_map[me_global] = titles
 
-    
-    out = []
-    for ridx in df.index:
-        out.append(", ".join(results_map.get(ridx, [])))
-    return out
+@traced('similars.find_similars')
+def find_similars(df, top_k=5, tiebreak_col='매력도', block_size=256):
+    with span('similars.prepare', rows=len(df)):
+        df_copy, orig_pos, tb_viewers = prepare_similar_inputs(df, tiebreak_col)
+
+    if df_copy.empty:
+        return [""] * len(df)
+
+    with span('similars.tfidf_fit', rows=len(df_copy)):
+        tfidf = TfidfVectorizer(ngram_range=(1, 2))
+        tfidf_matrix = tfidf.fit_transform(df_copy['Gemini문장'])
+
+    top_local = topk_similar_indices(tfidf_matrix, tb_viewers, orig_pos, top_k=top_k, block_size=block_size)
+    with span('similars.format', rows=len(df)):
+        return format_similars(df, df_copy, orig_pos, top_local)
 
 
 # 경쟁작 추천 함수
-def find_competitors(df):
-    df['개봉날짜'] = pd.to_datetime(df['개봉일'], format='%Y%m%d', errors='coerce')
-    competitors_list = []
-    for idx, row in df.iterrows():
-        movie_name = row['영화명']
-        release_date = row['개봉날짜']
-        if pd.isna(release_date):
-            competitors_list.append("")
-            continue
-        start_date = release_date - pd.Timedelta(days=7)
-        end_date = release_date + pd.Timedelta(days=7)
-        competitors_df = df[
-            (df['개봉날짜'] >= start_date) &
-            (df['개봉날짜'] <= end_date) &
-            (df['영화명'] != movie_name)
-        ].copy()
-        competitors_df = competitors_df.sort_values(by='개봉날짜').head(5)
-        competitors_titles = competitors_df['영화명'].tolist()
-        competitors_list.append(", ".join(competitors_titles))
-    df.drop('개봉날짜', axis=1, inplace=True)
-    return competitors_list
+@traced('competitors.find_competitors')
+def find_competitors(df, window_days=7, top_n=5):
+    """
+    개봉일 기준 ±window_days일 안에 개봉한 다른 영화를 개봉일 순으로 최대 top_n개 찾습니다.
+    개봉일로 정렬한 뒤 searchsorted로 각 영화의 구간을 찾으므로 O(n log n)이며, df는 수정하지 않습니다.
+    """
+    if '개봉날짜' in df.columns:   # 카탈로그 적재 시 변환해 둔 날짜
+        release = df['개봉날짜'].to_numpy()
+    else:
+        release = pd.to_datetime(df['개봉일'], format='%Y%m%d', errors='coerce').to_numpy()
+    titles = df['영화명'].to_numpy()
+    competitors_list = [""] * len(df)
+
+    valid = np.flatnonzero(~pd.isna(release))
+    if len(valid) == 0:
+        return competitors_list
 
+    # (개봉일, 원본 순서)로 정렬합니다.
+    order = valid[np.argsort(release[valid], kind='stable')]
+    sorted_dates = release[order]
+    delta = np.timedelta64(window_days, 'D')
+    lo = np.searchsorted(sorted_dates, sorted_dates - delta, side='left')
+    hi = np.searchsorted(sorted_dates, sorted_dates + delta, side='right')
+
+    # 기존 구현은 구간을 원본 순서로 모은 뒤 quicksort로 정렬했습니다.
+    # numpy quicksort는 16개 이하에서는 삽입 정렬이라 안정적이므로 (개봉일, 원본 순서)와 같고,
+    # 그보다 큰 구간이나 제목이 중복된 영화는 같은 정렬을 그대로 재현합니다.
+    dup_title = pd.Series(titles[order]).duplicated(keep=False).to_numpy()
+    simple = (hi - lo - 1 <= 16) & ~dup_title
+
+    for pos in np.flatnonzero(simple):
+        cand = order[lo[pos]:min(hi[pos], lo[pos] + top_n + 1)]
+        cand = cand[cand != order[pos]][:top_n]
+        competitors_list[order[pos]] = ", ".join(titles[cand].tolist())
+
+    for pos in np.flatnonzero(~simple):
+        me = order[pos]
+        window = np.sort(order[lo[pos]:hi[pos]])
+        window = window[titles[window] != titles[me]]
+        cand = window[np.argsort(release[window], kind='quicksort')][:top_n]
+        competitors_list[me] = ", ".join(titles[cand].tolist())
+    return competitors_list
@@ -0,0 +1,175 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# 실제 카탈로그(영화DB(임시).csv)에 나오는 값들입니다.
+GENRES = ['드라마', '판타지', '어드벤처', '다큐멘터리', '애니메이션', '가족', '코미디', '뮤지컬', '액션', 'SF',
+          '미스터리', '스릴러', '사극', '멜로/로맨스', '범죄', '전쟁', '공포(호러)', '기타']
+COUNTRIES = ['한국', '미국', '홍콩', '일본', '캐나다', '영국', '프랑스', '벨기에', '호주', '중국', '아일랜드', '기타',
+             '독일', '불가리아']
+# 국가는 대부분 한 곳이고 한국/미국이 많습니다.
+COUNTRY_WEIGHTS = [0.45, 0.3, 0.02, 0.08, 0.02, 0.03, 0.03, 0.005, 0.01, 0.02, 0.005, 0.01, 0.01, 0.01]
+GEMINI_KEYWORDS = ['영감을 주는', '역사적', '성장', '우울한', '가족', '마음이 따뜻해지는', '시골', '가볍고 유쾌한',
+                   '판타지 세계', '우정', '정치', '희망적인', '긴장감 있는', '도시', '생존', '학교', '폭력적인', '범죄',
+                   '현대', '복수', '서스펜스 있는', '냉혹한', '유머러스한', '로맨틱한', '사랑/로맨스', '비장한', '전쟁',
+                   '정의', '군대', '어두운', '미래', '권력', '구원', '기술', '정체성', '우주', '배신', '종말 이후', '슬픔',
+                   '디스토피아', '씁쓸한', '정신 건강', '애상적인']
+TMDB_KEYWORDS = ['friendship', 'revenge', 'based on novel', 'family', 'police', 'murder', 'love', 'war', 'survival',
+                 'time travel', 'school', 'sequel', 'superhero', 'monster', 'biography', 'music', 'road trip',
+                 'small town', 'dystopia', 'aftercreditsstinger', 'duringcreditsstinger', 'based on video game',
+                 'coming of age', 'heist', 'zombie', 'kidnapping', 'corruption', 'space', 'robot', 'magic']
+COMPANIES = ['CJ ENM', '롯데엔터테인먼트', '쇼박스', 'NEW', '워너브러더스 코리아(주)', '월트디즈니컴퍼니코리아',
+             '소니픽쳐스엔터테인먼트코리아', '유니버설픽쳐스인터내셔널 코리아', '플러스엠 엔터테인먼트', '메가박스중앙(주)',
+             '(주)바른손이앤에이', '(주)에이스메이커무비웍스', '(주)키다리스튜디오', '(주)영화사 진진', '(주)영화사 집']
+SURNAMES = list('김이박최정강조윤장임한오서신권황안송류홍')
+NAME_SYLLABLES = list('민서준지현우도윤하은수아예진태희성재영미경호석훈나연유정승혜동채')
+TITLE_WORDS = ['사랑', '밤', '바다', '도시', '그림자', '기억', '별', '겨울', '여름', '비밀', '약속', '전쟁', '소년',
+               '소녀', '마지막', '첫', '하늘', '거리', '꿈', '노래', '시간', '경찰', '범죄', '가족', '친구', '왕',
+               '괴물', '유령', '탈출', '작전', '영웅', '미래', '우주', '학교', '복수', '정의', '바람', '불꽃', '길',
+               '집', '섬', '숲', '강', '달', '태양', '눈물', '웃음', '편지', '여행', '모험']
+TITLE_PREFIXES = ['', '', '', '극장판 ', '더 ', '나의 ', '우리들의 ', '위대한 ', '슬픈 ', '작은 ', '검은 ', '푸른 ']
+PLOT_TEMPLATES = ["{0}에서 {1}을(를) 찾아 떠난 {2}의 이야기.", "{2}은(는) {0}의 {1} 때문에 모든 것을 잃는다.",
+                  "평범했던 {2}에게 {1}이(가) 찾아오고, {0}은(는) 다시는 예전으로 돌아갈 수 없다."]
+
+# 파이프라인이 채우는 출력 컬럼입니다. 합성 카탈로그에서는 비워 둡니다.
+OUTPUT_COLUMNS = ['유사작', '경쟁작', '예측 매력도']
+COLUMNS = ['영화명', '장르', '배우', '감독', '제작사', '상영시간', '개봉일', '줄거리', 'url', 'TMDB 키워드',
+           'Gemini 키워드', '국가', '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)', '누적 관객수',
+           '온라인 판매실적(당월)', '온라인 판매실적(익월)', '온라인 판매실적(익익월)', '매력도'] + OUTPUT_COLUMNS
+
+
+def _pick(rng, pool, n, p=None):
+    return np.asarray(pool, dtype=object)[rng.choice(len(pool), size=n, p=p)]
+
+
+def _distinct(rng, n, m, k, chunk=100000):
+    """행마다 0..m-1 중 서로 다른 k개를 뽑습니다. (n, k) 배열"""
+    out = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        out[start:stop] = rng.random((stop - start, m), dtype=np.float32).argsort(axis=1)[:, :k]
+    return out
+
+
+def _join(parts, counts, sep):
+    """parts[:, j]를 행마다 앞에서 counts개만 sep으로 이어 붙입니다. (object 배열 연산)"""
+    out = parts[:, 0].copy()
+    for j in range(1, parts.shape[1]):
+        more = counts > j
+        out[more] = out[more] + sep + parts[more, j]
+    return out
+
+
+def _with_missing(rng, values, rate):
+    values = values.astype(object)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+def _names(rng, n):
+    """'김민서' 형태의 사람 이름 n개"""
+    surname = _pick(rng, SURNAMES, n)
+    return surname + _pick(rng, NAME_SYLLABLES, n) + _pick(rng, NAME_SYLLABLES, n)
+
+
+def format_audience(count):
+    """누적 관객수를 원본과 같은 문자열로 만듭니다. ('471만', '6.1만', 1만 미만은 '0' 등 숫자 그대로)"""
+    count = np.asarray(count, dtype=np.int64)
+    man = count / 10000
+    big = pd.Series(np.round(man).astype(np.int64)).astype(str) + '만'
+    small = pd.Series(np.round(man, 1)).map('{:.1f}'.format) + '만'
+    plain = pd.Series(count).astype(str)
+    return np.where(count >= 100000, big, np.where(count >= 10000, small, plain)).astype(object)
+
+
+def make_catalog(n, seed=0, n_people=20000):
+    """
+    실제 카탈로그와 같은 스키마의 합성 영화 DB를 n행 만듭니다. 같은 (n, seed)면 항상 같은 결과입니다.
+    - 장르/국가/배우/제작사는 ', '로, 'Gemini 키워드'는 ','로 이어 붙인 문자열 (키워드는 항상 서로 다른 3개)
+    - '개봉일'은 yyyymmdd 형태의 float, '누적 관객수'는 '471만' 같은 문자열
+    - 결측 비율도 원본과 비슷하게 넣고, 유사작/경쟁작/예측 매력도는 비워 둡니다.
+    """
+    rng = np.random.default_rng(seed)
+    people = np.unique(_names(rng, n_people))
+
+    prefix = _pick(rng, TITLE_PREFIXES, n)
+    title = prefix + _pick(rng, TITLE_WORDS, n) + ' ' + _pick(rng, TITLE_WORDS, n)
+    subtitle = rng.random(n) < 0.3
+    title[subtitle] = title[subtitle] + ': ' + _pick(rng, TITLE_WORDS, subtitle.sum()) + '의 ' + \
+        _pick(rng, TITLE_WORDS, subtitle.sum())
+    sequel = rng.random(n) < 0.15
+    title[sequel] = title[sequel] + ' ' + rng.integers(2, 6, sequel.sum()).astype(str).astype(object)
+
+    genre_idx = _distinct(rng, n, len(GENRES), 3)
+    genres = _join(np.asarray(GENRES, dtype=object)[genre_idx], rng.choice(3, n, p=[0.4, 0.45, 0.15]) + 1, ', ')
+    keyword_idx = _distinct(rng, n, len(GEMINI_KEYWORDS), 3)
+    keywords = _join(np.asarray(GEMINI_KEYWORDS, dtype=object)[keyword_idx], np.full(n, 3), ',')
+    country = _pick(rng, COUNTRIES, n, p=np.asarray(COUNTRY_WEIGHTS) / sum(COUNTRY_WEIGHTS))
+    co_made = rng.random(n) < 0.1
+    country[co_made] = country[co_made] + ', ' + _pick(rng, COUNTRIES, co_made.sum())
+
+    actors = _join(np.stack([_pick(rng, people, n) for _ in range(4)], axis=1), rng.integers(1, 5, n), ', ')
+    companies = _join(np.stack([_pick(rng, COMPANIES, n) for _ in range(2)], axis=1), rng.integers(1, 3, n), ', ')
+    tmdb = _join(np.stack([_pick(rng, TMDB_KEYWORDS, n) for _ in range(6)], axis=1), rng.integers(2, 7, n), ', ')
+    plot = np.array([PLOT_TEMPLATES[t].format(a, b, c) for t, a, b, c in
+                     zip(rng.integers(0, len(PLOT_TEMPLATES), n), _pick(rng, TITLE_WORDS, n),
+                         _pick(rng, TITLE_WORDS, n), _pick(rng, people, n))], dtype=object)
+
+    days = rng.integers(0, (pd.Timestamp('2025-12-31') - pd.Timestamp('1992-01-01')).days, n)
+    release = pd.Timestamp('1992-01-01') + pd.to_timedelta(days, unit='D')
+    release = (release.year * 10000 + release.month * 100 + release.day).to_numpy().astype(float)
+
+    # 인기(관심도)를 중심으로 관객수·판매실적·매력도가 함께 움직이도록 만듭니다.
+    popularity = rng.lognormal(8.0, 1.2, n)
+    audience = np.where(rng.random(n) < 0.15, 0, popularity * rng.lognormal(3.0, 1.0, n))
+    sales = popularity[:, None] * rng.lognormal(2.0, 0.8, (n, 3))
+    charm = sales.sum(axis=1) * rng.lognormal(0.0, 0.3, n)
+
+    df = pd.DataFrame({
+        '영화명': title,
+        '장르': genres,
+        '배우': _with_missing(rng, actors, 0.04),
+        '감독': _with_missing(rng, _pick(rng, people, n), 0.04),
+        '제작사': _with_missing(rng, companies, 0.01),
+        '상영시간': _with_missing(rng, np.clip(rng.normal(110, 18, n), 37, 192).round(), 0.01).astype(float),
+        '개봉일': _with_missing(rng, release, 0.01).astype(float),
+        '줄거리': _with_missing(rng, plot, 0.06),
+        'url': _with_missing(rng, 'https://image.tmdb.org/t/p/w500/' +
+                             pd.Series(rng.integers(0, 2 ** 62, n)).map('{:016x}'.format).to_numpy(dtype=object) +
+                             '.jpg', 0.05),
+        'TMDB 키워드': _with_missing(rng, tmdb, 0.16),
+        'Gemini 키워드': keywords,
+        '국가': country,
+        '실관람객 평점': _with_missing(rng, rng.uniform(4, 10, n).round(3), 0.01).astype(float),
+        '네티즌 평점': _with_missing(rng, rng.uniform(3, 10, n).round(2), 0.01).astype(float),
+        '네이버 관심도(찜)': np.minimum(popularity, 99999).astype(np.int64),
+        '누적 관객수': _with_missing(rng, format_audience(audience), 0.01),
+        '온라인 판매실적(당월)': sales[:, 0].astype(np.int64),
+        '온라인 판매실적(익월)': sales[:, 1].astype(np.int64).astype(str).astype(object),
+        '온라인 판매실적(익익월)': sales[:, 2].astype(np.int64).astype(str).astype(object),
+        '매력도': charm.astype(np.int64),
+    })
+    df['유사작'] = np.full(n, np.nan, dtype=object)
+    df['경쟁작'] = np.full(n, np.nan, dtype=object)
+    df['예측 매력도'] = np.nan
+    # CSV에서 읽은 것과 같은 dtype(str)으로 맞춥니다.
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype('str')
+    return df[COLUMNS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="실제 스키마와 같은 합성 영화 DB를 만듭니다.")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('out', help="저장할 경로 (.csv 또는 .feather)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    catalog = make_catalog(args.rows, seed=args.seed)
+    if args.out.endswith('.csv'):
+        catalog.to_csv(args.out, index=False, encoding='utf-8-sig')
+    else:
+        from steps.catalog_store import save_catalog
+        save_catalog(catalog, args.out)
+    print(f"✅ {len(catalog):,}행을 '{args.out}' 파일로 저장했습니다.")
@@ -0,0 +1,304 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from logging.handlers import RotatingFileHandler
+
+# 환경 변수로 켭니다. (기본은 꺼져 있고, 꺼져 있으면 span/traced는 거의 비용이 없습니다)
+#   MOVIE_TELEMETRY=1          구간별 시간/CPU/행 수 기록
+#   MOVIE_TELEMETRY_MEMORY=0   tracemalloc 최대 할당량 측정을 끕니다. (켜 두면 파이썬 코드가 느려집니다)
+#   MOVIE_TELEMETRY_DIR        기록 폴더 (기본 ./data/telemetry)
+TELEMETRY_DIR = './data/telemetry'
+SPAN_LOG = 'spans.jsonl'
+METRICS_FILE = 'metrics.prom'
+
+
+class _Config:
+    def __init__(self):
+        self.enabled = os.environ.get('MOVIE_TELEMETRY', '0').lower() not in ('', '0', 'false', 'off')
+        self.trace_memory = os.environ.get('MOVIE_TELEMETRY_MEMORY', '1').lower() not in ('0', 'false', 'off')
+        self.log_dir = os.environ.get('MOVIE_TELEMETRY_DIR', TELEMETRY_DIR)
+        self.max_bytes = 5 * 1024 * 1024
+        self.backups = 3
+
+
+_config = _Config()
+_local = threading.local()
+_lock = threading.Lock()
+_run_ids = itertools.count(1)
+_logger = None
+_metrics = {}
+# tracemalloc으로 메모리를 재고 있는 열린 구간 (모든 스레드)
+_memory_spans = set()
+
+
+def configure(enabled=None, trace_memory=None, log_dir=None, max_bytes=None, backups=None):
+    """실행 중에 설정을 바꿉니다. (테스트/CLI용) 기록 폴더가 바뀌면 로그 파일을 다시 엽니다."""
+    global _logger
+    with _lock:
+        if enabled is not None:
+            _config.enabled = enabled
+        if trace_memory is not None:
+            _config.trace_memory = trace_memory
+        if max_bytes is not None:
+            _config.max_bytes = max_bytes
+        if backups is not None:
+            _config.backups = backups
+        if log_dir is not None and log_dir != _config.log_dir:
+            _config.log_dir = log_dir
+            _metrics.clear()
+        if _logger is not None:
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+                handler.close()
+            _logger = None
+
+
+def enabled():
+    return _config.enabled
+
+
+def _span_logger():
+    """spans.jsonl에 한 줄씩 쓰는 로거. max_bytes를 넘으면 spans.jsonl.1, .2 ... 로 돌려 씁니다."""
+    global _logger
+    if _logger is None:
+        os.makedirs(_config.log_dir, exist_ok=True)
+        logger = logging.getLogger('movie.telemetry')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(os.path.join(_config.log_dir, SPAN_LOG), maxBytes=_config.max_bytes,
+                                      backupCount=_config.backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+class _NoopSpan:
+    """꺼져 있을 때 돌려주는 빈 구간 (모든 호출이 공유합니다)"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def _status(exc_type):
+    if exc_type is None:
+        return 'ok'
+    # Streamlit의 st.rerun()/st.stop() 등 Exception이 아닌 제어용 예외는 오류로 세지 않습니다.
+    return 'error' if issubclass(exc_type, Exception) else 'interrupted'
+
+
+class Span:
+    """
+    한 구간의 벽시계 시간, 스레드 CPU 시간, tracemalloc 최대 할당량, 처리 행 수를 잽니다.
+    같은 스레드에서 열린 구간은 중첩되며, 가장 바깥 구간 하나가 한 번의 실행(run)입니다.
+    tracemalloc의 최대값은 프로세스 전체에 하나뿐이라, 다른 스레드의 구간과 시간이 겹친 구간은
+    최대 할당량을 믿을 수 없으므로 None으로 기록합니다.
+    """
+
+    def __init__(self, name, rows=None, **attrs):
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        self.run_id = self.parent.run_id if self.parent else f"{os.getpid()}-{next(_run_ids)}"
+        self.depth = len(stack)
+        self.peak = None
+        self.thread_id = threading.get_ident()
+        self.overlapped = False
+        if _config.trace_memory:
+            with _lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                # 다른 스레드의 구간이 열려 있으면 그 구간과 이 구간 모두 최대 할당량을 기록하지 않습니다.
+                if any(other.thread_id != self.thread_id for other in _memory_spans):
+                    self.overlapped = True
+                    for other in _memory_spans:
+                        other.overlapped = True
+                current, peak = tracemalloc.get_traced_memory()
+                if self.parent is not None and self.parent.peak is not None:
+                    self.parent.peak = max(self.parent.peak, peak)
+                # 같은 스레드의 구간끼리는 최대값을 새로 재고, 끝나면 바깥 구간의 최대값에 합칩니다.
+                tracemalloc.reset_peak()
+                self.start_memory = self.peak = current
+                _memory_spans.add(self)
+        stack.append(self)
+        self.started_at = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        _local.stack.pop()
+        peak_alloc = None
+        if self.peak is not None:
+            with _lock:
+                _memory_spans.discard(self)
+                if tracemalloc.is_tracing():
+                    self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+                    if self.parent is not None and self.parent.peak is not None:
+                        self.parent.peak = max(self.parent.peak, self.peak)
+                    if not self.overlapped:
+                        peak_alloc = self.peak - self.start_memory
+        record = {
+            'run': self.run_id,
+            'span': self.name,
+            'parent': self.parent.name if self.parent else None,
+            'depth': self.depth,
+            'started_at': self.started_at,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'peak_alloc_bytes': peak_alloc,
+            'rows': self.rows,
+            'status': _status(exc_type),
+            'error': None if exc_type is None else exc_type.__name__,
+            'thread': threading.current_thread().name,
+        }
+        if self.attrs:
+            record['attrs'] = self.attrs
+        _emit(record)
+        return False
+
+
+def span(name, rows=None, **attrs):
+    """
+    with span('similars.tfidf_fit', rows=len(df)) as s: ...
+    행 수는 구간 안에서 s.rows = n 으로 나중에 정할 수도 있습니다. 꺼져 있으면 빈 구간을 반환합니다.
+    """
+    if not _config.enabled:
+        return _NOOP
+    return Span(name, rows, **attrs)
+
+
+def _row_count(args, rows_arg):
+    if rows_arg is None or len(args) <= rows_arg:
+        return None
+    value = args[rows_arg]
+    if hasattr(value, '__len__') and not isinstance(value, str):
+        return len(value)
+    return None
+
+
+def traced(name, rows_arg=0):
+    """
+    함수 전체를 span으로 감싸는 데코레이터입니다.
+    rows_arg번째 위치 인자(DataFrame 등)의 길이를 행 수로 기록합니다. (메서드는 self 다음인 1, 없으면 None)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _config.enabled:
+                return func(*args, **kwargs)
+            with Span(name, _row_count(args, rows_arg)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _emit(record):
+    line = json.dumps(record, ensure_ascii=False)
+    with _lock:
+        stats = _metrics.setdefault(record['span'], {'count': 0, 'errors': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                                     'rows': 0, 'last_wall_s': 0.0, 'max_peak_alloc_bytes': 0})
+        stats['count'] += 1
+        stats['errors'] += record['status'] == 'error'
+        stats['wall_s'] += record['wall_s']
+        stats['cpu_s'] += record['cpu_s']
+        stats['rows'] += record['rows'] or 0
+        stats['last_wall_s'] = record['wall_s']
+        stats['max_peak_alloc_bytes'] = max(stats['max_peak_alloc_bytes'], record['peak_alloc_bytes'] or 0)
+        try:
+            _span_logger().info(line)
+            # Prometheus 파일은 실행(가장 바깥 구간)이 끝날 때만 다시 씁니다.
+            if record['depth'] == 0:
+                _write_metrics()
+        except OSError:
+            pass
+
+
+# (지표 이름, 종류, 설명, 통계 키)
+METRICS = [
+    ('movie_span_calls_total', 'counter', "구간 실행 횟수", 'count'),
+    ('movie_span_errors_total', 'counter', "예외로 끝난 구간 실행 횟수", 'errors'),
+    ('movie_span_seconds_total', 'counter', "구간 벽시계 시간 합계(초)", 'wall_s'),
+    ('movie_span_cpu_seconds_total', 'counter', "구간 스레드 CPU 시간 합계(초)", 'cpu_s'),
+    ('movie_span_rows_total', 'counter', "구간에서 처리한 행 수 합계", 'rows'),
+    ('movie_span_last_seconds', 'gauge', "마지막 실행의 벽시계 시간(초)", 'last_wall_s'),
+    ('movie_span_peak_alloc_bytes', 'gauge', "tracemalloc 최대 할당량의 최댓값(바이트)", 'max_peak_alloc_bytes'),
+]
+
+
+def prometheus_text():
+    """이 프로세스가 시작된 뒤의 구간별 누적 지표를 Prometheus 텍스트 형식으로 만듭니다."""
+    lines = []
+    for metric, kind, help_text, key in METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, stats in sorted(_metrics.items()):
+            lines.append(f'{metric}{{span="{name}",pid="{os.getpid()}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_metrics():
+    # node_exporter textfile collector 등이 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+    path = os.path.join(_config.log_dir, METRICS_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def read_spans(log_dir=None, max_files=None):
+    """spans.jsonl(과 돌려 쓴 이전 파일)의 기록을 오래된 것부터 읽습니다. 깨진 줄은 건너뜁니다."""
+    log_dir = log_dir or _config.log_dir
+    path = os.path.join(log_dir, SPAN_LOG)
+    n_files = _config.backups if max_files is None else max_files
+    paths = [f"{path}.{i}" for i in range(n_files, 0, -1)] + [path]
+    records = []
+    for p in paths:
+        try:
+            with open(p, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return records
+
+
+def recent_runs(n=10, log_dir=None):
+    """
+    최근 n번의 실행을 최신순으로 반환합니다. 실행마다 가장 바깥 구간(root)과 안쪽 구간(spans, 시작 순)을 묶습니다.
+    다른 프로세스(python main.py 등)의 실행도 보이도록 로그 파일에서 읽습니다.
+    """
+    runs = {}
+    for record in read_spans(log_dir):
+        run = runs.setdefault(record['run'], {'run': record['run'], 'root': None, 'spans': []})
+        if record['depth'] == 0:
+            run['root'] = record
+        run['spans'].append(record)
+    finished = [run for run in runs.values() if run['root'] is not None]
+    finished.sort(key=lambda run: run['root']['started_at'], reverse=True)
+    for run in finished[:n]:
+        run['spans'].sort(key=lambda record: record['started_at'])
+    return finished[:n]
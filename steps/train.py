@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import ExtraTreesRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.model_selection import KFold
+
+from steps.catalog_store import write_atomic
+from steps.features import FEATURE_COLUMNS, AttractivenessFeatures, prepare_training_frame, row_hashes
+from steps.telemetry import traced
+
+try:
+    import xgboost as xgb
+except ImportError:  # xgboost가 없으면 해당 후보만 건너뜁니다.
+    xgb = None
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+TRAINING_CSV = './data/DB(사전학습용).csv'
+MODELS_DIR = './data/models'
+MODEL_PATH = './steps/rf_weighted_model.pkl'
+ENCODER_PATH = './steps/ordinal_encoder.pkl'
+
+# ML.ipynb 테스트 데이터 분류 정확도 구간 (5만 미만 / 5만 이상 / 10만 이상 / 50만 이상)
+BUCKET_EDGES = [0, 50000, 100000, 500000]
+BUCKET_LABELS = ['5만 미만', '5만 이상', '10만 이상', '50만 이상']
+
+
+def smape(y_true, y_pred):
+    """ML.ipynb의 SMAPE(%)와 같습니다."""
+    y_true, y_pred = np.asarray(y_true, dtype=float), np.asarray(y_pred, dtype=float)
+    numerator = np.abs(y_pred - y_true)
+    denominator = (np.abs(y_true) + np.abs(y_pred)) / 2
+    return float(np.mean(numerator / np.maximum(denominator, 1e-8)) * 100)
+
+
+def bucket(values):
+    """pd.cut(bins=[0, 5만, 10만, 50만, inf], right=False)와 같은 구간 번호 (0 미만은 -1)"""
+    return np.searchsorted(BUCKET_EDGES, np.asarray(values, dtype=float), side='right') - 1
+
+
+def bucket_accuracy(y_true, y_pred):
+    return float(np.mean(bucket(y_true) == bucket(y_pred)))
+
+
+def create_sample_weights(y, extreme_weight=10):
+    """ML.ipynb와 같이 상위/하위 30% 밖의 극단값에 가중치를 줍니다."""
+    y = np.asarray(y, dtype=float)
+    weights = np.ones(len(y))
+    extreme = (y > np.percentile(y, 70)) | (y < np.percentile(y, 30))
+    weights[extreme] = extreme_weight
+    return weights
+
+
+def available_kinds():
+    kinds = ['rf', 'extratrees', 'hist_gb']
+    if xgb is not None:
+        kinds += ['xgb', 'xgb_rf']
+    if lgb is not None:
+        kinds.append('lgbm')
+    return kinds
+
+
+def make_model(kind, params, seed=42):
+    """후보 모델을 만듭니다. 병렬 처리는 작업(fold×설정) 단위로 하므로 모델 자체는 한 스레드만 씁니다."""
+    if kind == 'rf':
+        return RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+    if kind == 'extratrees':
+        return ExtraTreesRegressor(random_state=seed, n_jobs=1, **params)
+    if kind == 'hist_gb':
+        return HistGradientBoostingRegressor(random_state=seed, **params)
+    if kind == 'xgb':
+        return xgb.XGBRegressor(objective='reg:squarederror', random_state=seed, n_jobs=1, **params)
+    if kind == 'xgb_rf':
+        return xgb.XGBRFRegressor(random_state=seed, n_jobs=1, **params)
+    if kind == 'lgbm':
+        return lgb.LGBMRegressor(random_state=seed, n_jobs=1, verbose=-1, **params)
+    raise ValueError(f"알 수 없는 모델 종류: {kind}")
+
+
+# 모델 종류별 하이퍼파라미터 후보 (ML.ipynb의 설정을 포함합니다)
+PARAM_GRIDS = {
+    'rf': {'n_estimators': [100, 200], 'max_features': [1.0, 'sqrt'], 'min_samples_leaf': [1, 3]},
+    'extratrees': {'n_estimators': [100, 200], 'max_features': [1.0, 'sqrt'], 'min_samples_leaf': [1, 3]},
+    'hist_gb': {'learning_rate': [0.05, 0.1], 'max_leaf_nodes': [7, 15], 'min_samples_leaf': [5, 10]},
+    'xgb': {'n_estimators': [100, 300], 'max_depth': [3, 6], 'learning_rate': [0.05, 0.3]},
+    'xgb_rf': {'n_estimators': [200], 'max_depth': [6]},
+    'lgbm': {'n_estimators': [100, 300], 'num_leaves': [7, 15], 'min_child_samples': [5, 10]},
+}
+
+
+def config_name(config):
+    params = ",".join(f"{k}={v}" for k, v in config['params'].items())
+    weight = f" w={config['extreme_weight']}" if config['extreme_weight'] else ""
+    return f"{config['kind']}({params}){weight}"
+
+
+def candidate_configs(kinds=None, extreme_weights=(None, 10)):
+    """모델 종류 × 하이퍼파라미터 × 극단값 가중치(None이면 가중치 없음)의 모든 조합"""
+    configs = []
+    for kind in kinds or available_kinds():
+        grid = PARAM_GRIDS[kind]
+        for values in itertools.product(*grid.values()):
+            for weight in extreme_weights:
+                config = {'kind': kind, 'params': dict(zip(grid, values)), 'extreme_weight': weight}
+                config['name'] = config_name(config)
+                configs.append(config)
+    return configs
+
+
+def data_fingerprint(df):
+    h = hashlib.sha1(row_hashes(df).tobytes())
+    h.update(pd.util.hash_pandas_object(df['매력도'], index=False).to_numpy().tobytes())
+    h.update(json.dumps(FEATURE_COLUMNS, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+@traced('train.fold_features')
+def fold_features(df, n_folds=5, seed=42, cache_dir=os.path.join(MODELS_DIR, 'feature_cache')):
+    """
+    k-fold 분할마다 학습 fold로 인코더를 맞춰(ML.ipynb와 같이) 변환한 feature를 .npz로 저장하고 경로 리스트를 반환합니다.
+    데이터·feature 정의·분할이 같으면 이전 실행의 파일을 그대로 쓰고, 모든 설정이 같은 파일을 공유합니다.
+    """
+    key = f"{data_fingerprint(df)}_k{n_folds}_s{seed}"
+    fold_dir = os.path.join(cache_dir, key)
+    paths = [os.path.join(fold_dir, f"fold{i}.npz") for i in range(n_folds)]
+    if all(os.path.exists(p) for p in paths):
+        return paths
+    os.makedirs(fold_dir, exist_ok=True)
+    y = df['매력도'].to_numpy(dtype=float)
+    splits = KFold(n_splits=n_folds, shuffle=True, random_state=seed).split(df)
+    for path, (train_idx, test_idx) in zip(paths, splits):
+        features = AttractivenessFeatures()
+        x_train = features.fit_transform(df.iloc[train_idx]).to_numpy()
+        x_test = features.transform(df.iloc[test_idx]).to_numpy()
+
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, x_train=x_train, y_train=y[train_idx], x_test=x_test, y_test=y[test_idx],
+                         test_idx=test_idx)
+        write_atomic(path, write)
+    return paths
+
+
+def _fit_fold(job):
+    """작업 하나(설정 × fold): 캐시된 feature로 학습하고 검증 fold 예측값을 반환합니다. (워커 프로세스)"""
+    config, fold, path, seed = job
+    with np.load(path) as data:
+        x_train, y_train, x_test, test_idx = data['x_train'], data['y_train'], data['x_test'], data['test_idx']
+    model = make_model(config['kind'], config['params'], seed)
+    weights = create_sample_weights(y_train, config['extreme_weight']) if config['extreme_weight'] else None
+    start = time.perf_counter()
+    model.fit(pd.DataFrame(x_train, columns=FEATURE_COLUMNS), y_train, sample_weight=weights)
+    fit_s = time.perf_counter() - start
+    y_pred = model.predict(pd.DataFrame(x_test, columns=FEATURE_COLUMNS))
+    return config['name'], fold, test_idx, np.asarray(y_pred, dtype=float), fit_s
+
+
+@traced('train.cross_validate', rows_arg=None)
+def cross_validate(df, configs, n_folds=5, seed=42, n_jobs=None, cache_dir=os.path.join(MODELS_DIR, 'feature_cache'),
+                   on_result=None):
+    """
+    모든 (설정, fold) 작업을 프로세스 풀에서 실행하고 설정별 교차 검증 지표를 SMAPE 오름차순으로 반환합니다.
+    smape_oof / bucket_acc_oof: 모든 fold의 검증 예측(out-of-fold)을 합친 지표
+    smape_mean / smape_std: fold별 SMAPE의 평균과 표준편차
+    """
+    paths = fold_features(df, n_folds, seed, cache_dir)
+    y = df['매력도'].to_numpy(dtype=float)
+    jobs = [(config, fold, path, seed) for config in configs for fold, path in enumerate(paths)]
+    oof = {config['name']: np.full(len(df), np.nan) for config in configs}
+    fold_smape = {config['name']: [] for config in configs}
+    fit_time = {config['name']: 0.0 for config in configs}
+
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        # 작업당 계산량이 작으므로 여러 개씩 묶어 보내 프로세스 간 통신을 줄입니다.
+        chunksize = max(1, len(jobs) // (4 * (n_jobs or os.cpu_count())))
+        for name, fold, test_idx, y_pred, fit_s in pool.map(_fit_fold, jobs, chunksize=chunksize):
+            oof[name][test_idx] = y_pred
+            fold_smape[name].append(smape(y[test_idx], y_pred))
+            fit_time[name] += fit_s
+            if on_result:
+                on_result(name, fold)
+
+    results = []
+    for config in configs:
+        name = config['name']
+        results.append(dict(config, smape_oof=smape(y, oof[name]), bucket_acc_oof=bucket_accuracy(y, oof[name]),
+                            smape_mean=float(np.mean(fold_smape[name])), smape_std=float(np.std(fold_smape[name])),
+                            fit_s=fit_time[name]))
+    results.sort(key=lambda r: (r['smape_oof'], -r['bucket_acc_oof']))
+    return results
+
+
+@traced('train.fit_final')
+def fit_final(df, config, seed=42):
+    """선택한 설정으로 전체 데이터에 인코더와 모델을 학습합니다. (인코더, 모델)"""
+    features = AttractivenessFeatures()
+    x = features.fit_transform(df)
+    y = df['매력도'].to_numpy(dtype=float)
+    weights = create_sample_weights(y, config['extreme_weight']) if config['extreme_weight'] else None
+    model = make_model(config['kind'], config['params'], seed)
+    if config['kind'] in ('rf', 'extratrees'):
+        model.set_params(n_jobs=-1)     # 최종 모델 하나는 모든 코어로 학습합니다.
+    model.fit(x, y, sample_weight=weights)
+    if config['kind'] in ('rf', 'extratrees'):
+        model.set_params(n_jobs=None)   # 저장하는 모델은 ML.ipynb와 같은 기본값으로 둡니다.
+    return features.encoder, model
+
+
+def list_versions(models_dir=MODELS_DIR):
+    """저장된 버전 번호 (오름차순)"""
+    if not os.path.isdir(models_dir):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(models_dir)
+                  if name.startswith('v') and name[1:].isdigit())
+
+
+def version_dir(version, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"v{version:04d}")
+
+
+def read_metrics(version, models_dir=MODELS_DIR):
+    with open(os.path.join(version_dir(version, models_dir), 'metrics.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_version(encoder, model, metrics, models_dir=MODELS_DIR):
+    """
+    인코더/모델/지표를 새 버전 폴더(v0001, v0002, ...)에 저장하고 버전 번호를 반환합니다.
+    임시 폴더에 모두 쓴 뒤 이름을 바꾸므로 다른 프로세스가 쓰다 만 버전을 보지 않습니다.
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    while True:
+        version = (list_versions(models_dir) or [0])[-1] + 1
+        tmp_dir = os.path.join(models_dir, f".v{version:04d}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        joblib.dump(encoder, os.path.join(tmp_dir, 'ordinal_encoder.pkl'))
+        joblib.dump(model, os.path.join(tmp_dir, 'model.pkl'))
+        with open(os.path.join(tmp_dir, 'metrics.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(metrics, version=version), f, ensure_ascii=False, indent=2)
+        try:
+            os.rename(tmp_dir, version_dir(version, models_dir))
+            return version
+        except OSError:  # 같은 번호를 다른 프로세스가 먼저 만들었으면 다음 번호로 다시 시도합니다.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def promote(version, models_dir=MODELS_DIR, model_path=MODEL_PATH, encoder_path=ENCODER_PATH):
+    """
+    버전의 모델/인코더를 파이프라인이 읽는 경로로 원자적으로 복사합니다.
+    파일이 바뀌면 모델 레지스트리와 파이프라인의 매력도 단계가 다음 실행에서 새 모델을 씁니다.
+    """
+    src = version_dir(version, models_dir)
+    for name, dst in (('ordinal_encoder.pkl', encoder_path), ('model.pkl', model_path)):
+        write_atomic(dst, lambda tmp_path, name=name: shutil.copyfile(os.path.join(src, name), tmp_path))
+
+
+@traced('train.train', rows_arg=None)
+def train(csv_path=TRAINING_CSV, kinds=None, n_folds=5, seed=42, n_jobs=None, models_dir=MODELS_DIR,
+          on_result=None):
+    """
+    학습 데이터를 읽어 후보 설정을 k-fold 교차 검증으로 비교하고, 가장 좋은 설정으로 전체 데이터에 다시 학습해
+    새 버전으로 저장합니다. (버전 번호, 설정별 결과 리스트)를 반환합니다.
+    """
+    df = prepare_training_frame(pd.read_csv(csv_path, encoding='utf-8')).reset_index(drop=True)
+    configs = candidate_configs(kinds)
+    start = time.perf_counter()
+    results = cross_validate(df, configs, n_folds=n_folds, seed=seed, n_jobs=n_jobs,
+                             cache_dir=os.path.join(models_dir, 'feature_cache'), on_result=on_result)
+    cv_s = time.perf_counter() - start
+    best = results[0]
+    encoder, model = fit_final(df, best, seed=seed)
+    metrics = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'training_csv': csv_path,
+        'rows': len(df),
+        'data_fingerprint': data_fingerprint(df),
+        'n_folds': n_folds,
+        'seed': seed,
+        'config': {k: best[k] for k in ('name', 'kind', 'params', 'extreme_weight')},
+        'cv': {k: best[k] for k in ('smape_oof', 'bucket_acc_oof', 'smape_mean', 'smape_std')},
+        'cv_seconds': cv_s,
+        'leaderboard': [{k: r[k] for k in ('name', 'smape_oof', 'bucket_acc_oof', 'smape_mean', 'smape_std', 'fit_s')}
+                        for r in results],
+        'env': {'python': platform.python_version(), 'sklearn': sklearn.__version__, 'cpu_count': os.cpu_count()},
+    }
+    return save_version(encoder, model, metrics, models_dir), results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="매력도 예측 모델을 k-fold 교차 검증으로 고르고 버전별로 저장합니다.")
+    parser.add_argument('--csv', default=TRAINING_CSV)
+    parser.add_argument('--models', nargs='+', choices=list(PARAM_GRIDS), default=None,
+                        help="후보 모델 종류 (기본: 설치된 모든 종류)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=None, help="워커 프로세스 수 (기본: 모든 코어)")
+    parser.add_argument('--out', default=MODELS_DIR, help="버전 폴더를 만들 위치")
+    parser.add_argument('--promote', action='store_true',
+                        help=f"학습한 버전을 {MODEL_PATH}, {ENCODER_PATH}로 복사해 파이프라인에서 쓰게 합니다.")
+    parser.add_argument('--top', type=int, default=10, help="출력할 상위 설정 수")
+    args = parser.parse_args()
+
+    missing = [kind for kind in args.models or [] if kind not in available_kinds()]
+    if missing:
+        parser.error(f"설치되지 않은 모델 종류: {', '.join(missing)}")
+    started = time.perf_counter()
+    version, results = train(args.csv, kinds=args.models, n_folds=args.folds, seed=args.seed, n_jobs=args.jobs,
+                             models_dir=args.out)
+    print(f"{len(results)}개 설정 × {args.folds} fold ({time.perf_counter() - started:,.1f}초)")
+    for rank, r in enumerate(results[:args.top], 1):
+        print(f"{rank:>3}. SMAPE {r['smape_oof']:6.2f}% (fold 평균 {r['smape_mean']:.2f}±{r['smape_std']:.2f})  "
+              f"구간 정확도 {r['bucket_acc_oof']:.2f}  {r['name']}")
+    print(f"✅ v{version:04d} 저장: {version_dir(version, args.out)}")
+    if args.promote:
+        promote(version, args.out)
+        print(f"✅ {MODEL_PATH}, {ENCODER_PATH}를 v{version:04d}로 교체했습니다.")
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# steps/ui 모듈을 저장소 루트 기준으로 import합니다. (python -m pytest를 루트에서 실행)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# ui 모듈은 서로를 최상위 이름으로 import합니다. (from catalog_index import ...)
+sys.path.insert(0, os.path.join(ROOT, 'ui'))
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
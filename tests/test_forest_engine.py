@@ -0,0 +1,65 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from steps import forest_engine
+from steps.forest_engine import FlatForest
+
+needs_numba = pytest.mark.skipif(forest_engine.njit is None, reason="numba가 설치되어 있지 않습니다.")
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=[f'f{i}' for i in range(5)])
+    y = X['f0'] * 2 + np.sin(X['f1'] * 3) + rng.normal(scale=0.1, size=len(X))
+    model = RandomForestRegressor(n_estimators=30, max_depth=12, random_state=0).fit(X, y)
+    X_test = pd.DataFrame(rng.normal(size=(1003, 5)), columns=X.columns)   # LANES로 나누어떨어지지 않는 행 수
+    return model, X_test
+
+
+def test_tree_depths_match_sklearn(fitted):
+    model, _ = fitted
+    forest = FlatForest.from_sklearn(model)
+    assert forest._tree_depths().tolist() == [est.tree_.max_depth for est in model.estimators_]
+
+
+@needs_numba
+def test_numba_matches_sklearn(fitted):
+    model, X = fitted
+    forest = FlatForest.from_sklearn(model)
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=0, atol=1e-12)
+    # 블록 크기와 관계없이 같은 결과를 냅니다.
+    np.testing.assert_allclose(forest.predict(X, block=7), model.predict(X), rtol=0, atol=1e-12)
+
+
+def test_numpy_path_matches_sklearn(fitted):
+    model, X = fitted
+    forest = FlatForest.from_sklearn(model)
+    np.testing.assert_allclose(forest.predict(X, use_numba=False), model.predict(X), rtol=0, atol=1e-12)
+
+
+def test_without_numba_uses_sklearn_estimator(fitted, monkeypatch, tmp_path):
+    model, X = fitted
+    model_path = str(tmp_path / 'model.pkl')
+    joblib.dump(model, model_path)
+    forest = FlatForest.from_sklearn(model, source=model_path)
+    npz_path = str(tmp_path / 'model.npz')
+    forest.save(npz_path)
+
+    monkeypatch.setattr(forest_engine, 'njit', None)
+    monkeypatch.setattr(FlatForest, '_predict_unique', lambda self, B: pytest.fail("NumPy 경로를 쓰면 안 됩니다."))
+    loaded = FlatForest.load(npz_path)
+    assert loaded.source == model_path
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    np.testing.assert_array_equal(FlatForest.from_sklearn(model).predict(X), model.predict(X))
+
+
+def test_without_numba_or_source_uses_numpy_path(fitted, monkeypatch):
+    model, X = fitted
+    subset = FlatForest.from_sklearn(model).subset(range(10))   # 잘라낸 후보에는 원본 추정기가 없습니다.
+    monkeypatch.setattr(forest_engine, 'njit', None)
+    expected = np.mean([est.predict(X.to_numpy()) for est in model.estimators_[:10]], axis=0)
+    np.testing.assert_allclose(subset.predict(X), expected, rtol=0, atol=1e-12)
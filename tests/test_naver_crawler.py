@@ -0,0 +1,75 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from conftest import FIXTURES
+from steps.naver_crawler import HttpFetcher, crawl_titles
+
+PAGES_DIR = os.path.join(FIXTURES, 'naver_pages')
+
+
+class SavedPageHandler(BaseHTTPRequestHandler):
+    """검색어('<제목> 영화')의 제목과 같은 이름의 저장된 HTML을 돌려주는 네이버 검색 대체 서버"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get('query', [''])[0]
+        path = os.path.join(PAGES_DIR, f"{query.removesuffix(' 영화')}.html")
+        if url.path != '/search.naver' or not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def search_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SavedPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/search.naver"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_crawl_titles_against_local_server(search_server):
+    expected = {
+        'normal_man': ('9.56', '12345', '13120000'),
+        'audience_eok': ('8.10', '98765', '123450000'),
+        'no_audience_dt': ('0.00', '2001', 'N/A'),
+        'missing_section': ('Not Found', 'Not Found', 'Not Found'),
+        'no_such_page': ('Error', 'Error', 'Error'),   # 404는 수집 실패로 기록됩니다.
+    }
+    titles = list(expected)
+    fetcher = HttpFetcher(base_url=search_server, timeout=5)
+    results = list(crawl_titles(titles, fetcher, n_workers=2, rate=None))
+    fetcher.close()
+
+    assert sorted(i for i, _, _ in results) == list(range(len(titles)))
+    for i, title, values in results:
+        assert titles[i] == title
+        assert values == expected[title]
+
+
+def test_crawl_titles_rate_limited(search_server):
+    titles = ['normal_man', 'audience_plain', 'netizen_rating_only']
+    results = crawl_titles(titles, HttpFetcher(base_url=search_server, timeout=5), n_workers=3, rate=50.0, burst=1)
+    by_title = {title: values for _, title, values in results}
+    assert by_title == {
+        'normal_man': ('9.56', '12345', '13120000'),
+        'audience_plain': ('8.0', '45', '9876'),
+        'netizen_rating_only': ('8.45', '77', '1200000'),
+    }
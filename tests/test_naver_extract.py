@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from steps.naver_extract import EXTRACTORS, benchmark, check_equivalence, extract_bs4, load_pages, parse_movie_page
+
+PAGES_DIR = os.path.join(FIXTURES, 'naver_pages')
+PAGES = load_pages(PAGES_DIR)
+needs_lxml = pytest.mark.skipif('fast' not in EXTRACTORS, reason="lxml이 설치되어 있지 않습니다.")
+
+
+def test_fixtures_present():
+    assert len(PAGES) >= 10
+
+
+@needs_lxml
+@pytest.mark.parametrize('name,html', PAGES, ids=[name for name, _ in PAGES])
+def test_fast_matches_bs4(name, html):
+    assert EXTRACTORS['fast'](html) == extract_bs4(html)
+
+
+@needs_lxml
+def test_check_equivalence_reports_no_mismatch():
+    assert check_equivalence(PAGES) == []
+
+
+@pytest.mark.parametrize('name,expected', [
+    ('normal_man.html', ('9.56', '12345', '13120000')),
+    ('audience_eok.html', ('8.10', '98765', '123450000')),
+    ('audience_man_decimal.html', ('7.2', '321', '357000')),
+    ('audience_plain.html', ('8.0', '45', '9876')),
+    ('no_audience_dt.html', ('0.00', '2001', 'N/A')),
+    ('missing_section.html', ('Not Found', 'Not Found', 'Not Found')),
+    ('netizen_rating_only.html', ('8.45', '77', '1200000')),
+])
+def test_parse_movie_page_values(name, expected):
+    html = dict(PAGES)[name]
+    for extractor in EXTRACTORS:
+        assert parse_movie_page(html, extractor) == expected
+
+
+def test_benchmark_on_fixtures():
+    result = benchmark(PAGES, repeat=1)
+    assert set(result) == set(EXTRACTORS)
+    for name, pages_per_s in result.items():
+        print(f"{name}: {pages_per_s:,.1f} pages/s ({len(PAGES)}개 페이지)")
+        assert pages_per_s > 0
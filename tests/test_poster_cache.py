@@ -0,0 +1,168 @@
+import io
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from poster_cache import SIZES, PosterCache
+
+
+def make_image(seed, width=800, height=1200):
+    # 크기가 비슷한 서로 다른 JPEG 원본 (잡음 이미지)
+    pixels = np.random.default_rng(seed).integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).resize((width, height)).save(out, format='JPEG', quality=90)
+    return out.getvalue()
+
+
+class PosterServer:
+    """path → 이미지 바이트를 돌려주고 path별 요청 횟수를 세는 포스터 서버 대체. 없는 path는 404"""
+
+    def __init__(self, images, delay=0.0):
+        self.images = images
+        self.delay = delay
+        self.hits = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits[self.path] += 1
+                time.sleep(server.delay)   # 동시에 들어온 요청이 겹치도록 응답을 늦춥니다.
+                body = server.images.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def url(self, path):
+        return self.base + path
+
+
+@pytest.fixture
+def poster_server():
+    servers = []
+
+    def start(images, delay=0.0):
+        server = PosterServer(images, delay)
+        threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+def blob_files(cache):
+    root = os.path.join(cache.cache_dir, cache.blob_dir)
+    return [os.path.join(d, f) for d, _, files in os.walk(root) for f in files]
+
+
+def test_each_url_fetched_once_across_get_and_prefetch(poster_server, tmp_path):
+    server = poster_server({'/a.jpg': make_image(0), '/b.jpg': make_image(1)}, delay=0.2)
+    cache = PosterCache(str(tmp_path / 'posters'))
+    url_a, url_b = server.url('/a.jpg'), server.url('/b.jpg')
+
+    # 같은 URL을 여러 스레드가 동시에 요청해도 한 번만 받습니다.
+    barrier = threading.Barrier(6)
+
+    def worker(size):
+        barrier.wait()
+        return cache.get(url_a, size)
+
+    results = []
+    threads = [threading.Thread(target=lambda s=s: results.append(worker(s))) for s in ['list', 'detail'] * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6 and all(r is not None for r in results)
+
+    assert cache.prefetch([url_a, url_b, ' ' + url_b, url_b], size='detail') == 1
+    assert cache.get(url_b, 'list') is not None
+    assert cache.prefetch([url_a, url_b]) == 0
+    assert server.hits == {'/a.jpg': 1, '/b.jpg': 1}
+    assert cache.downloads == 2
+
+
+def test_thumbnails_written_for_every_size(poster_server, tmp_path):
+    server = poster_server({'/poster.jpg': make_image(0)})
+    cache = PosterCache(str(tmp_path / 'posters'))
+    url = server.url('/poster.jpg')
+    assert cache.get(url) is not None
+    assert url in cache
+    for size, width in SIZES.items():
+        with Image.open(io.BytesIO(cache.get(url, size))) as img:
+            assert img.format == 'JPEG'
+            assert img.width <= width
+    assert len(blob_files(cache)) == len(SIZES)
+
+    # 다시 연 캐시도 디스크의 썸네일을 그대로 씁니다.
+    cache.save()
+    reopened = PosterCache(str(tmp_path / 'posters'))
+    assert reopened.get(url, 'detail') == cache.get(url, 'detail')
+    assert server.hits['/poster.jpg'] == 1
+
+
+def test_same_bytes_share_stored_blob(poster_server, tmp_path):
+    image = make_image(0)
+    server = poster_server({'/a.jpg': image, '/mirror/a.jpg': image})
+    cache = PosterCache(str(tmp_path / 'posters'))
+    url_a, url_b = server.url('/a.jpg'), server.url('/mirror/a.jpg')
+    assert cache.prefetch([url_a, url_b]) == 2
+    for size in SIZES:
+        assert cache.entries[f"{size}|{url_a}"]['sha1'] == cache.entries[f"{size}|{url_b}"]['sha1']
+    assert len(blob_files(cache)) == len(SIZES)
+
+
+def test_lru_eviction_keeps_total_under_max_bytes(poster_server, tmp_path):
+    images = {f'/{i}.jpg': make_image(i) for i in range(6)}
+    server = poster_server(images)
+    cache = PosterCache(str(tmp_path / 'posters'))
+    urls = [server.url(path) for path in images]
+
+    assert cache.get(urls[0]) is not None
+    per_poster = cache.total_bytes()
+    cache.max_bytes = int(per_poster * 2.5)   # 포스터 두 편 분량
+    for url in urls[1:]:
+        assert cache.get(url) is not None
+        for size in SIZES:   # 첫 포스터는 두 크기 모두 계속 사용합니다.
+            cache.get(urls[0], size)
+    cache.save()
+
+    assert cache.total_bytes() <= cache.max_bytes
+    assert sum(os.path.getsize(path) for path in blob_files(cache)) <= cache.max_bytes
+    assert urls[0] in cache and urls[-1] in cache
+    assert all(url not in cache for url in urls[1:4])
+
+
+def test_failed_url_not_retried_within_retry_after(poster_server, tmp_path):
+    server = poster_server({})
+    url = server.url('/missing.jpg')
+    cache = PosterCache(str(tmp_path / 'posters'), retry_after=300)
+    assert cache.get(url) is None
+    assert cache.get(url, 'detail') is None
+    assert cache.prefetch([url]) == 0
+    assert cache.data_uri(url) == url
+    assert server.hits['/missing.jpg'] == 1
+
+    # retry_after가 지나면 다시 시도합니다.
+    cache.retry_after = 0
+    assert cache.get(url) is None
+    assert server.hits['/missing.jpg'] == 2
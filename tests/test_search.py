@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from catalog_index import CatalogIndex
+from search import search_movies, search_result_ids
+from steps.synthetic_catalog import make_catalog
+from title_index import TitleIndex
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    df = make_catalog(5000, seed=0)
+    return df, CatalogIndex(df), TitleIndex(df['영화명'])
+
+
+def page_through(query, filters, df, index, title_index, n_pages):
+    ids, cursor = [], 0
+    for _ in range(n_pages):
+        page, cursor = search_movies(query, filters, df, index=index, title_index=title_index, cursor=cursor)
+        ids.extend(page.index.tolist())
+        if cursor is None:
+            break
+    return ids
+
+
+@pytest.mark.parametrize('query', [
+    # 한 글자 오타: 비슷한 제목 구간에서 k번째 점수와 같은 점수의 후보가 많습니다.
+    '그림자도가',
+    '슬픈가달',
+    '가주탈출',
+    '소녀가',
+    'ㅈㅇ',
+])
+def test_pages_join_to_single_call(catalog, query):
+    df, index, title_index = catalog
+    page_size, n_pages = 10, 5
+    filters = {facet: [] for facet in index.options}
+    filters['limit'] = page_size
+    paged = page_through(query, filters, df, index, title_index, n_pages)
+    whole = search_result_ids(query, filters, df, index, title_index, limit=n_pages * page_size)
+    assert paged == df.index[whole].tolist()
+    assert len(paged) == len(set(paged))
+
+
+def test_last_page_has_no_next_cursor():
+    df = make_catalog(25, seed=1)
+    filters = {'limit': 10}
+    index = CatalogIndex(df)
+    filters.update({facet: [] for facet in index.options})
+    ids = page_through("", filters, df, index, None, n_pages=10)
+    assert ids == df.index.tolist()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from steps.synthetic_catalog import make_catalog
+from title_index import TitleIndex, normalize_key
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    df = make_catalog(5000, seed=0)
+    return df, TitleIndex(df['영화명'])
+
+
+def typo_queries(df, n, seed=0):
+    # 실제 제목에서 한 글자를 바꾼 검색어 (비슷한 제목 구간에서 같은 점수가 많이 나옵니다)
+    rng = np.random.default_rng(seed)
+    titles = df['영화명'].dropna().astype(str).to_numpy()
+    queries = []
+    for _ in range(n):
+        key = normalize_key(titles[rng.integers(len(titles))])
+        pos = rng.integers(len(key))
+        queries.append(key[:pos] + '가' + key[pos + 1:])
+    return queries
+
+
+def test_search_is_prefix_stable(catalog):
+    df, title_index = catalog
+    for query in typo_queries(df, 300):
+        short, long = title_index.search(query, 11), title_index.search(query, 21)
+        assert short.tolist() == long[:len(short)].tolist(), query
+
+
+def test_similar_breaks_ties_by_length_then_row():
+    # 같은 점수의 후보가 k보다 많아도 짧은 제목, 행 순서 순으로 고릅니다.
+    titles = ['가나다라마바', '가나다라마사', '가나다라마아', '가나다라마자', '가나다라마차카']
+    title_index = TitleIndex(titles)
+    for k in range(1, len(titles) + 1):
+        assert title_index.search('가나다라마하', k).tolist() == [0, 1, 2, 3, 4][:k]
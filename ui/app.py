@@ -5,147 +5,294 @@ import pandas as pd
 import subprocess
 from filters import sidebar_filters
 from search import search_movies
+from catalog_index import CatalogIndex, FACET_COLUMNS
+from title_index import TitleIndex
 # display.py에서 필요한 함수들을 명확하게 가져옵니다.
-from display import show_movie_detail, display_movies_list
+from display import show_movie_detail, display_movies_list, page_controls, set_korean_font, charm_distribution
 from streamlit_card import card
 import sys
 import os
 # app.py 기준 상위 폴더를 sys.path에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import main
+from poster_cache import PosterCache
+from steps.catalog_store import load_or_ingest, dataset_version
+from steps.pipeline import pipeline_steps
+from steps.refresh_job import RefreshJob
+from steps.telemetry import span, recent_runs, enabled as telemetry_enabled
+
+STEP_LABELS = {'load': '데이터 읽기', 'similars': '유사작 계산', 'competitors': '경쟁작 계산',
+               'attractiveness': '매력도 예측', 'commit': '저장'}
+STEP_ICONS = {'done': '✅', 'skipped': '⏭️', 'started': '⏳'}
+
+DATA_PATH = './data/영화DB(임시).csv'
 
 # --- 데이터 로딩 ---
-@st.cache_data(ttl=0)
-def load_data():
-    """CSV 파일을 로드하고 '매력도' 컬럼을 숫자형으로 변환합니다."""
-    try:
-        df = pd.read_csv('./data/영화DB(임시).csv')
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    """
+    데이터 버전마다 한 번만 카탈로그 파일(없으면 CSV)을 로드하고 '매력도' 컬럼을 숫자형으로 변환합니다.
+    버전이 같으면 다시 읽지 않으며, 모든 세션이 같은 DataFrame을 공유하므로 읽기 전용으로만 씁니다.
+    """
+    with span('ui.load_data'):
+        df = load_or_ingest(DATA_PATH)
         df['매력도'] = pd.to_numeric(df['매력도'], errors='coerce')
-        return df
-    except FileNotFoundError:
-        st.error("오류: './data/영화DB(임시).csv' 파일을 찾을 수 없습니다.")
-        return None
-
-# 데이터프레임 로드 및 페이지 설정
-df = load_data()
-st.set_page_config(layout="wide")
-
-if df is None:
-    st.stop()
-
-# --- 세션 상태 초기화 ---
-if "selected_movie_idx" not in st.session_state:
-    st.session_state.selected_movie_idx = None
-if "query" not in st.session_state:
-    st.session_state.query = ""
-
-# --- 상단 컨트롤 영역 ---
-st.markdown("## 🎬 영화 검색하기")
-search_col, button_col = st.columns([5, 1])
-with search_col:
-    st.session_state.query = st.text_input("검색어 입력", value=st.session_state.query, placeholder="영화 제목 입력", label_visibility="collapsed")
-with button_col:
-    if st.button("검색하기", use_container_width=True):
-        st.session_state.selected_movie_idx = None
-        st.rerun()
-
-# --- 사이드바 ---
-with st.sidebar:
-    if st.button("🔄 데이터 업데이트"):
-        with st.spinner("데이터를 수집하고 분석 중입니다..."):
-            try:
-                main.main()  
-                st.success("✅ 데이터 업데이트 완료!")
-                st.cache_data.clear()
-                st.rerun()
-            except Exception as e:
-                st.error(f"데이터 업데이트 중 오류 발생: {e}")
-
-# ==========================================================
-# --- ✅ 메인 콘텐츠 표시 (상세 페이지 vs 메인 페이지) ---
-# ==========================================================
-
-# 1. 상세 페이지 표시
-# st.session_state.selected_movie_idx에 값이 있으면 이 블록만 실행됩니다.
-if st.session_state.selected_movie_idx is not None:
-    if st.button("⬅️ 목록으로 돌아가기"):
-        st.session_state.selected_movie_idx = None
-        st.rerun()
-
-    # 원본 df에서 인덱스로 영화 정보를 찾아 상세 페이지 함수 호출
-    selected_row = df.iloc[st.session_state.selected_movie_idx]
-    show_movie_detail(selected_row, df)
-
-# 2. 메인 페이지 표시 (상세보기가 아닐 때)
-# st.session_state.selected_movie_idx가 None이면 이 블록이 실행됩니다.
-else:
-    # "AI VoD 추천작" 섹션
-    st.markdown("---")
-    gradient_style = """
-        background-image: linear-gradient(to right, #AA0000, #FFFFFF);
-        -webkit-background-clip: text;
-        background-clip: text;
-        color: transparent;
-        font-weight: bold;
+    return df
+
+def data_version():
+    """
+    데이터셋 버전 (커밋 번호, CSV 수정 시각, 크기). 파일이 없으면 None
+    커밋은 파일을 통째로 교체한 뒤 버전을 올리므로, 버전이 바뀌면 데이터와 색인 등 파생 캐시를 새로 만듭니다.
     """
-    st.markdown(f"<h2 style='{gradient_style}'>✨ AI추천 매력도 Top5 VOD</h2>", unsafe_allow_html=True)
-
-    top_5_movies = df.dropna(subset=['매력도']).sort_values(by='매력도', ascending=False).head(5)
-    poster_cols = st.columns(5)
-    for i, (_, row) in enumerate(top_5_movies.iterrows()):
-        with poster_cols[i]:
-            # streamlit-card를 사용해 포스터를 클릭 가능하게 만듭니다.
-            has_clicked = card(
-                title="", text="", image=row.get('url', ''), key=f"top5_{row.name}",
-                styles={
-                    "card": {
-                        "width": "100%",
-                        "height": "400px",
-                        "margin": "0px",
-                        "border-width": "0px",
-                        "padding": "0px",
-                        "box-shadow": "none"
-                    },
-                    "filter": {
-                        "background-color": "rgba(0, 0, 0, 0)"  
-                    }
-                } 
-            )
-            if has_clicked:
-                st.session_state.selected_movie_idx = row.name
-                st.rerun()
-            st.markdown(
-                f"""
-                <div style="text-align: center;">
-                    <b>{row['영화명']}</b><br>
-                    <small>매력도: {int(row['매력도']):,}</small>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-
-    # "검색 결과" 섹션
-    st.markdown("---")
-
-    # 1. 항상 사이드바 필터를 생성하고, 사용자가 선택한 필터 값을 가져옵니다.
-    filters = sidebar_filters(df)
-
-    # 2. search_movies 함수를 한 번만 호출하여 필터링과 검색을 동시에 처리합니다.
-    #    (이 함수는 검색어가 비어있을 때 필터만 적용해야 합니다.)
-    results = search_movies(st.session_state.query, filters, df)
-
-    # 3. 필터링 및 검색 결과에 따라 적절한 제목과 목록을 표시합니다.
-    if not st.session_state.query:
-        st.markdown("### 전체 영화 목록 DB")
-        if results.empty:
-            st.warning("선택한 필터에 해당하는 영화가 없습니다.")
+    return dataset_version(DATA_PATH)
+
+@st.cache_resource(max_entries=2)
+def load_catalog_index(version, _df):
+    """데이터 버전마다 한 번만 사이드바 필터용 역색인을 만듭니다. (_df는 해시하지 않습니다)"""
+    with span('ui.catalog_index', rows=len(_df)):
+        return CatalogIndex(_df)
+
+@st.cache_resource(max_entries=2)
+def load_title_index(version, _df):
+    """데이터 버전마다 한 번만 제목 검색 색인(n-gram + 초성)을 만듭니다."""
+    with span('ui.title_index', rows=len(_df)):
+        return TitleIndex(_df['영화명'])
+
+@st.cache_resource(max_entries=2)
+def load_top_ids(version, _df, n=5):
+    """데이터 버전마다 한 번만 매력도 상위 n편의 행 위치를 구합니다."""
+    return _df['매력도'].reset_index(drop=True).dropna().nlargest(n).index.tolist()
+
+@st.cache_resource(max_entries=2)
+def load_charm_distribution(version, _df):
+    """데이터 버전마다 한 번만 상세 페이지 매력도 분포(구간 경계, 작품 수)를 계산합니다."""
+    with span('ui.charm_distribution', rows=len(_df)):
+        return charm_distribution(_df)
+
+@st.cache_resource
+def setup_fonts():
+    """그래프 한글 폰트 설정은 앱 시작 시 한 번만 합니다."""
+    set_korean_font()
+
+@st.cache_resource
+def load_refresh_job():
+    """
+    데이터 업데이트 작업 (모든 세션이 하나를 공유하므로 동시에 한 번만 실행됩니다).
+    커밋되어 데이터셋 버전이 바뀌기 전까지는 모든 세션이 기존 데이터를 계속 봅니다.
+    """
+    return RefreshJob(lambda on_stage, should_stop: main.main(on_stage=on_stage, should_stop=should_stop),
+                      steps=pipeline_steps())
+
+def refresh_panel():
+    """사이드바의 데이터 업데이트 버튼 / 진행 상황 / 취소 버튼"""
+    job = load_refresh_job()
+    status = job.status()
+    if job.running:
+        current = STEP_LABELS.get(status['current'], status['current'] or '준비')
+        label = "취소하는 중..." if status['state'] == 'cancelling' else f"데이터 업데이트 중: {current}"
+        st.progress(status['progress'], text=label)
+        st.caption(" → ".join(f"{STEP_ICONS.get(s['status'], '▫️')} {STEP_LABELS.get(name, name)}"
+                              for name, s in status['stages'].items()))
+        if st.button("⏹️ 취소", disabled=status['state'] == 'cancelling'):
+            job.cancel()
+    else:
+        if st.button("🔄 데이터 업데이트"):
+            job.start()
+            st.rerun()
+        if status['state'] == 'done':
+            st.success("✅ 데이터 업데이트 완료!" if status['result'] else "변경된 내용이 없습니다.")
+        elif status['state'] == 'cancelled':
+            st.info("데이터 업데이트를 취소했습니다. 기존 데이터를 그대로 사용합니다.")
+        elif status['state'] == 'failed':
+            st.error(f"데이터 업데이트 중 오류 발생: {status['error'].splitlines()[0]}")
+
+    # 이 세션이 보던 실행이 끝났으면 앱 전체를 다시 실행해 새 데이터를 읽고 진행 표시를 멈춥니다.
+    if st.session_state.get("refresh_run") != (status['run_id'], job.running):
+        was_running = st.session_state.get("refresh_run", (None, False))[1]
+        st.session_state.refresh_run = (status['run_id'], job.running)
+        if was_running and not job.running:
+            st.rerun()
+
+@st.fragment(run_every=1.0)
+def refresh_panel_live():
+    """실행 중에는 사이드바 패널만 1초마다 다시 그립니다. (본문은 기존 데이터로 계속 사용할 수 있습니다)"""
+    refresh_panel()
+
+@st.cache_resource
+def load_poster_cache():
+    """포스터 썸네일 캐시 (세션 사이에 공유합니다)"""
+    return PosterCache('./data/poster_cache')
+
+def admin_panel():
+    """성능 기록을 켠 경우(MOVIE_TELEMETRY=1)에만 사이드바에 최근 실행의 구간별 시간/메모리를 보여 줍니다."""
+    with st.expander("⏱️ 성능 기록 (관리자)"):
+        n_runs = st.number_input("최근 실행 수", 1, 50, 5, key="admin_runs")
+        runs = recent_runs(int(n_runs))
+        if not runs:
+            st.caption("아직 기록이 없습니다.")
+        for run in runs:
+            root = run['root']
+            started = pd.Timestamp.fromtimestamp(root['started_at']).strftime('%m-%d %H:%M:%S')
+            st.markdown(f"**{root['span']}** · {started} · {root['wall_s'] * 1000:,.0f}ms ({root['status']})")
+            st.dataframe(pd.DataFrame({
+                '구간': ["　" * s['depth'] + s['span'] for s in run['spans']],
+                '시간(ms)': [round(s['wall_s'] * 1000, 1) for s in run['spans']],
+                'CPU(ms)': [round(s['cpu_s'] * 1000, 1) for s in run['spans']],
+                '최대 할당(MB)': [None if s['peak_alloc_bytes'] is None else round(s['peak_alloc_bytes'] / 2 ** 20, 1)
+                                for s in run['spans']],
+                '행 수': [s['rows'] for s in run['spans']],
+            }), hide_index=True, use_container_width=True)
+
+def render():
+    """화면 전체를 그립니다. (Streamlit이 스크립트를 다시 실행할 때마다 한 번 호출)"""
+    # 데이터프레임 로드 및 페이지 설정
+    version = data_version()
+    if version is None:
+        st.error(f"오류: '{DATA_PATH}' 파일을 찾을 수 없습니다.")
+        st.stop()
+    df = load_data(version)
+    posters = load_poster_cache()
+    st.set_page_config(layout="wide")
+    setup_fonts()
+
+    # --- 세션 상태 초기화 ---
+    if "selected_movie_idx" not in st.session_state:
+        st.session_state.selected_movie_idx = None
+    if "query" not in st.session_state:
+        st.session_state.query = ""
+    if "result_cursor" not in st.session_state:
+        st.session_state.result_cursor = 0
+
+    # --- 상단 컨트롤 영역 ---
+    st.markdown("## 🎬 영화 검색하기")
+    search_col, button_col = st.columns([5, 1])
+    with search_col:
+        st.session_state.query = st.text_input("검색어 입력", value=st.session_state.query, placeholder="영화 제목 입력", label_visibility="collapsed")
+    with button_col:
+        if st.button("검색하기", use_container_width=True):
+            st.session_state.selected_movie_idx = None
+            st.rerun()
+
+    # --- 사이드바 ---
+    with st.sidebar:
+        # 업데이트는 백그라운드에서 실행되므로 그동안에도 검색/상세보기를 그대로 쓸 수 있습니다.
+        if load_refresh_job().running:
+            refresh_panel_live()
         else:
-            # 필터만 적용된 결과를 표시합니다.
-            display_movies_list(results, df)
+            refresh_panel()
+        if telemetry_enabled():
+            admin_panel()
+
+    # ==========================================================
+    # --- ✅ 메인 콘텐츠 표시 (상세 페이지 vs 메인 페이지) ---
+    # ==========================================================
+
+    # 1. 상세 페이지 표시
+    # st.session_state.selected_movie_idx에 값이 있으면 이 블록만 실행됩니다.
+    if st.session_state.selected_movie_idx is not None:
+        if st.button("⬅️ 목록으로 돌아가기"):
+            st.session_state.selected_movie_idx = None
+            st.rerun()
+
+        # 원본 df에서 인덱스로 영화 정보를 찾아 상세 페이지 함수 호출
+        selected_row = df.iloc[st.session_state.selected_movie_idx]
+        with span('ui.detail'):
+            show_movie_detail(selected_row, df, posters, load_charm_distribution(version, df))
+
+    # 2. 메인 페이지 표시 (상세보기가 아닐 때)
+    # st.session_state.selected_movie_idx가 None이면 이 블록이 실행됩니다.
     else:
-        st.markdown(f"**'{st.session_state.query}'**에 대한 검색 결과입니다. (필터 적용됨)")
-        if results.empty:
-            st.info(f"선택한 조건에 맞는 검색 결과가 없습니다.")
+        # "AI VoD 추천작" 섹션
+        st.markdown("---")
+        gradient_style = """
+            background-image: linear-gradient(to right, #AA0000, #FFFFFF);
+            -webkit-background-clip: text;
+            background-clip: text;
+            color: transparent;
+            font-weight: bold;
+        """
+        st.markdown(f"<h2 style='{gradient_style}'>✨ AI추천 매력도 Top5 VOD</h2>", unsafe_allow_html=True)
+
+        with span('ui.top5'):
+            top_5_movies = df.iloc[load_top_ids(version, df)]
+            posters.prefetch(top_5_movies['url'].tolist(), 'detail')
+            poster_cols = st.columns(5)
+            for i, (_, row) in enumerate(top_5_movies.iterrows()):
+                with poster_cols[i]:
+                    # streamlit-card를 사용해 포스터를 클릭 가능하게 만듭니다.
+                    has_clicked = card(
+                        title="", text="", image=posters.data_uri(row.get('url', ''), 'detail'), key=f"top5_{row.name}",
+                        styles={
+                            "card": {
+                                "width": "100%",
+                                "height": "400px",
+                                "margin": "0px",
+                                "border-width": "0px",
+                                "padding": "0px",
+                                "box-shadow": "none"
+                            },
+                            "filter": {
+                                "background-color": "rgba(0, 0, 0, 0)"  
+                            }
+                        } 
+                    )
+                    if has_clicked:
+                        st.session_state.selected_movie_idx = row.name
+                        st.rerun()
+                    st.markdown(
+                        f"""
+                        <div style="text-align: center;">
+                            <b>{row['영화명']}</b><br>
+                            <small>매력도: {int(row['매력도']):,}</small>
+                        </div>
+                        """,
+                        unsafe_allow_html=True
+                    )
+
+        # "검색 결과" 섹션
+        st.markdown("---")
+
+        # 1. 항상 사이드바 필터를 생성하고, 사용자가 선택한 필터 값을 가져옵니다.
+        catalog_index = load_catalog_index(version, df)
+        with span('ui.filters'):
+            filters = sidebar_filters(df, index=catalog_index)
+
+        # 데이터, 검색어나 필터가 바뀌면 첫 페이지부터 보여 줍니다.
+        search_key = (version, st.session_state.query, filters["limit"], tuple(tuple(filters[facet]) for facet in FACET_COLUMNS))
+        if st.session_state.get("search_key") != search_key:
+            st.session_state.search_key = search_key
+            st.session_state.result_cursor = 0
+
+        # 2. search_movies 함수를 한 번만 호출하여 필터링과 검색을 동시에 처리합니다.
+        #    (이 함수는 검색어가 비어있을 때 필터만 적용해야 합니다.)
+        #    현재 페이지에 보일 영화만 가져옵니다.
+        cursor = st.session_state.result_cursor
+        title_index = load_title_index(version, df)
+        with span('ui.search') as search_span:
+            results, next_cursor = search_movies(st.session_state.query, filters, df, index=catalog_index,
+                                                 title_index=title_index, cursor=cursor)
+            search_span.rows = len(results)
+
+        # 3. 필터링 및 검색 결과에 따라 적절한 제목과 목록을 표시합니다.
+        if not st.session_state.query:
+            st.markdown("### 전체 영화 목록 DB")
+            if results.empty:
+                st.warning("선택한 필터에 해당하는 영화가 없습니다.")
+            else:
+                # 필터만 적용된 결과를 표시합니다.
+                with span('ui.results', rows=len(results)):
+                    display_movies_list(results, df, posters)
+                page_controls("result_cursor", cursor, filters["limit"], next_cursor)
         else:
-            # 검색어와 필터가 모두 적용된 결과를 표시합니다.
-            display_movies_list(results, df)
+            st.markdown(f"**'{st.session_state.query}'**에 대한 검색 결과입니다. (필터 적용됨)")
+            if results.empty:
+                st.info(f"선택한 조건에 맞는 검색 결과가 없습니다.")
+            else:
+                # 검색어와 필터가 모두 적용된 결과를 표시합니다.
+                with span('ui.results', rows=len(results)):
+                    display_movies_list(results, df, posters)
+                page_controls("result_cursor", cursor, filters["limit"], next_cursor)
+
+# 한 번의 화면 그리기(스크립트 실행) 전체를 하나의 실행으로 기록합니다. (성능 기록이 꺼져 있으면 비용 없음)
+with span('ui.render'):
+    render()
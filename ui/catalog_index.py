@@ -0,0 +1,158 @@
+# catalog_index.py
+
+import numpy as np
+import pandas as pd
+
+# 사이드바 필터 이름 → 원본 컬럼 (카탈로그 적재 시 만든 정규화 컬럼이 있으면 그것을 씁니다)
+FACET_COLUMNS = {
+    "장르": '장르',
+    "개봉연도": '개봉일',
+    "국가": '국가',
+    "키워드": 'Gemini 키워드',
+}
+NORMALIZED_COLUMNS = {
+    "장르": '장르_list',
+    "개봉연도": '개봉날짜',
+    "국가": '국가_list',
+    "키워드": 'Gemini 키워드_list',
+}
+
+
+def split_tokens(s):
+    """쉼표로 구분된 값을 (행 위치, 공백 제거한 토큰) Series로 펼칩니다. (결측 행 제외)"""
+    s = s.reset_index(drop=True).dropna()
+    tokens = s.astype(str).str.split(',').explode()
+    return tokens.str.strip()
+
+
+def list_tokens(s):
+    """토큰 목록 컬럼을 (행 위치, 토큰) Series로 펼칩니다. (빈 목록 제외)"""
+    return s.reset_index(drop=True).explode().dropna().astype(str)
+
+
+def release_years(s):
+    """개봉일(20230927.0 등)의 앞 네 글자를 연도로 씁니다. (결측 행 제외)"""
+    s = s.reset_index(drop=True).dropna()
+    return s.astype(str).str[:4]
+
+
+def release_years_from_dates(s):
+    """개봉날짜(datetime)의 연도 (결측 행 제외)"""
+    s = s.reset_index(drop=True).dropna()
+    return s.dt.year.astype(str)
+
+
+def build_postings(values):
+    """(행 위치 → 값) Series에서 값마다 정렬된 행 위치 배열(int32)을 만듭니다."""
+    codes, uniques = pd.factorize(values.to_numpy(), sort=False)
+    if len(uniques) == 0:
+        return {}
+    rows = values.index.to_numpy()
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order]
+    bounds = np.searchsorted(codes, np.arange(len(uniques) + 1))
+    postings = {}
+    for i, value in enumerate(uniques):
+        # 한 행에 같은 토큰이 두 번 있어도 한 번만 남깁니다.
+        postings[value] = np.unique(rows[bounds[i]:bounds[i + 1]]).astype(np.int32)
+    return postings
+
+
+class CatalogIndex:
+    """
+    사이드바 필터용 역색인입니다. 데이터 버전마다 한 번 만들어 두고,
+    필터 조회는 값별 행 위치 배열의 합집합(같은 필터 안)과 교집합(필터 사이)으로만 계산합니다.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.postings = {}
+        self.options = {}
+        self.counts = {}
+        self.row_ptr = {}
+        self.row_codes = {}
+        for facet, col in FACET_COLUMNS.items():
+            normalized = NORMALIZED_COLUMNS[facet]
+            if normalized in df.columns:
+                values = df[normalized]
+                tokens = release_years_from_dates(values) if facet == "개봉연도" else list_tokens(values)
+                self.postings[facet] = build_postings(tokens)
+            elif col not in df.columns:
+                self.postings[facet] = {}
+            elif facet == "개봉연도":
+                self.postings[facet] = build_postings(release_years(df[col]))
+            else:
+                self.postings[facet] = build_postings(split_tokens(df[col]))
+            self._build_facet(facet)
+
+    def _build_facet(self, facet):
+        # 사이드바 선택지(정렬된 값 목록)와 값별 영화 수, 그리고 행 → 값 번호의 정방향 색인(CSR)을 만듭니다.
+        postings = self.postings[facet]
+        options = sorted(postings, reverse=(facet == "개봉연도"))
+        sizes = np.array([len(postings[v]) for v in options], dtype=np.int64)
+        rows = np.concatenate([postings[v] for v in options]) if options else np.empty(0, dtype=np.int32)
+        codes = np.repeat(np.arange(len(options), dtype=np.int32), sizes)
+        self.options[facet] = options
+        self.counts[facet] = sizes
+        self.row_codes[facet] = codes[np.argsort(rows, kind='stable')]
+        self.row_ptr[facet] = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=self.n_rows))])
+
+    def lookup(self, facet, values):
+        """values 중 하나라도 가진 행 위치 (정렬됨)"""
+        postings = self.postings.get(facet, {})
+        arrays = [postings[v] for v in values if v in postings]
+        if not arrays:
+            return np.empty(0, dtype=np.int32)
+        if len(arrays) == 1:
+            return arrays[0]
+        # 정렬 대신 행 수 크기의 불리언 표시로 합집합을 구합니다.
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for rows in arrays:
+            mask[rows] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def filter_rows(self, filters):
+        """
+        선택된 필터를 모두 만족하는 행 위치 배열을 반환합니다.
+        선택된 필터가 없으면 None(전체)을 반환합니다.
+        """
+        return self._intersect([self.lookup(facet, filters[facet]) for facet in FACET_COLUMNS if filters.get(facet)])
+
+    def _intersect(self, selected):
+        rows = None
+        # 결과가 작은 필터부터 교집합을 구해 중간 배열을 줄입니다.
+        for matched in sorted(selected, key=len):
+            if rows is None:
+                rows = matched
+            else:
+                mask = np.zeros(self.n_rows, dtype=bool)
+                mask[matched] = True
+                rows = rows[mask[rows]]
+            if len(rows) == 0:
+                break
+        return rows
+
+    def facet_counts(self, filters):
+        """
+        필터마다 {값: 영화 수}를 반환합니다. 같은 필터 안의 값끼리는 합집합이므로,
+        각 필터의 수는 그 필터를 뺀 나머지 선택을 모두 만족하는 영화 중 해당 값을 가진 영화 수입니다.
+        다른 선택이 없으면 미리 센 값을 쓰고, 있으면 해당 행들의 값 번호만 모아 셉니다.
+        """
+        selected = {facet: self.lookup(facet, filters[facet]) for facet in FACET_COLUMNS if filters.get(facet)}
+        result = {}
+        for facet in FACET_COLUMNS:
+            others = [rows for f, rows in selected.items() if f != facet]
+            if others:
+                counts = np.bincount(self._row_codes(facet, self._intersect(others)), minlength=len(self.options[facet]))
+            else:
+                counts = self.counts[facet]
+            result[facet] = dict(zip(self.options[facet], counts.tolist()))
+        return result
+
+    def _row_codes(self, facet, rows):
+        # rows에 속한 모든 (행, 값) 쌍의 값 번호를 정방향 색인에서 한 번에 모읍니다.
+        ptr = self.row_ptr[facet]
+        starts = ptr[rows]
+        sizes = ptr[rows + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+        return self.row_codes[facet][offsets + np.arange(len(offsets))]
@@ -1,9 +1,9 @@
 # display.py
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
-import seaborn as sns
 import matplotlib.font_manager as fm
 import platform
 
@@ -52,9 +52,78 @@ def format_number_display(raw_value):
         return str(raw_value)
 
 
-def show_movie_detail(row, full_df):
-    """선택된 영화 한 편의 상세 정보를 모두 표시하는 함수"""
-    set_korean_font()
+def audience_display(row):
+    """누적 관객수: 카탈로그 적재 시 정수로 바꿔 둔 '누적 관객수_int'가 있으면 그 값을, 없으면 원본을 변환해 표시합니다."""
+    if '누적 관객수_int' not in row:
+        return format_number_display(row.get('누적 관객수'))
+    value = row['누적 관객수_int']
+    return '-' if pd.isna(value) else f"{int(value):,}"
+
+
+def poster_source(poster_url, posters=None, size='list'):
+    """
+    st.image에 넘길 포스터: posters(PosterCache)가 있으면 size 크기로 줄여 캐시한 썸네일 바이트를,
+    없거나 받지 못했으면 원래 URL을 반환합니다.
+    """
+    if posters is None:
+        return poster_url
+    data = posters.get(poster_url, size)
+    return poster_url if data is None else data
+
+
+def charm_distribution(full_df, bins=30):
+    """
+    상세 페이지의 '예측 매력도' 분포 그래프용 구간 경계와 구간별 작품 수를 계산합니다.
+    데이터 버전마다 한 번만 계산해 두고, 상세 페이지는 이 배열로만 그래프를 그립니다. (값이 없으면 None)
+    """
+    values = pd.to_numeric(full_df['예측 매력도'], errors='coerce').dropna().to_numpy()
+    if len(values) == 0:
+        return None
+    # sns.histplot(bins=30)과 같은 등간격 구간입니다.
+    counts, edges = np.histogram(values, bins=bins)
+    bars = [{'bin': i, 'start': float(edges[i]), 'end': float(edges[i + 1]),
+             'center': float(edges[i] + edges[i + 1]) / 2, 'count': int(count)}
+            for i, count in enumerate(counts)]
+    return {'edges': edges, 'counts': counts, 'bars': bars}
+
+def charm_bin(distribution, value):
+    """value가 속한 구간 번호. 범위를 벗어나면 None (최댓값은 마지막 구간에 넣습니다)"""
+    edges = distribution['edges']
+    if not edges[0] <= value <= edges[-1]:
+        return None
+    return min(int(np.searchsorted(edges, value, side='right')) - 1, len(edges) - 2)
+
+def charm_chart_spec(distribution, value, highlight_color='#4B0082'):
+    """미리 계산한 분포로 그리는 Vega-Lite 막대그래프. value가 속한 막대를 강조하고 위에 값을 표시합니다."""
+    highlight = charm_bin(distribution, value)
+    test = f"datum.bin == {highlight}" if highlight is not None else "false"
+    layers = [{
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "start", "type": "quantitative", "bin": {"binned": True}, "title": None, "axis": {"format": ",d", "grid": False}},
+            "x2": {"field": "end"},
+            "y": {"field": "count", "type": "quantitative", "axis": None},
+            "color": {"condition": {"test": test, "value": highlight_color}, "value": "#EAEAEA"},
+        },
+    }]
+    if highlight is not None:
+        layers.append({
+            "transform": [{"filter": test}],
+            "mark": {"type": "text", "dy": -8, "color": highlight_color, "fontWeight": "bold"},
+            "encoding": {
+                "x": {"field": "center", "type": "quantitative"},
+                "y": {"field": "count", "type": "quantitative"},
+                "text": {"value": f"{int(value):,}"},
+            },
+        })
+    return {"data": {"values": distribution['bars']}, "height": 220, "layer": layers, "config": {"view": {"stroke": None}}}
+
+
+def show_movie_detail(row, full_df, posters=None, distribution=None):
+    """
+    선택된 영화 한 편의 상세 정보를 모두 표시하는 함수
+    distribution: charm_distribution() 결과 (없으면 여기서 계산합니다)
+    """
 
     # --- 1. 포스터 및 기본 정보 ---
     col1, col2 = st.columns([1, 2])
@@ -66,7 +135,7 @@ def show_movie_detail(row, full_df):
         with c2: # 중앙 열(c2)에만 콘텐츠를 표시합니다.
             poster_url = str(row.get('url', '')).strip()
             if poster_url and poster_url.startswith("http"):
-                st.image(poster_url, use_container_width=True)
+                st.image(poster_source(poster_url, posters, 'detail'), use_container_width=True)
             else:
                 # 포스터 없음 표시도 동일한 높이를 유지해줍니다.
                 st.markdown("<div style='width:100%;height:420px;border:2px solid #ccc;border-radius:8px;display:flex;align-items:center;justify-content:center;'><span style='color:#bbb;'>포스터 없음</span></div>", unsafe_allow_html=True)
@@ -106,26 +175,10 @@ def show_movie_detail(row, full_df):
         
         charm_pred = row.get('예측 매력도', None)
         if pd.notna(charm_pred):
-            all_charms = pd.to_numeric(full_df['예측 매력도'], errors='coerce').dropna()
-            fig, ax = plt.subplots(figsize=(10, 3))
-            sns.histplot(all_charms, ax=ax, bins=30, color="#EAEAEA", alpha=1)
-            
-            highlight_color = '#4B0082'
-            for patch in ax.patches:
-                x_min, x_max = patch.get_x(), patch.get_x() + patch.get_width()
-                if x_min <= charm_pred < x_max:
-                    patch.set_facecolor(highlight_color)
-                    bar_height = patch.get_height()
-                    ax.text(patch.get_x() + patch.get_width() / 2, bar_height, f'{int(charm_pred):,}\n', ha='center', va='bottom', color=highlight_color, fontweight='bold')
-                    break
-            
-            #ax.set_title("전체 작품 내 매력도 분포", fontsize=14, pad=20)
-            ax.set_yticks([])
-            ax.set_ylabel('')
-            ax.set_xlabel('')
-            for spine in ['top', 'right', 'left']:
-                ax.spines[spine].set_visible(False)
-            st.pyplot(fig)
+            if distribution is None:
+                distribution = charm_distribution(full_df)
+            if distribution is not None:
+                st.vega_lite_chart(spec=charm_chart_spec(distribution, charm_pred), use_container_width=True)
 
         # TMDB 키워드
         tmdb_keywords = str(row.get('TMDB 키워드', '')).strip()
@@ -145,7 +198,7 @@ def show_movie_detail(row, full_df):
     info_cols[1].markdown(f"<div style='{font_style}'><b>감독</b><br>{row.get('감독', '-')}</div>", unsafe_allow_html=True)
     maker = str(row.get('제작사', '')).split(',')[0]
     info_cols[2].markdown(f"<div style='{font_style}'><b>제작사</b><br>{maker}</div>", unsafe_allow_html=True)
-    info_cols[3].markdown(f"<div style='{font_style}'><b>누적관객</b><br>{format_number_display(row.get('누적 관객수'))}명</div>", unsafe_allow_html=True)
+    info_cols[3].markdown(f"<div style='{font_style}'><b>누적관객</b><br>{audience_display(row)}명</div>", unsafe_allow_html=True)
     info_cols[4].markdown(f"<div style='{font_style}'><b>시청자 수</b><br>{format_number_display(row.get('매력도'))}</div>", unsafe_allow_html=True)
     gradient_style = "background-image: linear-gradient(to right, #FF8C00, #9400D3);-webkit-background-clip: text;background-clip: text;color: transparent;font-weight: bold;"
     info_cols[5].markdown(f"<div style='{font_style}'><b>AI 키워드</b><br><span style='{gradient_style}'>{row.get('Gemini 키워드', '-')}</span></div>", unsafe_allow_html=True)
@@ -172,8 +225,8 @@ def show_movie_detail(row, full_df):
             labels = ["5만 미만", "5만 이상", "10만 이상", "50만 이상", "100만 이상"]
             comp_df['매력도'] = pd.cut(pd.to_numeric(comp_df['예측 매력도'], errors='coerce'), bins=bins, labels=labels, right=False)
             
-            # ✅ 수정된 부분: '시청자' 컬럼도 헬퍼 함수를 통해 안전하게 처리
-            comp_df['시청자'] = comp_df['매력도'].apply(format_number_display)
+            # '시청자' 컬럼은 매력도 구간 이름을 그대로 보여 줍니다. (결측은 '-')
+            comp_df['시청자'] = comp_df['매력도'].astype(object).where(comp_df['매력도'].notna(), '-')
             
             display_comp_df = comp_df[['영화명', 'Gemini 키워드', '매력도', '시청자']].rename(columns={'영화명': '영화 제목', 'Gemini 키워드': '키워드'})
             st.dataframe(display_comp_df, use_container_width=True, hide_index=True)
@@ -181,11 +234,14 @@ def show_movie_detail(row, full_df):
             st.info("경쟁작 정보가 없습니다.")
 
 
-def display_movies_list(results_df, full_df):
+def display_movies_list(results_df, full_df, posters=None):
     """
     전체 3열 그리드 안에 각 영화 정보를
     [포스터, 상세내용]의 2열 레이아웃으로 표시하는 함수
+    posters(PosterCache)를 넘기면 이 페이지의 포스터를 먼저 동시에 받아 두고 썸네일을 표시합니다.
     """
+    if posters is not None:
+        posters.prefetch(results_df['url'].tolist(), 'list')
     
     # 1. 전체 레이아웃을 위한 3열 그리드를 먼저 생성합니다.
     main_cols = st.columns(3)
@@ -202,7 +258,7 @@ def display_movies_list(results_df, full_df):
             with inner_col1:
                 poster_url = str(row.get('url', '')).strip()
                 if poster_url and poster_url.startswith("http"):
-                    st.image(poster_url, use_container_width=True)
+                    st.image(poster_source(poster_url, posters, 'list'), use_container_width=True)
                 else:
                     st.markdown("<div style='height:200px; border:1px solid #eee; display:flex; align-items:center; justify-content:center; color:#aaa;'>No Image</div>", unsafe_allow_html=True)
 
@@ -226,4 +282,24 @@ def display_movies_list(results_df, full_df):
                     st.rerun()
             
             # 각 영화 아이템 아래에 구분선을 추가하여 가독성을 높입니다.
-            st.markdown("---")
\ No newline at end of file
+            st.markdown("---")
+
+
+def page_controls(key, cursor, page_size, next_cursor):
+    """
+    결과 목록 아래에 이전/다음 페이지 버튼을 그립니다.
+    현재 위치는 st.session_state[key]에 저장하며, 버튼을 누르면 위치를 옮기고 다시 실행합니다.
+    """
+    if cursor == 0 and next_cursor is None:
+        return
+    prev_col, page_col, next_col = st.columns([1, 4, 1])
+    with prev_col:
+        if st.button("◀ 이전", key=f"{key}_prev", disabled=cursor == 0, use_container_width=True):
+            st.session_state[key] = max(cursor - page_size, 0)
+            st.rerun()
+    with page_col:
+        st.markdown(f"<div style='text-align: center;'>{cursor // page_size + 1} 페이지</div>", unsafe_allow_html=True)
+    with next_col:
+        if st.button("다음 ▶", key=f"{key}_next", disabled=next_cursor is None, use_container_width=True):
+            st.session_state[key] = next_cursor
+            st.rerun()
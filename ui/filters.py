@@ -1,18 +1,29 @@
 import streamlit as st
+from catalog_index import CatalogIndex
 
-def sidebar_filters(df):
-    genre_options = sorted({g.strip() for genres in df['장르'].dropna() for g in str(genres).split(',')})
-    year_options = sorted({str(y)[:4] for y in df['개봉일'].dropna()}, reverse=True)
-    country_options = sorted({c.strip() for countries in df['국가'].dropna() for c in str(countries).split(',')})
-    keyword_options = sorted({kw.strip() for kws in df['Gemini 키워드'].dropna() for kw in str(kws).split(',')})
+def sidebar_filters(df, index=None):
+    """
+    사이드바 필터를 그리고 선택값을 반환합니다.
+    선택지와 영화 수는 index(CatalogIndex, 데이터 버전마다 한 번 생성)에서 가져오므로 행을 다시 훑지 않습니다.
+    """
+    if index is None:
+        index = CatalogIndex(df)
+    # 위젯 값은 그리기 전에도 session_state에 있으므로, 현재 선택 기준으로 먼저 수를 셉니다.
+    selected = {facet: st.session_state.get(f"filter_{facet}", []) for facet in index.options}
+    counts = index.facet_counts(selected)
+
+    def multiselect(facet):
+        facet_counts = counts[facet]
+        return st.multiselect(facet, index.options[facet], key=f"filter_{facet}",
+                              format_func=lambda v: f"{v} ({facet_counts.get(v, 0):,})")
 
     with st.sidebar:
         st.markdown("## 🎛️ 조건 설정")
-        selected_genres = st.multiselect("장르", genre_options)
-        selected_years = st.multiselect("개봉연도", year_options)
-        selected_countries = st.multiselect("국가", country_options)
-        selected_keyword = st.multiselect("키워드", keyword_options)
-        limit = st.slider("영화 개수", 1, 30, 10)
+        selected_genres = multiselect("장르")
+        selected_years = multiselect("개봉연도")
+        selected_countries = multiselect("국가")
+        selected_keyword = multiselect("키워드")
+        limit = st.slider("페이지당 영화 개수", 1, 30, 10)
 
     return {
         "장르": selected_genres,
@@ -20,4 +31,4 @@ def sidebar_filters(df):
         "국가": selected_countries,
         "키워드": selected_keyword,
         "limit": limit
-    }
\ No newline at end of file
+    }
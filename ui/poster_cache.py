@@ -0,0 +1,116 @@
+# poster_cache.py
+
+import base64
+import io
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from steps.blob_store import BlobStore
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
+# 썸네일 가로 크기(px): 목록 그리드의 좁은 열 / 상세 페이지·상위 5편 카드
+SIZES = {'list': 200, 'detail': 500}
+
+
+def is_poster_url(url):
+    return isinstance(url, str) and url.strip().startswith("http")
+
+
+def resize_image(data, width, quality=85):
+    """원본 이미지를 가로 width 이하의 JPEG로 줄입니다. (비율 유지, 확대하지 않음)"""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert('RGB')
+        img.thumbnail((width, width * 4))
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def fetch_url(url, timeout=10):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+class PosterCache(BlobStore):
+    """
+    포스터 썸네일 디스크 캐시입니다.
+    - URL마다 원본을 한 번만 받아 크기별(SIZES) JPEG 썸네일로 줄여 저장합니다.
+    - 썸네일은 내용 해시(sha1) 이름으로 저장해 같은 이미지는 한 번만 보관합니다. (BlobStore)
+    - index.json은 '크기|URL' → (해시, 수집 시각, 마지막 사용 시각, 바이트 수)를 기록하고,
+      전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 썸네일부터 지웁니다.
+    - 받기에 실패한 URL은 retry_after초 동안 다시 시도하지 않습니다.
+    """
+
+    def __init__(self, cache_dir='./data/poster_cache', max_bytes=200 * 1024 * 1024, sizes=None,
+                 timeout=10, retry_after=300, autosave=20, fetch=None):
+        super().__init__(cache_dir, 'thumbs', '.jpg', max_bytes, autosave)
+        self.sizes = dict(sizes or SIZES)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._fetch = fetch or fetch_url
+        self._url_locks = {}
+        self._failed = {}
+        self.downloads = 0
+        self.downloaded_bytes = 0
+
+    def _read(self, url, size):
+        return self.read_blob(f"{size}|{url}")
+
+    def _store(self, url, original):
+        now = time.time()
+        for size, width in self.sizes.items():
+            self.write_blob(f"{size}|{url}", resize_image(original, width), now)
+        self.changed()
+
+    def __contains__(self, url):
+        return all(f"{size}|{url}" in self.entries for size in self.sizes)
+
+    def get(self, url, size='list'):
+        """size 크기의 썸네일 바이트를 반환합니다. 캐시에 없으면 원본을 받아 저장하고, 받지 못하면 None"""
+        url = url.strip()
+        data = self._read(url, size)
+        if data is not None:
+            return data
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        # 같은 URL을 여러 스레드가 동시에 받지 않도록 URL마다 한 번만 받습니다.
+        with url_lock:
+            data = self._read(url, size)
+            if data is not None:
+                return data
+            if time.time() - self._failed.get(url, 0) < self.retry_after:
+                return None
+            try:
+                original = self._fetch(url, self.timeout)
+                self.downloads += 1
+                self.downloaded_bytes += len(original)
+                self._store(url, original)
+            except Exception:
+                self._failed[url] = time.time()
+                return None
+            finally:
+                with self._lock:
+                    self._url_locks.pop(url, None)
+        return self._read(url, size)
+
+    def data_uri(self, url, size='detail'):
+        """HTML/카드 컴포넌트용 data: URI. 받지 못하면 원래 URL을 그대로 반환합니다."""
+        data = self.get(url, size) if is_poster_url(url) else None
+        if data is None:
+            return url
+        return "data:image/jpeg;base64," + base64.b64encode(data).decode('ascii')
+
+    def prefetch(self, urls, size='list', n_workers=8):
+        """캐시에 없는 URL들을 동시에 받아 둡니다. (현재 페이지의 포스터 등) 받은 개수를 반환합니다."""
+        missing = list(dict.fromkeys(u.strip() for u in urls if is_poster_url(u) and f"{size}|{u.strip()}" not in self.entries))
+        if not missing:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(n_workers, len(missing))) as pool:
+            fetched = sum(data is not None for data in pool.map(lambda u: self.get(u, size), missing))
+        self.save()
+        return fetched
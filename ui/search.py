@@ -1,29 +1,36 @@
+import numpy as np
 import pandas as pd
+from catalog_index import CatalogIndex
+from title_index import TitleIndex
 
-def search_movies(query, filters, df):
-    filtered = df.copy()
+def search_result_ids(query, filters, df, index=None, title_index=None, limit=None):
+    """
+    필터와 검색어를 만족하는 결과의 행 위치 배열을 앞에서부터 limit개까지 반환합니다. (None이면 전부)
+    index(CatalogIndex)를 넘기면 필터는 역색인 조회로 처리합니다.
+    검색어가 있으면 title_index(TitleIndex)로 필터 결과 안에서 제목을 찾아
+    정확히 일치 > 접두 일치 > 부분 문자열 > 비슷한 제목(오타, 초성) 순으로 반환합니다.
+    """
+    if limit is None:
+        limit = len(df)
+    if index is None:
+        index = CatalogIndex(df)
+    rows = index.filter_rows(filters)
     if query:
-        filtered = filtered[filtered['영화명'].str.contains(query, case=False, na=False)]
-    if filters["장르"]:
-        filtered = filtered[filtered['장르'].apply(
-            lambda x: any(g in [genre.strip() for genre in str(x).split(',')] for g in filters["장르"]) if pd.notna(x) else False
-        )]
-    if filters["개봉연도"]:
-        filtered = filtered[
-            filtered['개봉일'].apply(
-                lambda x: str(x)[:4] in filters["개봉연도"]
-            )
-        ]
-    if filters["국가"]:
-        filtered = filtered[
-            filtered['국가'].apply(
-                lambda x: any(country == c.strip() for c in str(x).split(',') for country in filters["국가"]) if pd.notna(x) else False
-            )
-        ]
-    if filters["키워드"]:
-        filtered = filtered[
-            filtered['Gemini 키워드'].apply(
-                lambda x: any(kw == k.strip() for k in str(x).split(',') for kw in filters["키워드"]) if pd.notna(x) else False
-            )
-        ]
-    return filtered.head(filters["limit"])
\ No newline at end of file
+        if title_index is None:
+            title_index = TitleIndex(df['영화명'])
+        return title_index.search(query, limit, rows)
+    if rows is None:
+        return np.arange(min(limit, len(df)))
+    return rows[:limit]
+
+def search_movies(query, filters, df, index=None, title_index=None, cursor=0):
+    """
+    cursor번째 결과부터 한 페이지(filters["limit"]개)를 (DataFrame, 다음 페이지 cursor)로 반환합니다.
+    다음 페이지가 없으면 cursor 대신 None을 반환합니다.
+    다음 페이지가 있는지 알 수 있게 한 개만 더 찾고, 화면에 보일 행만 잘라내 복사합니다.
+    search_result_ids의 순서는 limit와 관계없이 같으므로(limit가 크면 뒤에 이어 붙을 뿐) 페이지끼리 겹치거나 빠지는 결과가 없습니다.
+    """
+    end = cursor + filters["limit"]
+    ids = search_result_ids(query, filters, df, index, title_index, limit=end + 1)
+    next_cursor = end if len(ids) > end else None
+    return df.iloc[ids[cursor:end]], next_cursor
@@ -0,0 +1,205 @@
+# title_index.py
+
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+_NON_WORD = re.compile(r'[\W_]+')
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+CHOSEONG_BASE, CHOSEONG_LAST = 0x1100, 0x1112
+SYLLABLES_PER_CHOSEONG = 21 * 28
+# 음절 → 초성 자모 변환표 (str.translate용)
+_CHOSEONG_TABLE = {code: CHOSEONG_BASE + (code - HANGUL_BASE) // SYLLABLES_PER_CHOSEONG
+                   for code in range(HANGUL_BASE, HANGUL_LAST + 1)}
+
+
+def normalize_key(text):
+    """
+    비교용 키: NFKC 정규화 + 소문자 + 공백/문장부호 제거.
+    NFKC는 호환 자모(ㅇ, ㅂ 등)를 첫소리 자모(U+1100~)로 바꾸므로 초성 입력도 그대로 비교할 수 있습니다.
+    """
+    if not isinstance(text, str):
+        return ''
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def choseong_key(key):
+    """정규화된 키의 한글 음절을 초성 자모로 바꿉니다. ('기생충' → 'ᄀᄉᄎ', 한글 외 문자는 그대로)"""
+    return key.translate(_CHOSEONG_TABLE)
+
+
+def has_choseong(key):
+    return any(CHOSEONG_BASE <= ord(ch) <= CHOSEONG_LAST for ch in key)
+
+
+def query_grams(key):
+    """검색에 쓰는 n-gram: 두 글자 이상이면 바이그램, 한 글자면 그 글자 자체"""
+    if len(key) < 2:
+        return [key] if key else []
+    return list(dict.fromkeys(key[i:i + 2] for i in range(len(key) - 1)))
+
+
+def build_gram_postings(keys, lengths):
+    """
+    키마다 들어 있는 글자(1-gram)와 바이그램의 {n-gram: 정렬된 행 위치 배열(int32)}을 만듭니다.
+    전체 키를 코드 포인트 배열 하나로 이어 붙여 (n-gram 번호, 행 위치) 쌍을 한 번에 정렬·중복 제거합니다.
+    """
+    n_rows = len(keys)
+    points = np.frombuffer(''.join(keys).encode('utf-32-le'), dtype=np.uint32)
+    if len(points) == 0:
+        return {}
+    alphabet, chars = np.unique(points, return_inverse=True)
+    m = len(alphabet)
+    rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+    # 바이그램은 같은 키 안에서 이어지는 두 글자만 씁니다. 번호: 1-gram은 0..m-1, 바이그램은 m 이상
+    same = rows[1:] == rows[:-1]
+    codes = np.concatenate([chars, m + chars[:-1][same] * m + chars[1:][same]])
+    rows = np.concatenate([rows, rows[1:][same]])
+    pairs = np.sort(codes * n_rows + rows)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    codes, rows = pairs // n_rows, (pairs % n_rows).astype(np.int32)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    postings = {}
+    for code, start, end in zip(codes[starts].tolist(), starts.tolist(), ends.tolist()):
+        if code < m:
+            gram = chr(alphabet[code])
+        else:
+            a, b = divmod(code - m, m)
+            gram = chr(alphabet[a]) + chr(alphabet[b])
+        postings[gram] = rows[start:end]
+    return postings
+
+
+class GramIndex:
+    """
+    정규화된 키 목록에 대한 n-gram(1·2글자) 역색인입니다.
+    sorted_keys=True면 접두 검색용 정렬 목록도 만들어 match()(정확히 일치 > 접두 일치 > 부분 문자열)를 쓸 수 있습니다.
+    """
+
+    def __init__(self, keys, sorted_keys=True):
+        keys = list(keys)
+        self.n_rows = len(keys)
+        self.keys = keys
+        self.lengths = np.fromiter((len(k) for k in keys), dtype=np.int32, count=len(keys))
+        if sorted_keys:
+            self.order = np.argsort(np.array(keys, dtype=object), kind='stable').astype(np.int32)
+            self.sorted_keys = [keys[i] for i in self.order]
+        self.postings = build_gram_postings(keys, self.lengths)
+        # 제목마다 바이그램 수 (겹침 점수의 분모)
+        self.n_grams = np.maximum(self.lengths - 1, 1)
+
+    def _take(self, rows, limit, seen):
+        # 아직 고르지 않은 행을 짧은 제목, 행 순서 순으로 limit개까지 고릅니다.
+        rows = rows[~seen[rows]]
+        if len(rows) > 1:
+            rows = rows[np.lexsort((rows, self.lengths[rows]))]
+        rows = rows[:limit]
+        seen[rows] = True
+        return rows
+
+    def _counts(self, grams):
+        # 질의 n-gram의 행 위치 배열을 합쳐 행마다 겹친 n-gram 수를 셉니다.
+        arrays = [self.postings[g] for g in grams if g in self.postings]
+        if not arrays:
+            return None
+        return np.bincount(np.concatenate(arrays), minlength=self.n_rows)
+
+    def match(self, key, k, seen):
+        """
+        정확히 일치 > 접두 일치 > 부분 문자열 순으로 최대 k개의 행 위치 배열 목록을 반환합니다.
+        seen: 제외할 행의 불리언 표시 (고른 행은 True로 바뀝니다). k개가 차면 다음 구간은 계산하지 않습니다.
+        """
+        found = []
+        # 1) 정확히 일치, 2) 접두 일치: 정렬된 키 목록에서 이분 탐색
+        lo = bisect.bisect_left(self.sorted_keys, key)
+        mid = bisect.bisect_right(self.sorted_keys, key, lo)
+        hi = bisect.bisect_left(self.sorted_keys, key + '\U0010ffff', mid)
+        for rows in (self.order[lo:mid], self.order[mid:hi]):
+            found.append(self._take(rows, k, seen))
+            k -= len(found[-1])
+            if k <= 0:
+                return found
+
+        # 3) 부분 문자열: 모든 n-gram을 가진 행만 실제로 확인하되, 짧은 제목부터 확인해 k개가 차면 멈춥니다.
+        grams = query_grams(key)
+        counts = self._counts(grams)
+        if counts is None:
+            return found
+        full = np.flatnonzero(counts == len(grams))
+        full = full[~seen[full]]
+        full = full[np.lexsort((full, self.lengths[full]))]
+        matched = []
+        for row in full.tolist():
+            if key in self.keys[row]:
+                matched.append(row)
+                if len(matched) == k:
+                    break
+        found.append(self._take(np.array(matched, dtype=np.int64), k, seen))
+        return found
+
+    def similar(self, key, k, seen, min_overlap=0.7):
+        """
+        n-gram 겹침 비율(Dice 계수)이 높은 순으로 최대 k개의 행 위치를 반환합니다.
+        질의 n-gram의 min_overlap 이상이 겹치는 행만 후보로 삼습니다.
+        """
+        grams = query_grams(key)
+        counts = self._counts(grams)
+        if counts is None or k <= 0:
+            return np.empty(0, dtype=np.int64)
+        threshold = max(1, int(np.ceil(len(grams) * min_overlap)))
+        rows = np.flatnonzero(counts >= threshold)
+        rows = rows[~seen[rows]]
+        scores = 2.0 * counts[rows] / (len(grams) + self.n_grams[rows])
+        if len(rows) > k:
+            # k번째 점수와 같은 행은 모두 남겨 두고 (점수, 짧은 제목, 행 순서)로 정렬한 뒤 자릅니다.
+            # 그래야 k가 달라도 앞부분 결과가 같습니다. (search(q, k)가 search(q, k+n)의 앞부분)
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            keep = scores >= kth
+            rows, scores = rows[keep], scores[keep]
+        rows = rows[np.lexsort((rows, self.lengths[rows], -scores))][:k]
+        seen[rows] = True
+        return rows
+
+
+class TitleIndex:
+    """
+    영화 제목 검색용 색인입니다. 데이터 버전마다 한 번 만듭니다.
+    - 정확히 일치 > 접두 일치 > 부분 문자열은 정규화된 제목 키에서 찾고,
+      남은 자리는 자모로 분해한 키의 n-gram 겹침으로 채워 오타('서울에봄', '오펜하이마')도 찾습니다.
+    - 질의에 초성 자모가 섞여 있으면('ㄱㅅㅊ', '기ㅅ충') 제목의 초성 키 색인에서 찾습니다.
+    """
+
+    def __init__(self, titles):
+        keys = [normalize_key(t) for t in titles]
+        self.n_rows = len(keys)
+        self.text = GramIndex(keys)
+        self.jamo = GramIndex((unicodedata.normalize('NFD', k) for k in keys), sorted_keys=False)
+        self.choseong = GramIndex(choseong_key(k) for k in keys)
+
+    def search(self, query, k, rows=None):
+        """
+        query와 가까운 제목의 행 위치를 점수 순으로 최대 k개 반환합니다. (같은 점수는 짧은 제목, 행 순서 순)
+        rows를 넘기면 그 행들 안에서만 찾습니다. (사이드바 필터 결과)
+        """
+        key = normalize_key(query)
+        if not key or k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if rows is None:
+            seen = np.zeros(self.n_rows, dtype=bool)
+        else:
+            seen = np.ones(self.n_rows, dtype=bool)
+            seen[rows] = False
+
+        if has_choseong(key):
+            key = choseong_key(key)
+            exact, fuzzy, fuzzy_key = self.choseong, self.choseong, key
+        else:
+            exact, fuzzy, fuzzy_key = self.text, self.jamo, unicodedata.normalize('NFD', key)
+        found = exact.match(key, k, seen)
+        remaining = k - sum(len(r) for r in found)
+        if remaining > 0:
+            found.append(fuzzy.similar(fuzzy_key, remaining, seen))
+        return np.concatenate(found).astype(np.int64)